@@ -13,7 +13,8 @@ Set ENV=staging or ENV=production to load different configs.
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator, model_validator
-from typing import Optional, List
+from functools import cached_property
+from typing import FrozenSet, Optional, List
 import os
 
 
@@ -51,12 +52,19 @@ class Settings(BaseSettings):
     embedding_model: str = Field(default="models/gemini-embedding-001", env="EMBEDDING_MODEL")
     chat_model: str = Field(default="models/gemini-1.5-flash", env="CHAT_MODEL")
     embedding_dimension: int = Field(default=3072, env="EMBEDDING_DIMENSION")
+    hnsw_ef_search: int = Field(default=40, env="HNSW_EF_SEARCH")
+    # > 0 switches to the binary-quantized index (optional migration 005, applied at startup) and reranks this many candidates
+    binary_rerank_candidates: int = Field(default=0, env="BINARY_RERANK_CANDIDATES")
+    embedding_cache_ttl: int = Field(default=86400, env="EMBEDDING_CACHE_TTL")
+    # > 0 blends full-text rank into retrieval scores (optional migration 006, applied at startup)
+    hybrid_text_weight: float = Field(default=0.0, env="HYBRID_TEXT_WEIGHT")
     
     # Redis Configuration
     redis_host: str = Field(default="redis", env="REDIS_HOST")
     redis_port: int = Field(default=6379, env="REDIS_PORT")
     redis_password: Optional[str] = Field(default=None, env="REDIS_PASSWORD")
     redis_db: int = Field(default=0, env="REDIS_DB")
+    redis_max_connections: int = Field(default=64, env="REDIS_MAX_CONNECTIONS")
     
     # Application Configuration
     app_name: str = Field(default="AI & RAG Engine", env="APP_NAME")
@@ -84,6 +92,7 @@ class Settings(BaseSettings):
     jwt_secret_key: str = Field(default="your-secret-key-change-in-production", env="JWT_SECRET_KEY")
     jwt_algorithm: str = Field(default="HS256", env="JWT_ALGORITHM")
     jwt_access_token_expire_minutes: int = Field(default=30, env="JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
+    bcrypt_rounds: int = Field(default=12, env="BCRYPT_ROUNDS")
     
     # Security
     admin_username: str = Field(default="admin", env="ADMIN_USERNAME")
@@ -142,11 +151,16 @@ class Settings(BaseSettings):
         """Construct database connection URL"""
         return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
     
-    @property
+    @cached_property
     def allowed_origins_list(self) -> List[str]:
-        """Get allowed origins as list"""
+        """Get allowed origins as list (parsed once per instance)"""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
     
+    @cached_property
+    def allowed_origins_set(self) -> FrozenSet[str]:
+        """Allowed origins for O(1) membership checks"""
+        return frozenset(self.allowed_origins_list)
+    
     @property
     def redis_url(self) -> str:
         """Construct Redis connection URL"""
@@ -11,11 +11,14 @@ import json
 import hashlib
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 from dataclasses import dataclass
+from functools import lru_cache
 from enum import Enum
 import re
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,11 +48,33 @@ class DataValidator:
     MAX_CONTENT_LENGTH = 50000
     MIN_CONTENT_LENGTH = 10
     
-    # Patterns for potentially sensitive data
-    EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
-    PHONE_PATTERN = re.compile(r'\+?[\d\s\-\(\)]{10,}')
-    SSN_PATTERN = re.compile(r'\d{3}-\d{2}-\d{4}')
-    CREDIT_CARD_PATTERN = re.compile(r'\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}')
+    # Patterns for potentially sensitive data, one per type. Detection runs
+    # each independently so a phone-shaped run of digits cannot hide an SSN
+    # or card number that overlaps it.
+    PII_TYPE_PATTERNS = {
+        "email": re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'),
+        "phone": re.compile(r'\+?\(?\d[\d\s\-\(\)]{8,}\d'),
+        "ssn": re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
+        "credit_card": re.compile(r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b'),
+    }
+    # The same patterns combined into one alternation so redaction is a
+    # single pass. Order matters: at a given position the specific SSN/card
+    # shapes win over the looser phone shape.
+    PII_PATTERN = re.compile(
+        f'(?P<email>{PII_TYPE_PATTERNS["email"].pattern})'
+        f'|(?P<ssn>{PII_TYPE_PATTERNS["ssn"].pattern})'
+        f'|(?P<credit_card>{PII_TYPE_PATTERNS["credit_card"].pattern})'
+        f'|(?P<phone>{PII_TYPE_PATTERNS["phone"].pattern})'
+    )
+    # Every PII shape needs an "@" or a digit; content without either
+    # (most prose) skips the full alternation
+    PII_HINT_PATTERN = re.compile(r'[@\d]')
+    PII_REPLACEMENTS = {
+        "email": "[EMAIL REDACTED]",
+        "phone": "[PHONE REDACTED]",
+        "ssn": "[SSN REDACTED]",
+        "credit_card": "[CARD REDACTED]",
+    }
     
     @classmethod
     def validate_content(cls, content: str) -> Dict[str, Any]:
@@ -82,18 +107,13 @@ class DataValidator:
     @classmethod
     def scan_for_pii(cls, content: str) -> List[str]:
         """Scan content for potential PII"""
-        pii_types = []
-        
-        if cls.EMAIL_PATTERN.search(content):
-            pii_types.append("email")
-        if cls.PHONE_PATTERN.search(content):
-            pii_types.append("phone")
-        if cls.SSN_PATTERN.search(content):
-            pii_types.append("ssn")
-        if cls.CREDIT_CARD_PATTERN.search(content):
-            pii_types.append("credit_card")
+        if not cls.PII_HINT_PATTERN.search(content):
+            return []
         
-        return pii_types
+        return [
+            pii_type for pii_type, pattern in cls.PII_TYPE_PATTERNS.items()
+            if pattern.search(content)
+        ]
     
     @classmethod
     def sanitize_pii(cls, content: str, mask: bool = True) -> str:
@@ -107,15 +127,13 @@ class DataValidator:
         Returns:
             Sanitized content
         """
-        if not mask:
+        if not mask or not cls.PII_HINT_PATTERN.search(content):
             return content
         
-        sanitized = cls.EMAIL_PATTERN.sub('[EMAIL REDACTED]', content)
-        sanitized = cls.PHONE_PATTERN.sub('[PHONE REDACTED]', sanitized)
-        sanitized = cls.SSN_PATTERN.sub('[SSN REDACTED]', sanitized)
-        sanitized = cls.CREDIT_CARD_PATTERN.sub('[CARD REDACTED]', sanitized)
-        
-        return sanitized
+        return cls.PII_PATTERN.sub(
+            lambda match: cls.PII_REPLACEMENTS[match.lastgroup],
+            content
+        )
     
     @classmethod
     def validate_metadata(cls, metadata: Dict) -> Dict[str, Any]:
@@ -185,21 +203,29 @@ class DataRetentionManager:
         if policy.retention_period == RetentionPeriod.PERMANENT:
             return None
         
-        days = policy.retention_period.value
-        sql = f"""
-            DELETE FROM {policy.table_name}
-            WHERE {policy.cleanup_column} < NOW() - INTERVAL '{days} days'
-        """
-        
-        if policy.soft_delete:
-            sql = f"""
-                UPDATE {policy.table_name}
+        return self._retention_sql(
+            policy.table_name,
+            policy.cleanup_column,
+            policy.retention_period.value,
+            policy.soft_delete
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _retention_sql(table_name: str, cleanup_column: str, days: int, soft_delete: bool) -> str:
+        """Build (once per distinct policy) the cleanup statement"""
+        if soft_delete:
+            return f"""
+                UPDATE {table_name}
                 SET deleted_at = NOW()
-                WHERE {policy.cleanup_column} < NOW() - INTERVAL '{days} days'
+                WHERE {cleanup_column} < NOW() - INTERVAL '{days} days'
                 AND deleted_at IS NULL
             """
         
-        return sql
+        return f"""
+            DELETE FROM {table_name}
+            WHERE {cleanup_column} < NOW() - INTERVAL '{days} days'
+        """
     
     def get_cleanup_candidates(self, policy: DataRetentionPolicy) -> List[Dict]:
         """Get records that would be cleaned up"""
@@ -233,10 +259,18 @@ class DataHasher:
         return hashlib.sha256(content.encode()).hexdigest()
     
     @staticmethod
-    def generate_checksum(records: List[Dict]) -> str:
-        """Generate checksum for a set of records"""
-        combined = json.dumps(records, sort_keys=True)
-        return hashlib.sha256(combined.encode()).hexdigest()
+    def generate_checksum(records: Iterable[Dict]) -> str:
+        """
+        Generate checksum for a set of records.
+        
+        Records are serialized and hashed one at a time, so memory use
+        does not grow with the number of records.
+        """
+        hasher = hashlib.sha256()
+        for record in records:
+            hasher.update(orjson.dumps(record, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+            hasher.update(b"\x1e")  # record separator
+        return hasher.hexdigest()
 
 
 class DataExporter:
@@ -8,9 +8,13 @@ Following Dependency Inversion Principle:
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional, Protocol
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+import redis.asyncio as aioredis
 from app.config import settings
 
+# Shared async Redis client (one connection pool per process)
+_redis_client: Optional[aioredis.Redis] = None
+
 
 class DatabaseConnection(Protocol):
     """
@@ -27,10 +31,18 @@ class DatabaseConnection(Protocol):
         """Execute a query and return single result"""
         ...
     
+    def execute_many(self, query: str, rows: List[tuple], template: str = None) -> List[Dict]:
+        """Execute a multi-row statement and return its results"""
+        ...
+    
     def commit(self) -> None:
         """Commit transaction"""
         ...
     
+    def rollback(self) -> None:
+        """Roll back transaction"""
+        ...
+    
     def close(self) -> None:
         """Close connection"""
         ...
@@ -102,11 +114,34 @@ class PostgreSQLConnection:
         result = self._cursor.fetchone()
         return dict(result) if result else None
     
+    def execute_many(self, query: str, rows: List[tuple], template: str = None) -> List[Dict]:
+        """
+        Execute a multi-row statement in as few round-trips as possible.
+        
+        Args:
+            query: SQL with a single `VALUES %s` placeholder
+            rows: Parameter tuples, one per row
+            template: Optional per-row template (e.g. '(%s, %s::vector, %s)')
+            
+        Returns:
+            List of result dictionaries (e.g. from RETURNING), in row order
+        """
+        self._ensure_connection()
+        results = execute_values(
+            self._cursor, query, rows, template=template, page_size=len(rows) or 1, fetch=True
+        )
+        return [dict(row) for row in results]
+    
     def commit(self) -> None:
         """Commit current transaction"""
         if self._conn:
             self._conn.commit()
     
+    def rollback(self) -> None:
+        """Roll back current transaction (e.g. after a failed statement)"""
+        if self._conn:
+            self._conn.rollback()
+    
     def close(self) -> None:
         """Close database connection"""
         if self._cursor:
@@ -138,6 +173,35 @@ def get_db_connection() -> PostgreSQLConnection:
     return PostgreSQLConnection()
 
 
+def get_redis_client() -> aioredis.Redis:
+    """
+    Get or create the shared async Redis client.
+    
+    All circuit breakers and router metrics multiplex over a single
+    connection pool instead of opening a client per service instance.
+    Connections are established lazily on first command.
+    
+    Returns:
+        Async Redis client backed by the shared pool
+    """
+    global _redis_client
+    if _redis_client is None:
+        pool = aioredis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections
+        )
+        _redis_client = aioredis.Redis(connection_pool=pool)
+    return _redis_client
+
+
+async def close_redis_client():
+    """Close the shared Redis client and its pool (call on shutdown)"""
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
+
+
 def init_vector_extension():
     """
     Initialize pgvector extension if not already enabled.
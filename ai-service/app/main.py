@@ -1,12 +1,14 @@
 from fastapi import FastAPI, HTTPException, Depends, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, AsyncIterator, Tuple
 from datetime import timedelta
 import os
+import uuid
 import logging
 import secrets
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +19,8 @@ except ImportError:
     resourceExhausted = None
 
 from app.config import settings
-from app.security import sanitize_input, create_access_token, get_current_user, verify_password, get_password_hash
-from app.monitoring import metrics, HealthChecker, get_correlation_id
+from app.security import sanitize_input, sanitize_prompt, create_access_token, get_current_user, verify_password, get_password_hash
+from app.monitoring import metrics, HealthChecker, get_correlation_id, configure_logging
 from app.data_management import DataValidator, DataHasher
 
 health_checker = HealthChecker("ai-service")
@@ -76,15 +78,20 @@ async def global_exception_handler(request: Request, exc: Exception):
 # CORS middleware
 # ...
 from app.rag.embeddings import EmbeddingService
-from app.rag.chat import RAGChatService
-from app.database import get_db_connection, test_connection
+from app.rag.chat import RAGChatService, GreetingDetector
+from app.rag.router import flush_provider_metrics
+from app.database import get_db_connection, test_connection, close_redis_client
+import asyncio
 import glob
+import redis
 from pathlib import Path
 
 # ============================================
 # Application Setup
 # ============================================
 
+configure_logging(logging.DEBUG if settings.debug else logging.INFO)
+
 app = FastAPI(
     title="AI & RAG Engine",
     description="""
@@ -106,28 +113,51 @@ app = FastAPI(
     """,
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins_list,
+    allow_origins=settings.allowed_origins_set,  # CORS checks each request origin with `in`
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Greeting vectors are computed once at startup and shared across requests
+greeting_detector = GreetingDetector()
+
+# Shared Redis client for KNN result caching (connects lazily)
+knn_cache = redis.Redis(
+    host=settings.redis_host,
+    port=settings.redis_port,
+    password=settings.redis_password,
+    db=settings.redis_db,
+    socket_timeout=0.5,
+    socket_connect_timeout=0.5
+)
+
 # ============================================
 # Database Migrations
 # ============================================
 
+# Indexes in migrations/optional/ cost every insert a graph update, so each
+# is only applied once the feature that reads it is switched on
+OPTIONAL_MIGRATIONS = {
+    "005_embeddings_binary_index.sql": lambda: settings.binary_rerank_candidates > 0,
+    "006_embeddings_fts_index.sql": lambda: settings.hybrid_text_weight > 0,
+}
+
+
 def run_migrations():
     """
     Run SQL migrations from migrations directory.
     
-    Executes all .sql files in migrations/ directory in alphabetical order.
-    This is idempotent - migrations use IF NOT EXISTS clauses.
+    Executes all .sql files in migrations/ directory in alphabetical order,
+    followed by the files in migrations/optional/ whose OPTIONAL_MIGRATIONS
+    predicate holds. This is idempotent - migrations use IF NOT EXISTS clauses.
     """
     migrations_dir = Path(__file__).parent.parent / "migrations"
     
@@ -136,6 +166,11 @@ def run_migrations():
         return
     
     migration_files = sorted(migrations_dir.glob("*.sql"))
+    migration_files += [
+        migrations_dir / "optional" / name
+        for name, enabled in sorted(OPTIONAL_MIGRATIONS.items())
+        if enabled()
+    ]
     
     if not migration_files:
         print("⚠ No migration files found")
@@ -167,6 +202,19 @@ def run_migrations():
     print("✓ All migrations completed\n")
 
 
+def warm_up_greeting_detector():
+    """
+    Precompute greeting embeddings for the chat short-circuit.
+    
+    Failures only disable greeting detection; chat keeps working.
+    """
+    try:
+        greeting_detector.warm_up()
+        print(f"✓ Greeting embeddings ready ({len(greeting_detector.greetings)} phrases)")
+    except Exception as e:
+        print(f"⚠ Greeting embeddings unavailable: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """
@@ -188,6 +236,9 @@ async def startup_event():
     # Run migrations
     run_migrations()
     
+    # Embed greetings off the event loop; detection activates once ready
+    asyncio.create_task(asyncio.to_thread(warm_up_greeting_detector))
+    
     print("✓ Startup complete\n")
 
 # ============================================
@@ -201,7 +252,7 @@ def get_embedding_service() -> EmbeddingService:
     Returns:
         Configured EmbeddingService instance
     """
-    return EmbeddingService()
+    return EmbeddingService(cache=knn_cache)
 
 
 def get_chat_service(
@@ -216,7 +267,10 @@ def get_chat_service(
     Returns:
         Configured RAGChatService instance
     """
-    return RAGChatService(embedding_service=embedding_service)
+    return RAGChatService(
+        embedding_service=embedding_service,
+        greeting_detector=greeting_detector
+    )
 
 
 # ============================================
@@ -260,6 +314,23 @@ class IngestResponse(BaseModel):
     message: str = Field(..., description="Mensaje descriptivo")
 
 
+class IngestBatchRequest(BaseModel):
+    """Request model for batch ingestion"""
+    items: List[IngestRequest] = Field(
+        ...,
+        description="Documentos a ingestar",
+        min_length=1,
+        max_length=100
+    )
+
+
+class IngestBatchResponse(BaseModel):
+    """Response model for batch ingestion"""
+    success: bool = Field(..., description="Indica si la operación fue exitosa")
+    embedding_ids: List[int] = Field(..., description="IDs de los embeddings, en el orden recibido")
+    message: str = Field(..., description="Mensaje descriptivo")
+
+
 class ChatRequest(BaseModel):
     """Request model for RAG chat"""
     question: str = Field(
@@ -339,7 +410,9 @@ async def root():
             "health": "/health",
             "docs": "/docs",
             "ingest": "/ingest",
-            "chat": "/chat"
+            "ingest_batch": "/ingest/batch",
+            "chat": "/chat",
+            "chat_stream": "/chat/stream"
         },
         "documentation": "/docs"
     }
@@ -400,6 +473,21 @@ async def get_metrics():
     return metrics.get_metrics()
 
 
+@app.get(
+    "/metrics/prometheus",
+    response_class=PlainTextResponse,
+    summary="Service Metrics (Prometheus)",
+    description="Returns the same metrics in the Prometheus text exposition format",
+    tags=["Monitoring"]
+)
+async def get_prometheus_metrics():
+    """Get service metrics for Prometheus scraping"""
+    return PlainTextResponse(
+        metrics.to_prometheus("ai_service"),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 @app.post(
     "/token",
     response_model=Token,
@@ -452,6 +540,44 @@ async def readiness_check():
     return {"status": "ready"}
 
 
+def prepare_ingest_item(request: IngestRequest) -> Tuple[str, dict]:
+    """
+    Sanitize and validate one ingest item.
+    
+    Returns:
+        Sanitized content and metadata (with source)
+        
+    Raises:
+        HTTPException: If content or metadata fail validation
+    """
+    # Input validation and sanitization
+    sanitized_content = sanitize_input(request.content, max_length=10000)
+    
+    # Data validation if enabled
+    if settings.data_validation_enabled:
+        validation = DataValidator.validate_content(sanitized_content)
+        if not validation["valid"]:
+            raise HTTPException(status_code=400, detail=validation["error"])
+        
+        # PII sanitization if enabled
+        if settings.pii_sanitization_enabled and validation.get("contains_pii"):
+            sanitized_content = DataValidator.sanitize_pii(sanitized_content)
+            logger.warning(f"PII detected and sanitized in content")
+    
+    # Metadata validation
+    if request.metadata:
+        metadata_validation = DataValidator.validate_metadata(request.metadata)
+        if not metadata_validation["valid"]:
+            raise HTTPException(status_code=400, detail=metadata_validation["error"])
+    
+    sanitized_source = sanitize_input(request.source, max_length=100) if request.source else "unknown"
+    
+    metadata = request.metadata or {}
+    metadata['source'] = sanitized_source
+    
+    return sanitized_content, metadata
+
+
 @app.post(
     "/ingest",
     response_model=IngestResponse,
@@ -489,30 +615,7 @@ async def ingest_data(
         HTTPException: Si falla la ingesta
     """
     try:
-        # Input validation and sanitization
-        sanitized_content = sanitize_input(request.content, max_length=10000)
-        
-        # Data validation if enabled
-        if settings.data_validation_enabled:
-            validation = DataValidator.validate_content(sanitized_content)
-            if not validation["valid"]:
-                raise HTTPException(status_code=400, detail=validation["error"])
-            
-            # PII sanitization if enabled
-            if settings.pii_sanitization_enabled and validation.get("contains_pii"):
-                sanitized_content = DataValidator.sanitize_pii(sanitized_content)
-                logger.warning(f"PII detected and sanitized in content")
-        
-        # Metadata validation
-        if request.metadata:
-            metadata_validation = DataValidator.validate_metadata(request.metadata)
-            if not metadata_validation["valid"]:
-                raise HTTPException(status_code=400, detail=metadata_validation["error"])
-        
-        sanitized_source = sanitize_input(request.source, max_length=100) if request.source else "unknown"
-        
-        metadata = request.metadata or {}
-        metadata['source'] = sanitized_source
+        sanitized_content, metadata = prepare_ingest_item(request)
         
         embedding_id = await service.ingest(
             content=sanitized_content,
@@ -532,6 +635,52 @@ async def ingest_data(
         )
 
 
+@app.post(
+    "/ingest/batch",
+    response_model=IngestBatchResponse,
+    summary="Ingestar Datos en Lote",
+    description="Genera los embeddings de varios textos en una sola llamada y los almacena en una transacción",
+    tags=["Data Ingestion"],
+    status_code=201
+)
+async def ingest_batch(
+    request: IngestBatchRequest,
+    service: EmbeddingService = Depends(get_embedding_service),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint para ingerir varios documentos a la vez.
+    
+    Todos los textos se validan igual que en `/ingest`, se envían a Gemini
+    en una única petición de embeddings y se insertan con un solo INSERT.
+    
+    Args:
+        request: Documentos a ingestar
+        service: Servicio de embeddings (inyectado)
+        
+    Returns:
+        IDs de los embeddings en el mismo orden que los documentos
+        
+    Raises:
+        HTTPException: Si falla la validación o la ingesta
+    """
+    items = [prepare_ingest_item(item) for item in request.items]
+    
+    try:
+        embedding_ids = await service.ingest_many(items)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ingestion failed: {str(e)}"
+        )
+    
+    return {
+        "success": True,
+        "embedding_ids": embedding_ids,
+        "message": f"Successfully ingested {len(embedding_ids)} documents"
+    }
+
+
 @app.post(
     "/chat",
     response_model=ChatResponse,
@@ -568,7 +717,7 @@ async def chat(
     Raises:
         HTTPException: Si falla la generación
     """
-    sanitized_question = sanitize_input(request.question, max_length=1000)
+    sanitized_question = sanitize_prompt(request.question, max_length=1000)
     sanitized_conversation_id = sanitize_input(request.conversation_id, max_length=100) if request.conversation_id else None
     
     response = await service.generate_response(
@@ -580,6 +729,57 @@ async def chat(
     return response
 
 
+@app.post(
+    "/chat/stream",
+    summary="Chat RAG (Streaming)",
+    description="Genera respuestas RAG enviando el texto a medida que el modelo lo produce",
+    tags=["RAG Chat"]
+)
+async def chat_stream(
+    request: ChatRequest,
+    service: RAGChatService = Depends(get_chat_service),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint para consultas RAG con respuesta en streaming.
+    
+    El cuerpo es un stream Server-Sent Events: cada evento `data` lleva
+    `{"text": ...}` con un fragmento y el stream termina con `event: done`.
+    El ID de conversación se devuelve en la cabecera `X-Conversation-ID`.
+    
+    Args:
+        request: Pregunta y parámetros
+        service: Servicio RAG (inyectado)
+        
+    Returns:
+        StreamingResponse con la respuesta generada
+    """
+    sanitized_question = sanitize_prompt(request.question, max_length=1000)
+    conversation_id = (
+        sanitize_input(request.conversation_id, max_length=100)
+        if request.conversation_id else str(uuid.uuid4())
+    )
+    
+    chunks = service.generate_response_stream(
+        question=sanitized_question,
+        conversation_id=conversation_id,
+        max_context_items=request.max_context_items
+    )
+    
+    return StreamingResponse(
+        sse_events(chunks),
+        media_type="text/event-stream",
+        headers={"X-Conversation-ID": conversation_id, "Cache-Control": "no-cache"}
+    )
+
+
+async def sse_events(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Frame text chunks as Server-Sent Events"""
+    async for chunk in chunks:
+        yield b"data: " + orjson.dumps({"text": chunk}) + b"\n\n"
+    yield b"event: done\ndata: {}\n\n"
+
+
 class WelcomeRequest(BaseModel):
     """Request model for welcome message"""
     conversation_id: Optional[str] = Field(
@@ -942,6 +1142,8 @@ async def analyze_script(
 async def shutdown_event():
     """Cleanup on shutdown"""
     print(f"👋 Shutting down {settings.app_name}")
+    await flush_provider_metrics()
+    await close_redis_client()
 
 
 if __name__ == "__main__":
@@ -36,8 +36,9 @@ class ProviderFactory:
         "static": StaticFallbackProvider,
     }
     
+    __slots__ = ("_custom_providers",)
+    
     def __init__(self):
-        self._providers: dict = {}
         self._custom_providers: dict = {}
     
     def create(self, provider_name: str, **kwargs) -> LLMProvider:
@@ -54,14 +55,18 @@ class ProviderFactory:
         Raises:
             ValueError: If provider not found
         """
+        name = provider_name.lower()
+        
         # Check custom providers first (for testing/mocks)
-        if provider_name in self._custom_providers:
-            return self._custom_providers[provider_name]
+        provider = self._custom_providers.get(name)
+        if provider is not None:
+            return provider
         
         # Look up in default providers
-        provider_class = self.DEFAULT_PROVIDERS.get(provider_name.lower())
-        if not provider_class:
-            raise ValueError(f"Unknown provider: {provider_name}")
+        try:
+            provider_class = self.DEFAULT_PROVIDERS[name]
+        except KeyError:
+            raise ValueError(f"Unknown provider: {provider_name}") from None
         
         return provider_class(**kwargs)
     
@@ -77,7 +82,7 @@ class ProviderFactory:
     
     def get_available_providers(self) -> list:
         """Get list of available provider names"""
-        return list(self.DEFAULT_PROVIDERS.keys()) + list(self._custom_providers.keys())
+        return list({**self.DEFAULT_PROVIDERS, **self._custom_providers})
 
 
 # Singleton factory instance
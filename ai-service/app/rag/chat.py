@@ -5,14 +5,21 @@ Implements conversation management and response generation
 following Single Responsibility and Dependency Inversion principles.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Protocol
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import List, Deque, Dict, Optional, Protocol, AsyncIterator, Callable, Any
+import asyncio
 import uuid
+import time
 import random
-import redis
-from datetime import datetime
+import redis.asyncio as aioredis
+import numpy as np
+from datetime import datetime, timezone
 
 from app.config import settings
-from app.rag.embeddings import EmbeddingService
+from app.rag.embeddings import EmbeddingService, EmbeddingProvider, GeminiEmbeddingProvider, Embedding
 from app.rag.router import LLMRouter
 from app.providers_factory import (
     create_primary_provider,
@@ -23,6 +30,17 @@ from app.providers_factory import (
 )
 
 
+FALLBACK_NOTICE = "\n\n_(Respuesta generada por sistema de respaldo)_"
+
+# Conversation stores are synchronous (psycopg2); their calls run on this
+# pool so they don't block the event loop. Sized to the Postgres pool and
+# shared by all RAGChatService instances (one is built per request).
+_db_executor = ThreadPoolExecutor(
+    max_workers=settings.postgres_pool_size,
+    thread_name_prefix="pg"
+)
+
+
 class ConversationStore(ABC):
     """
     Abstract storage for conversation history.
@@ -54,11 +72,16 @@ class InMemoryConversationStore(ConversationStore):
     """
     In-memory implementation of conversation storage.
     
+    Turns store an integer unix-ms timestamp; it is formatted as ISO 8601
+    only when history is read.
+    
     For production, replace with Redis or database implementation.
     """
     
+    MAX_TURNS = 10  # Older turns are dropped as new ones arrive
+    
     def __init__(self):
-        self._conversations: Dict[str, List[Dict]] = {}
+        self._conversations: Dict[str, Deque[Dict]] = {}
     
     def save_turn(
         self, 
@@ -74,18 +97,15 @@ class InMemoryConversationStore(ConversationStore):
             question: User question
             answer: Assistant answer
         """
-        if conversation_id not in self._conversations:
-            self._conversations[conversation_id] = []
+        turns = self._conversations.get(conversation_id)
+        if turns is None:
+            turns = self._conversations[conversation_id] = deque(maxlen=self.MAX_TURNS)
         
-        self._conversations[conversation_id].append({
+        turns.append({
             "question": question,
             "answer": answer,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": time.time_ns() // 1_000_000
         })
-        
-        # Keep only last 10 turns
-        if len(self._conversations[conversation_id]) > 10:
-            self._conversations[conversation_id] = self._conversations[conversation_id][-10:]
     
     def get_history(
         self, 
@@ -99,8 +119,16 @@ class InMemoryConversationStore(ConversationStore):
             conversation_id: Conversation identifier
             limit: Maximum turns to return
         """
-        history = self._conversations.get(conversation_id, [])
-        return history[-limit:]
+        history = self._conversations.get(conversation_id, ())
+        return [
+            {
+                **turn,
+                "timestamp": datetime.fromtimestamp(
+                    turn["timestamp"] / 1000, tz=timezone.utc
+                ).isoformat()
+            }
+            for turn in islice(history, max(len(history) - limit, 0), None)
+        ]
 
 
 class PostgresConversationStore(ConversationStore):
@@ -338,6 +366,90 @@ PREGUNTA DEL USUARIO:
 RESPUESTA:"""
 
 
+class GreetingDetector:
+    """
+    Detects greeting-only messages without calling the LLM.
+    
+    Canonical greetings are embedded once (see warm_up) and kept as a
+    normalized float32 matrix; detection is then a single in-memory
+    matrix-vector product against the query embedding.
+    """
+    
+    DEFAULT_GREETINGS = (
+        "hola",
+        "hi",
+        "hello",
+        "hey",
+        "buenos días",
+        "buenas tardes",
+        "buenas noches",
+        "bienvenido",
+        "qué tal",
+    )
+    SIMILARITY_THRESHOLD = 0.9
+    
+    def __init__(
+        self,
+        embedding_provider: EmbeddingProvider = None,
+        greetings: Optional[List[str]] = None,
+        threshold: Optional[float] = None
+    ):
+        """
+        Initialize greeting detector.
+        
+        Args:
+            embedding_provider: Provider used to embed greetings (uses Gemini if not provided)
+            greetings: Canonical greeting phrases
+            threshold: Minimum cosine similarity to treat a query as a greeting
+        """
+        self.embedding_provider = embedding_provider or GeminiEmbeddingProvider()
+        self.greetings = tuple(greetings or self.DEFAULT_GREETINGS)
+        self.threshold = threshold if threshold is not None else self.SIMILARITY_THRESHOLD
+        self._vectors: Optional[np.ndarray] = None
+    
+    @property
+    def is_ready(self) -> bool:
+        """Whether greeting vectors have been computed"""
+        return self._vectors is not None
+    
+    def warm_up(self) -> None:
+        """
+        Embed the canonical greetings in a single batch request.
+        
+        Uses the query task type so vectors are comparable with
+        the embeddings produced for incoming questions.
+        """
+        vectors = np.asarray(
+            self.embedding_provider.generate_embeddings(
+                list(self.greetings), task_type="retrieval_query"
+            ),
+            dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._vectors = vectors / np.maximum(norms, 1e-12)
+    
+    def is_greeting(self, query_embedding: Embedding) -> bool:
+        """
+        Check whether a query embedding matches a known greeting.
+        
+        Args:
+            query_embedding: Embedding of the user question
+            
+        Returns:
+            True if the best greeting similarity exceeds the threshold
+        """
+        if self._vectors is None:
+            return False
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or query.shape != (self._vectors.shape[1],):
+            return False
+        
+        similarities = self._vectors @ (query / norm)
+        return float(similarities.max()) > self.threshold
+
+
 class RAGChatService:
     """
     High-level RAG chat service.
@@ -352,7 +464,9 @@ class RAGChatService:
         llm_router: Optional[LLMRouter] = None,
         conversation_store: ConversationStore = None,
         prompt_builder: PromptBuilder = None,
-        redis_client: Optional[redis.Redis] = None
+        redis_client: Optional[aioredis.Redis] = None,
+        greeting_detector: Optional[GreetingDetector] = None,
+        db_executor: Optional[ThreadPoolExecutor] = None
     ):
         """
         Initialize RAG chat service with dependencies.
@@ -362,23 +476,20 @@ class RAGChatService:
             llm_router: Router for resilient LLM orchestration
             conversation_store: Storage for conversations
             prompt_builder: Builder for prompts
-            redis_client: Redis client for circuit breaker
+            redis_client: Async Redis client for circuit breaker (uses shared pool if not provided)
+            greeting_detector: Optional detector to answer greetings without the LLM
+            db_executor: Executor for conversation store calls (uses shared pool if not provided)
         """
         self.embedding_service = embedding_service
         self.conversation_store = conversation_store or PostgresConversationStore()
         self.prompt_builder = prompt_builder or PromptBuilder()
+        self.greeting_detector = greeting_detector
+        self._db_executor = db_executor or _db_executor
         
-        # Initialize Redis client for circuit breaker
+        # Circuit breakers share the process-wide async Redis pool
         if redis_client is None:
-            try:
-                redis_client = redis.Redis(
-                    host=settings.redis_host,
-                    port=settings.redis_port,
-                    password=settings.redis_password,
-                    decode_responses=True
-                )
-            except Exception:
-                redis_client = None  # Circuit breaker disabled if Redis unavailable
+            from app.database import get_redis_client
+            redis_client = get_redis_client()
         
         # Initialize LLM Router with multi-layer fallback
         if llm_router is None:
@@ -413,25 +524,34 @@ class RAGChatService:
         if not conversation_id:
             conversation_id = str(uuid.uuid4())
         
-        # Step 1: Retrieve relevant context
-        context_documents = await self.embedding_service.search_similar(
-            query=question,
-            limit=max_context_items,
-            threshold=0.5
-        )
+        # Step 1: Embed the question once and short-circuit greetings
+        query_embedding = await self.embedding_service.embed_query(question)
         
-        # Step 2: Build context and history
-        context_text = self.prompt_builder.build_context(context_documents)
-        history = self.conversation_store.get_history(conversation_id)
-        history_text = self.prompt_builder.build_history(history)
+        if self.greeting_detector and self.greeting_detector.is_greeting(query_embedding):
+            welcome = await self.generate_welcome(conversation_id)
+            await self._run_db(
+                self.conversation_store.save_turn,
+                conversation_id=conversation_id,
+                question=question,
+                answer=welcome["message"]
+            )
+            return {
+                "answer": welcome["message"],
+                "sources": [],
+                "conversation_id": conversation_id
+            }
         
-        # Step 3: Build prompt
-        prompt = self.prompt_builder.build_prompt(
-            question=question,
-            context=context_text,
-            history=history_text
+        # Retrieve relevant context
+        context_documents = await self.embedding_service.search_by_embedding(
+            query_embedding=query_embedding,
+            limit=max_context_items,
+            threshold=0.5,
+            query_text=question
         )
         
+        # Steps 2-3: Build context, history and prompt
+        prompt = await self._build_prompt(question, conversation_id, context_documents)
+        
         # Step 4: Generate response with Router (handles all fallback logic)
         router_response = await self.llm_router.generate(
             prompt=prompt,
@@ -444,10 +564,11 @@ class RAGChatService:
         
         # Add fallback notice if secondary provider was used
         if fallback_used and provider_used != "static_fallback":
-            answer += "\n\n_(Respuesta generada por sistema de respaldo)_"
+            answer += FALLBACK_NOTICE
         
         # Step 5: Save conversation turn
-        self.conversation_store.save_turn(
+        await self._run_db(
+            self.conversation_store.save_turn,
             conversation_id=conversation_id,
             question=question,
             answer=answer
@@ -472,6 +593,93 @@ class RAGChatService:
             "conversation_id": conversation_id
         }
 
+    async def generate_response_stream(
+        self,
+        question: str,
+        conversation_id: str,
+        max_context_items: int = 5
+    ) -> AsyncIterator[str]:
+        """
+        Generate RAG response as a stream of text chunks.
+        
+        The full answer is reassembled and saved to the conversation
+        once the stream completes.
+        
+        Args:
+            question: User question
+            conversation_id: Conversation ID (callers generate it up front
+                so it can be returned before the body is streamed)
+            max_context_items: Number of documents to retrieve
+            
+        Yields:
+            Answer text chunks
+        """
+        query_embedding = await self.embedding_service.embed_query(question)
+        
+        if self.greeting_detector and self.greeting_detector.is_greeting(query_embedding):
+            welcome = await self.generate_welcome(conversation_id)
+            yield welcome["message"]
+            await self._run_db(
+                self.conversation_store.save_turn,
+                conversation_id=conversation_id,
+                question=question,
+                answer=welcome["message"]
+            )
+            return
+        
+        context_documents = await self.embedding_service.search_by_embedding(
+            query_embedding=query_embedding,
+            limit=max_context_items,
+            threshold=0.5,
+            query_text=question
+        )
+        prompt = await self._build_prompt(question, conversation_id, context_documents)
+        
+        answer_parts = []
+        provider_used = None
+        fallback_used = False
+        async for chunk in self.llm_router.generate_stream(
+            prompt=prompt,
+            conversation_id=conversation_id
+        ):
+            answer_parts.append(chunk["text"])
+            provider_used = chunk["provider"]
+            fallback_used = chunk["fallback_used"]
+            yield chunk["text"]
+        
+        if fallback_used and provider_used != "static_fallback":
+            answer_parts.append(FALLBACK_NOTICE)
+            yield FALLBACK_NOTICE
+        
+        await self._run_db(
+            self.conversation_store.save_turn,
+            conversation_id=conversation_id,
+            question=question,
+            answer="".join(answer_parts)
+        )
+    
+    async def _run_db(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking conversation store call on the bounded DB executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, partial(fn, *args, **kwargs))
+    
+    async def _build_prompt(
+        self,
+        question: str,
+        conversation_id: str,
+        context_documents: List[Dict]
+    ) -> str:
+        """Build the LLM prompt from retrieved context and conversation history"""
+        context_text = self.prompt_builder.build_context(context_documents)
+        history = await self._run_db(self.conversation_store.get_history, conversation_id)
+        history_text = self.prompt_builder.build_history(history)
+        
+        return self.prompt_builder.build_prompt(
+            question=question,
+            context=context_text,
+            history=history_text
+        )
+
     async def generate_welcome(self, conversation_id: Optional[str] = None) -> Dict:
         """
         Generate a smart welcome message using STATIC TEMPLATES.
@@ -487,7 +695,7 @@ class RAGChatService:
             conversation_id = str(uuid.uuid4())
             
         # Check if conversation exists (has history)
-        history = self.conversation_store.get_history(conversation_id)
+        history = await self._run_db(self.conversation_store.get_history, conversation_id)
         
         if history:
             messages = [
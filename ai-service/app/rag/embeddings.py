@@ -6,15 +6,63 @@ Following SOLID principles:
 - Open/Closed: Open for extension, closed for modification
 - Dependency Inversion: Depend on abstractions, not concretions
 """
-import json
+import asyncio
+import hashlib
+import unicodedata
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Protocol
-import google.generativeai as genai
+from functools import lru_cache
+from typing import List, Dict, Optional, Protocol, Sequence, Tuple, Union
+import numpy as np
+import orjson
+import redis
 from app.config import settings
 from app.database import DatabaseConnection, get_db_connection
 from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
 
 
+Embedding = Union[np.ndarray, Sequence[float]]
+
+
+@lru_cache(maxsize=8)
+def _vector_format(dimension: int) -> str:
+    """printf-style template for a pgvector literal of the given dimension"""
+    return '[' + ','.join(['%.9g'] * dimension) + ']'
+
+
+def to_vector_literal(embedding: Embedding) -> str:
+    """
+    Format an embedding as a pgvector text literal.
+    
+    Nine significant digits round-trip float32 exactly, so the cached
+    template is both faster and shorter than joining float reprs.
+    
+    Args:
+        embedding: Embedding vector
+        
+    Returns:
+        Literal such as '[0.1,0.2,...]'
+    """
+    values = np.asarray(embedding, dtype=np.float32).tolist()
+    return _vector_format(len(values)) % tuple(values)
+
+
+def l2_normalize(embedding: Embedding) -> np.ndarray:
+    """
+    Scale an embedding to unit length.
+    
+    Stored and query vectors are both unit length, so cosine similarity
+    reduces to the inner product that retrieval orders by.
+    
+    Args:
+        embedding: Embedding vector
+        
+    Returns:
+        float32 vector with L2 norm 1 (zero vectors are returned unchanged)
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
 class EmbeddingProvider(Protocol):
     """
     Protocol for embedding generation.
@@ -23,10 +71,14 @@ class EmbeddingProvider(Protocol):
     without changing dependent code.
     """
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str) -> Embedding:
         """Generate embedding vector for text"""
         ...
     
+    def generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        """Generate embedding vectors for several texts in one request"""
+        ...
+    
     @property
     def dimension(self) -> int:
         """Embedding vector dimension"""
@@ -58,15 +110,23 @@ class GeminiEmbeddingProvider:
         self.model_name = model_name or settings.embedding_model
         self._dimension = embedding_dim or settings.embedding_dimension
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        # Gemini SDK is imported on first use, it dominates cold-start time
+        self._genai = None
+    
+    def _sdk(self):
+        """Import and configure the Gemini SDK on first use"""
+        if self._genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._genai = genai
+        return self._genai
 
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
         reraise=True
     )
-    def generate_embedding(self, text: str, task_type: str = "retrieval_document") -> List[float]:
+    def generate_embedding(self, text: str, task_type: str = "retrieval_document") -> np.ndarray:
         """
         Generate embedding using Gemini API.
         
@@ -75,22 +135,49 @@ class GeminiEmbeddingProvider:
             task_type: Type of task (retrieval_document, retrieval_query, etc.)
             
         Returns:
-            Embedding vector
+            Embedding vector as a float32 array
             
         Raises:
             Exception: If API call fails (after retries)
         """
         try:
-            result = genai.embed_content(
+            result = self._sdk().embed_content(
                 model=self.model_name,
                 content=text,
                 task_type=task_type
             )
-            return result['embedding']
+            return np.asarray(result['embedding'], dtype=np.float32)
         except Exception as e:
             # Let tenacity handle the retry or re-raise if attempts exhausted
             raise e
     
+    @retry(
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
+        reraise=True
+    )
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        task_type: str = "retrieval_document"
+    ) -> List[np.ndarray]:
+        """
+        Generate embeddings for several texts using Gemini's batch API.
+        
+        Args:
+            texts: Texts to embed
+            task_type: Type of task (retrieval_document, retrieval_query, etc.)
+            
+        Returns:
+            One float32 embedding per text, in input order
+        """
+        result = self._sdk().embed_content(
+            model=self.model_name,
+            content=list(texts),
+            task_type=task_type
+        )
+        return [np.asarray(values, dtype=np.float32) for values in result['embedding']]
+    
     @property
     def dimension(self) -> int:
         """Return embedding dimension"""
@@ -105,20 +192,52 @@ class EmbeddingRepository(ABC):
     """
     
     @abstractmethod
-    def save(self, content: str, embedding: List[float], metadata: Dict) -> int:
+    def save(self, content: str, embedding: Embedding, metadata: Dict) -> int:
         """Save embedding to storage"""
         ...
     
+    @abstractmethod
+    def save_many(self, items: List[Tuple[str, Embedding, Dict]]) -> List[int]:
+        """Save several (content, embedding, metadata) items in one transaction"""
+        ...
+    
     @abstractmethod
     def find_similar(
         self, 
-        query_embedding: List[float], 
+        query_embedding: Embedding, 
         limit: int, 
         threshold: float
     ) -> List[Dict]:
         """Find similar embeddings"""
         ...
     
+    @abstractmethod
+    def find_similar_batch(
+        self,
+        query_embeddings: List[Embedding],
+        limit: int,
+        threshold: float
+    ) -> List[List[Dict]]:
+        """Find similar embeddings for several queries at once"""
+        ...
+    
+    @abstractmethod
+    def find_hybrid(
+        self,
+        query_embedding: Embedding,
+        query_text: str,
+        limit: int,
+        threshold: float,
+        text_weight: float
+    ) -> List[Dict]:
+        """Find documents by blended vector similarity and full-text rank"""
+        ...
+    
+    @abstractmethod
+    def find_by_ids(self, embedding_ids: List[int]) -> List[Dict]:
+        """Fetch embeddings by ID"""
+        ...
+    
     @abstractmethod
     def delete(self, embedding_id: int) -> None:
         """Delete embedding by ID"""
@@ -141,7 +260,7 @@ class PostgreSQLEmbeddingRepository(EmbeddingRepository):
         """
         self.db = db_connection or get_db_connection()
     
-    def save(self, content: str, embedding: List[float], metadata: Dict) -> int:
+    def save(self, content: str, embedding: Embedding, metadata: Dict) -> int:
         """
         Save embedding to PostgreSQL.
         
@@ -153,8 +272,8 @@ class PostgreSQLEmbeddingRepository(EmbeddingRepository):
         Returns:
             ID of saved embedding
         """
-        embedding_str = '[' + ','.join(map(str, embedding)) + ']'
-        metadata_json = json.dumps(metadata)
+        embedding_str = to_vector_literal(l2_normalize(embedding))
+        metadata_json = orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode()
 
         result = self.db.execute_one(
             """
@@ -168,43 +287,290 @@ class PostgreSQLEmbeddingRepository(EmbeddingRepository):
         self.db.commit()
         return result['id']
     
+    def save_many(self, items: List[Tuple[str, Embedding, Dict]]) -> List[int]:
+        """
+        Save several embeddings with one multi-row INSERT.
+        
+        Args:
+            items: (content, embedding, metadata) tuples
+            
+        Returns:
+            IDs of saved embeddings, in input order
+        """
+        if not items:
+            return []
+        
+        rows = [
+            (
+                content,
+                to_vector_literal(l2_normalize(embedding)),
+                orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode()
+            )
+            for content, embedding, metadata in items
+        ]
+        results = self.db.execute_many(
+            "INSERT INTO embeddings (content, embedding, metadata) VALUES %s RETURNING id",
+            rows,
+            template="(%s, %s::vector, %s)"
+        )
+        
+        self.db.commit()
+        return [row['id'] for row in results]
+    
     def find_similar(
         self, 
-        query_embedding: List[float], 
+        query_embedding: Embedding, 
         limit: int = 5,
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None
     ) -> List[Dict]:
         """
         Find similar embeddings using cosine similarity.
         
+        Ordering uses a quantized expression covered by an HNSW index
+        (halfvec by default, 1-bit when binary_rerank_candidates is set;
+        see _nearest_sql); similarity scores are still computed at full
+        precision.
+        
         Args:
             query_embedding: Query vector
             limit: Maximum results
             threshold: Minimum similarity score
+            ef_search: HNSW candidate list size (uses settings if not provided);
+                higher values trade latency for recall
             
         Returns:
             List of similar documents with scores
         """
-        embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+        embedding_str = to_vector_literal(l2_normalize(query_embedding))
         dim = settings.embedding_dimension
+        limits = self._scan_limits(limit)
+        # HNSW returns at most ef_search rows, so it must cover the scan
+        ef_search = max(ef_search or settings.hnsw_ef_search, limits[0])
         
+        # SET LOCAL and the query share one round-trip and one transaction.
+        # The inner query is a pure index scan with the LIMIT pushed down;
+        # full-precision similarity is computed once, for those rows only.
+        # The vector literal is bound once and referenced through q.emb, so
+        # it is sent and parsed a single time.
         results = self.db.execute(
             f"""
-            SELECT 
-                id,
-                content,
-                metadata,
-                1 - (embedding <=> %s::vector({dim})) as similarity
-            FROM embeddings
-            WHERE 1 - (embedding <=> %s::vector({dim})) > %s
-            ORDER BY embedding <=> %s::vector({dim})
-            LIMIT %s
+            SET LOCAL hnsw.ef_search = %s;
+            SELECT nearest.id, nearest.content, nearest.metadata, nearest.similarity
+            FROM (SELECT %s::vector({dim}) AS emb) q
+            CROSS JOIN LATERAL ({self._nearest_sql("q.emb")}) nearest
+            WHERE nearest.similarity > %s
+            ORDER BY nearest.similarity DESC
             """,
-            (embedding_str, embedding_str, threshold, embedding_str, limit)
+            (ef_search, embedding_str, *limits, threshold)
         )
         
         return results
     
+    def find_similar_batch(
+        self,
+        query_embeddings: List[Embedding],
+        limit: int = 5,
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None
+    ) -> List[List[Dict]]:
+        """
+        Find similar embeddings for several queries in one statement.
+        
+        Each query runs its own index-ordered scan through a LATERAL join,
+        so results match calling find_similar once per query.
+        
+        Args:
+            query_embeddings: Query vectors
+            limit: Maximum results per query
+            threshold: Minimum similarity score
+            ef_search: HNSW candidate list size (uses settings if not provided)
+            
+        Returns:
+            One list of similar documents per query, in input order
+        """
+        if not query_embeddings:
+            return []
+        
+        dim = settings.embedding_dimension
+        limits = self._scan_limits(limit)
+        ef_search = max(ef_search or settings.hnsw_ef_search, limits[0])
+        
+        rows = self.db.execute(
+            f"""
+            SET LOCAL hnsw.ef_search = %s;
+            SELECT q.qid, nearest.id, nearest.content, nearest.metadata, nearest.similarity
+            FROM unnest(%s::vector({dim})[]) WITH ORDINALITY AS q(emb, qid)
+            CROSS JOIN LATERAL ({self._nearest_sql("q.emb")}) nearest
+            WHERE nearest.similarity > %s
+            ORDER BY q.qid, nearest.similarity DESC
+            """,
+            (ef_search, [to_vector_literal(l2_normalize(e)) for e in query_embeddings], *limits, threshold)
+        )
+        
+        results: List[List[Dict]] = [[] for _ in query_embeddings]
+        for row in rows:
+            qid = row.pop("qid")
+            results[qid - 1].append(row)  # WITH ORDINALITY is 1-based
+        return results
+    
+    def find_hybrid(
+        self,
+        query_embedding: Embedding,
+        query_text: str,
+        limit: int = 5,
+        threshold: float = 0.7,
+        text_weight: float = 0.3,
+        ef_search: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Find documents by blended vector similarity and full-text rank.
+        
+        Candidates are the ANN neighbours (see _nearest_sql) plus the best
+        full-text matches from the GIN index in
+        migrations/optional/006_embeddings_fts_index.sql. Each candidate is scored
+        as (1 - text_weight) * similarity + text_weight * text_rank, with
+        ts_rank_cd normalized to [0, 1). Keyword matches are kept even when
+        their similarity is below the threshold.
+        
+        Args:
+            query_embedding: Query vector
+            query_text: Raw query text for full-text matching
+            limit: Maximum results
+            threshold: Minimum similarity for rows without a keyword match
+            text_weight: Weight of the full-text rank in the blended score
+            ef_search: HNSW candidate list size (uses settings if not provided)
+            
+        Returns:
+            List of documents with similarity, text_rank and score,
+            best score first
+        """
+        embedding_str = to_vector_literal(l2_normalize(query_embedding))
+        dim = settings.embedding_dimension
+        limits = self._scan_limits(limit)
+        ef_search = max(ef_search or settings.hnsw_ef_search, limits[0])
+        
+        # 'simple' skips stemming and stop words: content mixes Spanish
+        # and English, and must match the expression in migration 006.
+        return self.db.execute(
+            f"""
+            SET LOCAL hnsw.ef_search = %s;
+            WITH q AS (
+                SELECT %s::vector({dim}) AS emb, plainto_tsquery('simple', %s) AS tsq
+            ),
+            candidates AS (
+                SELECT nearest.id
+                FROM q CROSS JOIN LATERAL ({self._nearest_sql("q.emb")}) nearest
+                UNION
+                (
+                    SELECT e.id
+                    FROM embeddings e, q
+                    WHERE to_tsvector('simple', e.content) @@ q.tsq
+                    ORDER BY ts_rank_cd(to_tsvector('simple', e.content), q.tsq) DESC
+                    LIMIT %s
+                )
+            )
+            SELECT id, content, metadata, similarity, text_rank,
+                (1 - %s) * similarity + %s * text_rank AS score
+            FROM (
+                SELECT 
+                    e.id,
+                    e.content,
+                    e.metadata,
+                    (e.embedding <#> q.emb) * -1 as similarity,
+                    ts_rank_cd(to_tsvector('simple', e.content), q.tsq, 32) as text_rank
+                FROM candidates c
+                JOIN embeddings e USING (id)
+                CROSS JOIN q
+            ) scored
+            WHERE similarity > %s OR text_rank > 0
+            ORDER BY score DESC
+            LIMIT %s
+            """,
+            (
+                ef_search, embedding_str, query_text, *limits, limit,
+                text_weight, text_weight, threshold, limit
+            )
+        )
+    
+    @staticmethod
+    def _scan_limits(limit: int) -> Tuple[int, ...]:
+        """
+        LIMIT parameters for _nearest_sql, outermost scan first.
+        
+        Binary mode scans at least `limit` candidates before reranking.
+        """
+        if settings.binary_rerank_candidates > 0:
+            return (max(settings.binary_rerank_candidates, limit), limit)
+        return (limit,)
+    
+    @staticmethod
+    def _nearest_sql(query: str) -> str:
+        """
+        Index-ordered nearest-neighbour scan for one query vector.
+        
+        `query` is a column reference of type vector (it appears several
+        times, so callers bind the vector once in an outer FROM); the only
+        placeholders are the LIMITs from _scan_limits. By default the
+        scan uses the inner-product halfvec index (migration 004). With
+        binary_rerank_candidates set, it walks the 1-bit index
+        (optional migration 005) by Hamming distance and reranks the candidates
+        at full precision.
+        
+        Args:
+            query: SQL expression for the query vector
+            
+        Returns:
+            Subquery yielding id, content, metadata and similarity
+        """
+        dim = settings.embedding_dimension
+        
+        if settings.binary_rerank_candidates > 0:
+            return f"""
+                SELECT 
+                    id,
+                    content,
+                    metadata,
+                    (embedding <#> {query}) * -1 as similarity
+                FROM (
+                    SELECT id, content, metadata, embedding
+                    FROM embeddings
+                    ORDER BY binary_quantize(embedding)::bit({dim}) <~> binary_quantize({query})
+                    LIMIT %s
+                ) candidates
+                ORDER BY similarity DESC
+                LIMIT %s
+            """
+        
+        return f"""
+                SELECT 
+                    id,
+                    content,
+                    metadata,
+                    (embedding <#> {query}) * -1 as similarity
+                FROM embeddings
+                ORDER BY embedding::halfvec({dim}) <#> {query}::halfvec({dim})
+                LIMIT %s
+            """
+    
+    def find_by_ids(self, embedding_ids: List[int]) -> List[Dict]:
+        """
+        Fetch embeddings by primary key.
+        
+        Args:
+            embedding_ids: IDs to fetch
+            
+        Returns:
+            Matching documents (order not guaranteed)
+        """
+        if not embedding_ids:
+            return []
+        
+        return self.db.execute(
+            "SELECT id, content, metadata FROM embeddings WHERE id = ANY(%s)",
+            (list(embedding_ids),)
+        )
+    
     def delete(self, embedding_id: int) -> None:
         """
         Delete embedding by ID.
@@ -222,12 +588,23 @@ class EmbeddingService:
     
     Orchestrates embedding generation and storage.
     Depends on abstractions (protocols), not concrete implementations.
+    
+    When a Redis client is provided, query embeddings are cached so
+    repeated questions skip the embedding API call, and nearest-neighbour
+    results are cached as (id, similarity) pairs so repeated queries only
+    need a primary-key lookup instead of a full KNN search.
+    
+    Provider, repository and cache clients are blocking, so every call
+    into them runs in a worker thread to keep the event loop free.
     """
     
+    KNN_CACHE_TTL = 600  # 10 minutes
+    
     def __init__(
         self,
         provider: EmbeddingProvider = None,
-        repository: EmbeddingRepository = None
+        repository: EmbeddingRepository = None,
+        cache: Optional[redis.Redis] = None
     ):
         """
         Initialize service with dependency injection.
@@ -235,9 +612,11 @@ class EmbeddingService:
         Args:
             provider: Embedding provider (uses Gemini if not provided)
             repository: Storage repository (uses PostgreSQL if not provided)
+            cache: Optional Redis client for query embedding and KNN result caching
         """
         self.provider = provider or GeminiEmbeddingProvider()
         self.repository = repository or PostgreSQLEmbeddingRepository()
+        self.cache = cache
     
     async def ingest(
         self, 
@@ -255,10 +634,11 @@ class EmbeddingService:
             ID of stored embedding
         """
         # Generate embedding
-        embedding = self.provider.generate_embedding(content)
+        embedding = await asyncio.to_thread(self.provider.generate_embedding, content)
         
         # Save to repository
-        embedding_id = self.repository.save(
+        embedding_id = await asyncio.to_thread(
+            self.repository.save,
             content=content,
             embedding=embedding,
             metadata=metadata or {}
@@ -266,6 +646,28 @@ class EmbeddingService:
         
         return embedding_id
     
+    async def ingest_many(self, items: List[Tuple[str, Dict]]) -> List[int]:
+        """
+        Ingest several documents with one embedding request and one INSERT.
+        
+        Args:
+            items: (content, metadata) tuples
+            
+        Returns:
+            IDs of stored embeddings, in input order
+        """
+        if not items:
+            return []
+        
+        embeddings = await asyncio.to_thread(
+            self.provider.generate_embeddings, [content for content, _ in items]
+        )
+        
+        return await asyncio.to_thread(self.repository.save_many, [
+            (content, embedding, metadata or {})
+            for (content, metadata), embedding in zip(items, embeddings)
+        ])
+    
     async def search_similar(
         self,
         query: str,
@@ -284,17 +686,196 @@ class EmbeddingService:
             List of similar documents
         """
         # Generate query embedding
-        query_embedding = self.provider.generate_embedding(query, task_type="retrieval_query")
+        query_embedding = await self.embed_query(query)
         
         # Search in repository
+        return await self.search_by_embedding(
+            query_embedding=query_embedding,
+            limit=limit,
+            threshold=threshold,
+            query_text=query
+        )
+    
+    async def search_similar_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        threshold: float = 0.7
+    ) -> List[List[Dict]]:
+        """
+        Search for several queries with one embedding request and one query.
+        
+        Args:
+            queries: Search queries
+            limit: Maximum results per query
+            threshold: Minimum similarity
+            
+        Returns:
+            One list of similar documents per query, in input order
+        """
+        if not queries:
+            return []
+        
+        query_embeddings = await asyncio.to_thread(
+            self.provider.generate_embeddings, queries, task_type="retrieval_query"
+        )
+        
+        return await asyncio.to_thread(
+            self.repository.find_similar_batch,
+            query_embeddings=query_embeddings,
+            limit=limit,
+            threshold=threshold
+        )
+    
+    async def embed_query(self, query: str) -> Embedding:
+        """
+        Generate the retrieval embedding for a search query.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Query embedding vector
+        """
+        return await asyncio.to_thread(self._embed_query_sync, query)
+    
+    def _embed_query_sync(self, query: str) -> Embedding:
+        """Blocking body of embed_query (cache lookup, provider call, cache fill)"""
+        if self.cache is None:
+            return self.provider.generate_embedding(query, task_type="retrieval_query")
+        
+        cache_key = self._query_cache_key(query)
+        try:
+            cached = self.cache.get(cache_key)
+        except redis.RedisError:
+            cached = None
+        
+        if cached is not None:
+            return np.frombuffer(cached, dtype=np.float32)
+        
+        embedding = self.provider.generate_embedding(query, task_type="retrieval_query")
+        
+        try:
+            self.cache.setex(
+                cache_key,
+                settings.embedding_cache_ttl,
+                np.asarray(embedding, dtype=np.float32).tobytes()
+            )
+        except redis.RedisError:
+            pass  # Caching is best-effort
+        
+        return embedding
+    
+    def _query_cache_key(self, query: str) -> str:
+        """
+        Build the query embedding cache key.
+        
+        Queries are NFKC-normalized, case-folded and whitespace-collapsed
+        so trivially different spellings share an entry; the model name
+        keeps vectors from different embedding models apart.
+        """
+        normalized = " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+        model = getattr(self.provider, "model_name", type(self.provider).__name__)
+        digest = hashlib.sha256(f"{model}\0{normalized}".encode()).hexdigest()
+        return f"qemb:{digest}"
+    
+    async def search_by_embedding(
+        self,
+        query_embedding: Embedding,
+        limit: int = 5,
+        threshold: float = 0.7,
+        query_text: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Search for similar content using a precomputed query embedding.
+        
+        When query_text is given and settings.hybrid_text_weight is set,
+        full-text matches are blended in (see find_hybrid); those results
+        are not cached.
+        
+        Args:
+            query_embedding: Query vector (see embed_query)
+            limit: Maximum results
+            threshold: Minimum similarity
+            query_text: Original query text, enables hybrid retrieval
+            
+        Returns:
+            List of similar documents
+        """
+        return await asyncio.to_thread(
+            self._search_by_embedding_sync, query_embedding, limit, threshold, query_text
+        )
+    
+    def _search_by_embedding_sync(
+        self,
+        query_embedding: Embedding,
+        limit: int,
+        threshold: float,
+        query_text: Optional[str]
+    ) -> List[Dict]:
+        """Blocking body of search_by_embedding"""
+        if query_text and settings.hybrid_text_weight > 0:
+            return self.repository.find_hybrid(
+                query_embedding=query_embedding,
+                query_text=query_text,
+                limit=limit,
+                threshold=threshold,
+                text_weight=settings.hybrid_text_weight
+            )
+        
+        if self.cache is None:
+            return self.repository.find_similar(
+                query_embedding=query_embedding,
+                limit=limit,
+                threshold=threshold
+            )
+        
+        cache_key = self._knn_cache_key(query_embedding, limit, threshold)
+        try:
+            cached = self.cache.get(cache_key)
+        except redis.RedisError:
+            cached = None
+        
+        if cached is not None:
+            hits = orjson.loads(cached)
+            rows = {row["id"]: row for row in self.repository.find_by_ids([i for i, _ in hits])}
+            if len(rows) == len(hits):
+                return [
+                    {**rows[embedding_id], "similarity": similarity}
+                    for embedding_id, similarity in hits
+                ]
+            # Cached ids were deleted or re-ingested: search again and overwrite the entry
+        
         results = self.repository.find_similar(
             query_embedding=query_embedding,
             limit=limit,
             threshold=threshold
         )
         
+        try:
+            self.cache.setex(
+                cache_key,
+                self.KNN_CACHE_TTL,
+                orjson.dumps([[row["id"], float(row["similarity"])] for row in results])
+            )
+        except redis.RedisError:
+            pass  # Caching is best-effort
+        
         return results
     
+    @staticmethod
+    def _knn_cache_key(query_embedding: Embedding, limit: int, threshold: float) -> str:
+        """
+        Build the KNN cache key.
+        
+        The embedding is quantized to int8 before hashing so near-identical
+        queries share a key.
+        """
+        scaled = np.asarray(query_embedding, dtype=np.float32) * 127
+        quantized = np.clip(np.rint(scaled), -127, 127).astype(np.int8)
+        digest = hashlib.blake2b(quantized.tobytes(), digest_size=16).hexdigest()
+        return f"knn:{digest}:{limit}:{threshold:g}"
+    
     async def delete_embedding(self, embedding_id: int) -> None:
         """
         Delete embedding.
@@ -302,4 +883,4 @@ class EmbeddingService:
         Args:
             embedding_id: ID to delete
         """
-        self.repository.delete(embedding_id)
+        await asyncio.to_thread(self.repository.delete, embedding_id)
@@ -6,8 +6,11 @@ Provides:
 - Base provider interface
 - Common utilities
 """
+import asyncio
 import httpx
-from typing import Optional
+from typing import Optional, Iterable, AsyncIterator, TypeVar
+
+T = TypeVar("T")
 
 # Singleton async HTTP client
 _http_client: Optional[httpx.AsyncClient] = None
@@ -35,3 +38,18 @@ async def close_http_client():
     if _http_client:
         await _http_client.aclose()
         _http_client = None
+
+
+async def iterate_in_thread(iterable: Iterable[T]) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterator (e.g. a sync SDK stream) without blocking the event loop.
+    
+    Each next() call runs in a worker thread.
+    """
+    iterator = iter(iterable)
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, done)
+        if item is done:
+            return
+        yield item
@@ -6,11 +6,12 @@ Production-ready wrapper for Google Gemini API with:
 - Retry logic via tenacity
 - Structured logging
 """
-import google.generativeai as genai
-from typing import Optional
+from typing import Optional, AsyncIterator
+import asyncio
 import logging
 
 from app.rag.router import LLMProvider
+from app.rag.providers import iterate_in_thread
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,8 @@ class GeminiLLMProvider(LLMProvider):
     - Structured error logging
     """
     
+    name = "gemini"
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -34,7 +37,8 @@ class GeminiLLMProvider(LLMProvider):
         self.api_key = api_key or settings.gemini_api_key
         self.model_name = model_name or settings.chat_model
         
-        # Configure Gemini
+        # Configure Gemini (SDK imported lazily, it dominates cold-start time)
+        import google.generativeai as genai
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel(self.model_name)
     
@@ -67,6 +71,52 @@ class GeminiLLMProvider(LLMProvider):
             })
             raise
     
-    @property
-    def name(self) -> str:
-        return "gemini"
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Generate response using Gemini's async API.
+        
+        Raises:
+            Exception: On API errors (caught by router for fallback)
+        """
+        try:
+            response = await self.model.generate_content_async(prompt)
+            
+            # Check if response was blocked
+            if not response.text:
+                if hasattr(response, 'prompt_feedback'):
+                    logger.warning(f"Gemini blocked response: {response.prompt_feedback}")
+                raise ValueError("Gemini returned empty response")
+            
+            return response.text
+            
+        except Exception as e:
+            logger.error({
+                "event": "gemini_error",
+                "error_type": type(e).__name__,
+                "error": str(e),
+                "model": self.model_name
+            })
+            raise
+    
+    async def generate_response_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream response chunks using Gemini's streaming API.
+        
+        Raises:
+            Exception: On API errors (caught by router for fallback)
+        """
+        try:
+            response = await asyncio.to_thread(
+                self.model.generate_content, prompt, stream=True
+            )
+            async for chunk in iterate_in_thread(response):
+                if chunk.parts:
+                    yield chunk.text
+        except Exception as e:
+            logger.error({
+                "event": "gemini_stream_error",
+                "error_type": type(e).__name__,
+                "error": str(e),
+                "model": self.model_name
+            })
+            raise
@@ -6,9 +6,9 @@ Production-ready wrapper for Groq API (Llama 3) with:
 - Structured logging
 - Fallback-optimized configuration
 """
-from groq import Groq
-from typing import Optional
+from typing import Optional, AsyncIterator, List, Dict
 import logging
+import orjson
 
 from app.rag.router import LLMProvider
 from app.config import settings
@@ -16,6 +16,28 @@ from app.config import settings
 logger = logging.getLogger(__name__)
 
 
+def _parse_stream_line(line: str) -> Optional[str]:
+    """
+    Extract the content delta from one SSE line of a streamed completion.
+    
+    Raises:
+        RuntimeError: If the stream carries an error event
+    """
+    if not line.startswith("data:"):
+        return None
+    
+    payload = line[5:].strip()
+    if payload == "[DONE]":
+        return None
+    
+    chunk = orjson.loads(payload)
+    if "error" in chunk:
+        raise RuntimeError(chunk["error"].get("message", "Groq stream error"))
+    
+    choices = chunk.get("choices")
+    return choices[0].get("delta", {}).get("content") if choices else None
+
+
 class GroqLLMProvider(LLMProvider):
     """
     Groq/Llama3 provider for fast, reliable fallback.
@@ -26,6 +48,8 @@ class GroqLLMProvider(LLMProvider):
     - Good for backup scenarios
     """
     
+    name = "groq"
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -37,8 +61,12 @@ class GroqLLMProvider(LLMProvider):
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not configured")
         
-        # Initialize Groq client
+        # Initialize Groq clients (sync for legacy callers, async for the router).
+        # Imported lazily so workers that never hit the fallback skip the SDK.
+        from groq import Groq, AsyncGroq
+        
         self.client = Groq(api_key=self.api_key)
+        self.aclient = AsyncGroq(api_key=self.api_key)
     
     def generate_response(self, prompt: str) -> str:
         """
@@ -49,16 +77,7 @@ class GroqLLMProvider(LLMProvider):
         """
         try:
             chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un asistente profesional y servicial. Responde en español de forma clara y concisa."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._build_messages(prompt),
                 model=self.model_name,
                 temperature=0.7,
                 max_tokens=1024
@@ -81,6 +100,77 @@ class GroqLLMProvider(LLMProvider):
             })
             raise
     
-    @property
-    def name(self) -> str:
-        return "groq"
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Generate response using Groq's async client.
+        
+        Raises:
+            Exception: On API errors (caught by router)
+        """
+        try:
+            # Raw response: we only need one string, so skip the SDK's model validation
+            raw = await self.aclient.chat.completions.with_raw_response.create(
+                messages=self._build_messages(prompt),
+                model=self.model_name,
+                temperature=0.7,
+                max_tokens=1024
+            )
+            
+            data = orjson.loads(await raw.read())
+            response_text = data["choices"][0]["message"]["content"]
+            
+            if not response_text:
+                raise ValueError("Groq returned empty response")
+            
+            return response_text
+            
+        except Exception as e:
+            logger.error({
+                "event": "groq_error",
+                "error_type": type(e).__name__,
+                "error": str(e),
+                "model": self.model_name
+            })
+            raise
+    
+    async def generate_response_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream response chunks using Groq's streaming API.
+        
+        Raises:
+            Exception: On API errors (caught by router)
+        """
+        try:
+            # Parse the SSE lines directly instead of building a model per chunk
+            async with self.aclient.chat.completions.with_streaming_response.create(
+                messages=self._build_messages(prompt),
+                model=self.model_name,
+                temperature=0.7,
+                max_tokens=1024,
+                stream=True
+            ) as response:
+                async for line in response.iter_lines():
+                    delta = _parse_stream_line(line)
+                    if delta:
+                        yield delta
+        except Exception as e:
+            logger.error({
+                "event": "groq_stream_error",
+                "error_type": type(e).__name__,
+                "error": str(e),
+                "model": self.model_name
+            })
+            raise
+    
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Build chat messages for the completion request"""
+        return [
+            {
+                "role": "system",
+                "content": "Eres un asistente profesional y servicial. Responde en español de forma clara y concisa."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
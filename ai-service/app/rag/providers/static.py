@@ -12,6 +12,35 @@ from app.rag.router import LLMProvider
 logger = logging.getLogger(__name__)
 
 
+NO_RESULTS_MESSAGE = (
+    "⚠️ **Sistema en Modo de Emergencia**\n\n"
+    "Actualmente no puedo procesar tu consulta debido a problemas técnicos temporales. "
+    "Por favor:\n\n"
+    "1. Intenta reformular tu pregunta\n"
+    "2. Vuelve a intentarlo en unos minutos\n"
+    "3. Contacta directamente si es urgente\n\n"
+    "_Disculpa las molestias. Estamos trabajando para restaurar el servicio._"
+)
+
+_RESULTS_HEADER = (
+    "📚 **Información Relevante Encontrada:**\n\n"
+    "_(Nota: Respuesta generada sin IA debido a problemas técnicos)_\n"
+)
+
+_RESULTS_FOOTER = "\n💡 _Para una respuesta más elaborada, por favor intenta de nuevo en unos minutos._"
+
+
+def _format_fragment(idx: int, result: Dict) -> str:
+    """Format one search result, truncating long content"""
+    content = result.get('content', '').strip()
+    similarity = result.get('similarity', 0)
+    
+    if len(content) > 200:
+        content = content[:200] + "..."
+    
+    return f"\n**{idx}. Fragmento Relevante** (Similitud: {similarity:.0%})\n{content}\n"
+
+
 class StaticFallbackProvider(LLMProvider):
     """
     Static response provider for when all LLMs fail.
@@ -20,6 +49,8 @@ class StaticFallbackProvider(LLMProvider):
     This ensures we NEVER return a 500 error to the user.
     """
     
+    name = "static_fallback"
+    
     def __init__(self, search_results: Optional[List[Dict]] = None):
         self.search_results = search_results or []
     
@@ -34,40 +65,13 @@ class StaticFallbackProvider(LLMProvider):
             return self._get_no_results_message()
         
         # Format search results as a readable response
-        response_parts = [
-            "📚 **Información Relevante Encontrada:**\n",
-            "_(Nota: Respuesta generada sin IA debido a problemas técnicos)_\n"
-        ]
-        
-        for idx, result in enumerate(self.search_results[:3], 1):
-            content = result.get('content', '').strip()
-            similarity = result.get('similarity', 0)
-            
-            # Truncate long content
-            if len(content) > 200:
-                content = content[:200] + "..."
-            
-            response_parts.append(f"\n**{idx}. Fragmento Relevante** (Similitud: {similarity:.0%})")
-            response_parts.append(f"{content}\n")
-        
-        response_parts.append(
-            "\n💡 _Para una respuesta más elaborada, por favor intenta de nuevo en unos minutos._"
+        fragments = "\n".join(
+            _format_fragment(idx, result)
+            for idx, result in enumerate(self.search_results[:3], 1)
         )
         
-        return "\n".join(response_parts)
+        return f"{_RESULTS_HEADER}\n{fragments}\n{_RESULTS_FOOTER}"
     
     def _get_no_results_message(self) -> str:
         """Message when no search results available"""
-        return (
-            "⚠️ **Sistema en Modo de Emergencia**\n\n"
-            "Actualmente no puedo procesar tu consulta debido a problemas técnicos temporales. "
-            "Por favor:\n\n"
-            "1. Intenta reformular tu pregunta\n"
-            "2. Vuelve a intentarlo en unos minutos\n"
-            "3. Contacta directamente si es urgente\n\n"
-            "_Disculpa las molestias. Estamos trabajando para restaurar el servicio._"
-        )
-    
-    @property
-    def name(self) -> str:
-        return "static_fallback"
+        return NO_RESULTS_MESSAGE
@@ -12,26 +12,91 @@ Architecture:
     Layer 2: Groq/Llama3 (Reliable Backup)
     Layer 3: Static Response (Always Available)
 """
-from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple, Deque, Protocol, runtime_checkable
 from enum import Enum
+from collections import defaultdict, deque
+import asyncio
+import random
 import time
 import logging
 import json
+import hashlib
+import weakref
+import orjson
 from datetime import datetime, timedelta
 
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-    before_sleep_log
+    stop_after_delay,
+    wait_exponential_jitter,
+    retry_if_exception,
+    before_sleep_log,
+    RetryCallState
 )
 import redis
+import redis.asyncio as aioredis
+
+from app.monitoring import metrics
 
 # Configure structured logging
 logger = logging.getLogger(__name__)
 
+# HTTP statuses worth retrying on the same provider before falling back
+TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_AFTER_S = 10.0  # Cap on server-requested Retry-After waits
+RETRY_DEADLINE_S = 10.0  # No retry of a provider starts later than this after the first attempt
+
+_backoff = wait_exponential_jitter(initial=0.5, max=4, jitter=0.5)
+
+
+def _is_transient(error: BaseException) -> bool:
+    """
+    Check whether an LLM call error is worth retrying.
+    
+    Covers network errors plus rate limits and 5xx responses, whether
+    exposed as `status_code` (Groq SDK) or `code` (google.api_core).
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return isinstance(status, int) and status in TRANSIENT_STATUS_CODES
+
+
+def _retry_after(error: Optional[BaseException]) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if the error carries one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return min(max(float(headers.get("retry-after")), 0.0), MAX_RETRY_AFTER_S)
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait_for_retry(retry_state: RetryCallState) -> float:
+    """
+    Honour Retry-After when present, otherwise jittered exponential backoff.
+    
+    Never waits past RETRY_DEADLINE_S, so a long Retry-After or backoff
+    cannot hold the request beyond the retry budget.
+    """
+    retry_after = _retry_after(retry_state.outcome.exception())
+    wait = retry_after if retry_after is not None else _backoff(retry_state)
+    remaining = RETRY_DEADLINE_S - (retry_state.seconds_since_start or 0.0)
+    return max(0.0, min(wait, remaining))
+
+
+# Built once at import; served on every request during a full provider outage
+STATIC_FALLBACK_MESSAGE = (
+    "⚠️ **Disculpa las molestias técnicas**\n\n"
+    "Estoy experimentando dificultades temporales con mis sistemas de IA. "
+    "Por favor, intenta reformular tu pregunta o vuelve en unos minutos. "
+    "Si necesitas asistencia urgente, contacta directamente con el equipo.\n\n"
+    "_Sistema de respaldo activado_"
+)
+
 
 class CircuitState(Enum):
     """Circuit breaker states"""
@@ -40,22 +105,39 @@ class CircuitState(Enum):
     HALF_OPEN = "HALF_OPEN"  # Testing if provider recovered
 
 
-class LLMProvider(ABC):
+@runtime_checkable
+class LLMProvider(Protocol):
     """
     Protocol for LLM providers.
     All providers must implement this interface.
+    
+    Attributes:
+        name: Provider identifier for logging (plain class attribute)
     """
     
-    @abstractmethod
+    name: str
+    
     def generate_response(self, prompt: str) -> str:
         """Generate text response from prompt"""
-        pass
+        ...
     
-    @property
-    @abstractmethod
-    def name(self) -> str:
-        """Provider identifier for logging"""
-        pass
+    async def agenerate_response(self, prompt: str) -> str:
+        """
+        Generate text response from prompt without blocking the event loop.
+        
+        Default implementation runs the sync call in a worker thread;
+        providers with an async SDK should override it.
+        """
+        return await asyncio.to_thread(self.generate_response, prompt)
+    
+    async def generate_response_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream text response chunks from prompt.
+        
+        Default implementation yields the full response as a single chunk;
+        providers with native streaming should override it.
+        """
+        yield await asyncio.to_thread(self.generate_response, prompt)
 
 
 class CircuitBreaker:
@@ -71,93 +153,374 @@ class CircuitBreaker:
         llm:{provider}:failures - Failure counter (TTL 5min)
         llm:{provider}:circuit_state - Current state
         llm:{provider}:opened_at - Timestamp when circuit opened
+        llm:{provider}:recovered_at - Timestamp when circuit closed after HALF_OPEN
+    
+    After recovering, a provider's share of traffic ramps up over
+    RECOVERY_RAMP seconds (see admit_during_recovery).
+    
+    If Redis becomes unreachable the breaker keeps working on a
+    process-local store, starting from the last state it observed, and
+    only retries Redis after DEGRADED_DURATION.
     """
     
     FAILURE_THRESHOLD = 5  # Failures to trip circuit
     FAILURE_WINDOW = 300   # 5 minutes
     OPEN_DURATION = 120    # 2 minutes before retry
+    STATE_CACHE_TTL = 1.0  # Seconds a worker trusts its last observed state
+    DEGRADED_DURATION = 30.0  # Seconds to stay on the local store after a Redis error
+    RECOVERY_RAMP = 30  # Seconds for a recovered provider to return to full traffic
+    RECOVERY_MIN_SHARE = 0.1  # Traffic share right after recovery
+    
+    # Count a failure and, on reaching the threshold, open the circuit in one
+    # atomic step. The state is only written if it is not already OPEN, so
+    # concurrent failures past the threshold do not keep re-stamping opened_at.
+    FAILURE_SCRIPT = """
+        local failures = redis.call('INCR', KEYS[1])
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        if failures >= tonumber(ARGV[1]) and redis.call('GET', KEYS[2]) ~= ARGV[3] then
+            redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[4])
+            redis.call('SET', KEYS[3], ARGV[5], 'EX', ARGV[4])
+            return {failures, 1}
+        end
+        return {failures, 0}
+    """
+    STATE_TTL = 600  # 10min TTL on state keys
+    
+    # Breakers shared per Redis client, so the state cache outlives the
+    # per-request routers that use it
+    _shared: "weakref.WeakKeyDictionary[aioredis.Redis, Dict[str, CircuitBreaker]]" = weakref.WeakKeyDictionary()
     
-    def __init__(self, redis_client: redis.Redis, provider_name: str):
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        provider_name: str,
+        state_cache_ttl: Optional[float] = None
+    ):
         self.redis = redis_client
         self.provider = provider_name
         self.failure_key = f"llm:{provider_name}:failures"
         self.state_key = f"llm:{provider_name}:circuit_state"
         self.opened_key = f"llm:{provider_name}:opened_at"
+        self.recovered_key = f"llm:{provider_name}:recovered_at"
+        self.state_cache_ttl = self.STATE_CACHE_TTL if state_cache_ttl is None else state_cache_ttl
+        self._state_cache: Optional[Tuple[CircuitState, float]] = None
+        self._recovered_at: Optional[float] = None  # Wall clock, shared across workers
+        self._failure_script = redis_client.register_script(self.FAILURE_SCRIPT)
+        
+        # Process-local store, authoritative while Redis is unreachable
+        self._degraded_until = 0.0
+        self._local_state = CircuitState.CLOSED
+        self._local_opened_at = 0.0
+        self._local_failures: Deque[float] = deque(maxlen=self.FAILURE_THRESHOLD)
     
-    def get_state(self) -> CircuitState:
-        """Get current circuit state"""
+    @classmethod
+    def shared(cls, redis_client: aioredis.Redis, provider_name: str) -> "CircuitBreaker":
+        """
+        Get the process-wide breaker for a provider on a Redis client.
+        
+        Routers are built per request; sharing the breaker lets the
+        in-process state cache serve every request in the worker instead
+        of costing each one a Redis read.
+        """
+        breakers = cls._shared.setdefault(redis_client, {})
+        breaker = breakers.get(provider_name)
+        if breaker is None:
+            breaker = breakers[provider_name] = cls(redis_client, provider_name)
+        return breaker
+    
+    def _cache_state(self, state: CircuitState) -> CircuitState:
+        """Remember state in-process until the cache TTL expires"""
+        now = time.monotonic()
+        self._state_cache = (state, now + self.state_cache_ttl)
+        
+        # Mirror into the local store so a failover starts from it
+        if state == CircuitState.OPEN and self._local_state != CircuitState.OPEN:
+            self._local_opened_at = now
+        self._local_state = state
+        return state
+    
+    @property
+    def degraded(self) -> bool:
+        """True while Redis is bypassed in favour of the local store"""
+        return time.monotonic() < self._degraded_until
+    
+    def _degrade(self, error: Exception) -> None:
+        """Switch to the local store for DEGRADED_DURATION"""
+        if not self.degraded:
+            metrics.increment(f"llm.{self.provider}.circuit_store_degraded")
+            logger.warning({
+                "event": "circuit_store_degraded",
+                "provider": self.provider,
+                "error": str(error),
+                "retry_in_s": self.DEGRADED_DURATION
+            })
+        self._degraded_until = time.monotonic() + self.DEGRADED_DURATION
+    
+    def _set_local_state(self, state: CircuitState) -> None:
+        """Transition the local store and refresh the cache"""
+        metrics.increment(f"llm.{self.provider}.circuit_{state.value.lower()}")
+        self._cache_state(state)
+    
+    def _local_get_state(self) -> CircuitState:
+        """Current state from the local store, applying the OPEN cooldown"""
+        if (
+            self._local_state == CircuitState.OPEN
+            and time.monotonic() - self._local_opened_at >= self.OPEN_DURATION
+        ):
+            self._set_local_state(CircuitState.HALF_OPEN)
+        return self._local_state
+    
+    def _local_record_failure(self) -> Tuple[int, bool]:
+        """Count a failure locally; returns (failures in window, should open)"""
+        now = time.monotonic()
+        failures = self._local_failures
+        failures.append(now)
+        while failures and now - failures[0] >= self.FAILURE_WINDOW:
+            failures.popleft()
+        should_open = (
+            len(failures) >= self.FAILURE_THRESHOLD
+            and self._local_state != CircuitState.OPEN
+        )
+        return len(failures), should_open
+    
+    async def get_state(self) -> CircuitState:
+        """
+        Get current circuit state.
+        
+        Served from the in-process cache while fresh, so the steady CLOSED
+        path does not hit Redis on every request. The short TTL keeps OPEN
+        transitions from other workers visible within about a second.
+        """
+        if self._state_cache and time.monotonic() < self._state_cache[1]:
+            return self._state_cache[0]
+        
+        if self.degraded:
+            return self._local_get_state()
+        
         try:
-            state_str = self.redis.get(self.state_key)
+            # Fetch state and its timestamps in a single round-trip
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.get(self.state_key)
+            pipe.get(self.opened_key)
+            pipe.get(self.recovered_key)
+            state_str, opened_at, recovered_at = await pipe.execute()
+            self._recovered_at = float(recovered_at.decode()) if recovered_at else None
             if not state_str:
-                return CircuitState.CLOSED
+                return self._cache_state(CircuitState.CLOSED)
             
             state = CircuitState(state_str.decode())
             
             # Check if OPEN circuit should transition to HALF_OPEN
             if state == CircuitState.OPEN:
-                opened_at = self.redis.get(self.opened_key)
                 if opened_at:
                     opened_time = float(opened_at.decode())
-                    if time.time() - opened_time >= self.OPEN_DURATION:
-                        self._set_state(CircuitState.HALF_OPEN)
+                    # Wall clock is shared across workers; clamp backward NTP steps
+                    if max(0.0, time.time() - opened_time) >= self.OPEN_DURATION:
+                        await self._set_state(CircuitState.HALF_OPEN)
                         return CircuitState.HALF_OPEN
             
-            return state
+            return self._cache_state(state)
         except redis.RedisError as e:
-            logger.warning(f"Redis error in circuit breaker, defaulting to CLOSED: {e}")
-            return CircuitState.CLOSED
+            self._degrade(e)
+            return self._local_get_state()
     
-    def _set_state(self, state: CircuitState):
-        """Set circuit state in Redis"""
+    def _queue_state(self, pipe, state: CircuitState) -> None:
+        """Queue a state write on a pipeline and refresh the local cache"""
+        self._cache_state(state)
+        metrics.increment(f"llm.{self.provider}.circuit_{state.value.lower()}")
+        pipe.set(self.state_key, state.value, ex=self.STATE_TTL)
+        if state == CircuitState.OPEN:
+            pipe.set(self.opened_key, str(time.time()), ex=self.STATE_TTL)
+    
+    async def _set_state(self, state: CircuitState):
+        """Set circuit state in Redis and refresh the local cache"""
+        if self.degraded:
+            self._set_local_state(state)
+            return
         try:
-            self.redis.set(self.state_key, state.value, ex=600)  # 10min TTL
-            if state == CircuitState.OPEN:
-                self.redis.set(self.opened_key, str(time.time()), ex=600)
+            pipe = self.redis.pipeline(transaction=False)
+            self._queue_state(pipe, state)
+            await pipe.execute()
         except redis.RedisError as e:
-            logger.error(f"Failed to set circuit state: {e}")
+            self._degrade(e)  # Local store already holds the new state
     
-    def record_success(self):
+    async def record_success(self):
         """Record successful call, reset circuit if needed"""
-        try:
-            current_state = self.get_state()
-            
-            # Reset failures
-            self.redis.delete(self.failure_key)
-            
-            # Close circuit if it was HALF_OPEN
-            if current_state == CircuitState.HALF_OPEN:
-                self._set_state(CircuitState.CLOSED)
-                logger.info({
-                    "event": "circuit_closed",
-                    "provider": self.provider,
-                    "message": "Provider recovered"
-                })
-        except redis.RedisError as e:
-            logger.warning(f"Failed to record success: {e}")
+        current_state = await self.get_state()
+        closing = current_state == CircuitState.HALF_OPEN
+        self._local_failures.clear()
+        
+        if closing:
+            self._recovered_at = time.time()
+        
+        if self.degraded:
+            if closing:
+                self._set_local_state(CircuitState.CLOSED)
+        else:
+            try:
+                # Reset failures and, if HALF_OPEN, close the circuit in one round-trip
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.delete(self.failure_key)
+                if closing:
+                    self._queue_state(pipe, CircuitState.CLOSED)
+                    pipe.set(self.recovered_key, str(self._recovered_at), ex=self.RECOVERY_RAMP)
+                await pipe.execute()
+            except redis.RedisError as e:
+                self._degrade(e)
+        
+        if closing:
+            logger.info({
+                "event": "circuit_closed",
+                "provider": self.provider,
+                "message": "Provider recovered"
+            })
     
-    def record_failure(self):
+    async def record_failure(self):
         """Record failed call, potentially trip circuit"""
-        try:
-            # Increment failure counter
-            failures = self.redis.incr(self.failure_key)
-            self.redis.expire(self.failure_key, self.FAILURE_WINDOW)
-            
-            # Trip circuit if threshold exceeded
-            if failures >= self.FAILURE_THRESHOLD:
-                self._set_state(CircuitState.OPEN)
-                logger.warning({
-                    "event": "circuit_opened",
-                    "provider": self.provider,
-                    "failures": failures,
-                    "message": f"Circuit opened after {failures} failures"
-                })
-        except redis.RedisError as e:
-            logger.error(f"Failed to record failure: {e}")
+        if self.degraded:
+            failures, opened = self._local_record_failure()
+        else:
+            try:
+                # Count the failure and trip the circuit atomically on the server,
+                # so concurrent workers cannot race past the threshold
+                failures, opened = await self._failure_script(
+                    keys=[self.failure_key, self.state_key, self.opened_key],
+                    args=[
+                        self.FAILURE_THRESHOLD,
+                        self.FAILURE_WINDOW,
+                        CircuitState.OPEN.value,
+                        self.STATE_TTL,
+                        str(time.time())
+                    ]
+                )
+            except redis.RedisError as e:
+                self._degrade(e)
+                failures, opened = self._local_record_failure()
+        
+        if opened:
+            self._set_local_state(CircuitState.OPEN)
+            logger.warning({
+                "event": "circuit_opened",
+                "provider": self.provider,
+                "failures": failures,
+                "message": f"Circuit opened after {failures} failures"
+            })
     
-    def can_attempt(self) -> bool:
+    async def can_attempt(self) -> bool:
         """Check if provider can be attempted"""
-        state = self.get_state()
+        state = await self.get_state()
         return state in (CircuitState.CLOSED, CircuitState.HALF_OPEN)
+    
+    def admit_during_recovery(self) -> bool:
+        """
+        Decide whether a call should go to a recently recovered provider.
+        
+        For RECOVERY_RAMP seconds after HALF_OPEN → CLOSED the admitted
+        share grows linearly from RECOVERY_MIN_SHARE to 1, so a provider
+        that just recovered is not hit with full traffic at once. Uses the
+        recovery time seen by the last get_state().
+        """
+        if self._recovered_at is None:
+            return True
+        elapsed = time.time() - self._recovered_at
+        if elapsed >= self.RECOVERY_RAMP:
+            self._recovered_at = None
+            return True
+        share = max(self.RECOVERY_MIN_SHARE, elapsed / self.RECOVERY_RAMP)
+        return random.random() < share
+
+
+# Process-wide call gates and in-flight generations. Routers are created
+# per request, so this state lives at module level to be shared by all of them.
+_provider_slots: Dict[str, asyncio.Semaphore] = {}
+_inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+def _provider_slot(name: str, limit: int) -> asyncio.Semaphore:
+    """Semaphore bounding concurrent calls to one provider"""
+    slot = _provider_slots.get(name)
+    if slot is None:
+        slot = _provider_slots[name] = asyncio.Semaphore(limit)
+    return slot
+
+
+class ProviderMetricsBuffer:
+    """
+    Per-provider request counts and latencies, written to Redis in batches.
+    
+    Successful calls are recorded in-process; the first record after a
+    flush schedules the next one FLUSH_INTERVAL later, so Redis sees one
+    pipeline per interval instead of one per request. If Redis is down the
+    batch is dropped; the buffers are bounded either way.
+    
+    Redis Keys:
+        llm:{provider}:requests - Successful call counter
+        llm:{provider}:latency_ms - Last LATENCY_HISTORY latencies, newest first
+    """
+    
+    FLUSH_INTERVAL = 0.5  # Seconds between batched writes
+    LATENCY_HISTORY = 100
+    
+    def __init__(self, redis_client: aioredis.Redis):
+        self.redis = redis_client
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._latencies: Dict[str, Deque[int]] = defaultdict(self._latency_window)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    @classmethod
+    def _latency_window(cls) -> Deque[int]:
+        return deque(maxlen=cls.LATENCY_HISTORY)
+    
+    def record(self, provider: str, latency_ms: int) -> None:
+        """Buffer one successful call and schedule a flush if none is pending"""
+        self._requests[provider] += 1
+        self._latencies[provider].append(latency_ms)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.FLUSH_INTERVAL, self._start_flush
+            )
+    
+    def _start_flush(self) -> None:
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+    
+    async def flush(self) -> None:
+        """Write buffered metrics to Redis in a single pipeline"""
+        if not self._requests:
+            return
+        requests, latencies = self._requests, self._latencies
+        self._requests = defaultdict(int)
+        self._latencies = defaultdict(self._latency_window)
+        
+        pipe = self.redis.pipeline(transaction=False)
+        for provider, count in requests.items():
+            latency_key = f"llm:{provider}:latency_ms"
+            pipe.incrby(f"llm:{provider}:requests", count)
+            pipe.lpush(latency_key, *latencies[provider])
+            pipe.ltrim(latency_key, 0, self.LATENCY_HISTORY - 1)
+        try:
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning("Dropped buffered provider metrics: %s", e)
+
+
+# One buffer per Redis client, shared by every router in the process
+_metrics_buffers: "weakref.WeakKeyDictionary[aioredis.Redis, ProviderMetricsBuffer]" = weakref.WeakKeyDictionary()
+
+
+def provider_metrics_buffer(redis_client: aioredis.Redis) -> ProviderMetricsBuffer:
+    """Get the process-wide metrics buffer for a Redis client"""
+    buffer = _metrics_buffers.get(redis_client)
+    if buffer is None:
+        buffer = _metrics_buffers[redis_client] = ProviderMetricsBuffer(redis_client)
+    return buffer
+
+
+async def flush_provider_metrics() -> None:
+    """Flush all pending provider metrics, e.g. on shutdown"""
+    for buffer in list(_metrics_buffers.values()):
+        await buffer.flush()
 
 
 class LLMRouter:
@@ -168,6 +531,11 @@ class LLMRouter:
     - Chain of Responsibility: Try providers in order
     - Circuit Breaker: Skip failing providers
     - Exponential Backoff: Retry with increasing delays
+    - Hedged Requests: Race the secondary against a recovering primary,
+      or against any primary call when always_hedge is set
+    - Response Cache: Reuse answers for identical prompts (Redis, 10min)
+    - Request Coalescing: Concurrent identical prompts share one generation
+    - Concurrency Gate: At most MAX_CONCURRENT_CALLS in-flight calls per provider
     - Graceful Degradation: Always return a response
     
     Usage:
@@ -179,69 +547,129 @@ class LLMRouter:
         response = await router.generate(prompt)
     """
     
+    HEDGE_DELAY_S = 0.8  # Wait before racing the secondary against a HALF_OPEN primary
+    RESPONSE_CACHE_TTL = 600  # Seconds a provider answer is reused for an identical prompt
+    RESPONSE_CACHE_MAX_PROMPT = 16000  # Longer prompts are not cached
+    MAX_CONCURRENT_CALLS = 16  # Per provider, across all routers in the process
+    
     def __init__(
         self,
         primary: LLMProvider,
         secondary: Optional[LLMProvider] = None,
-        redis_client: Optional[redis.Redis] = None
+        redis_client: Optional[aioredis.Redis] = None,
+        hedge_delay_s: Optional[float] = None,
+        always_hedge: bool = False
     ):
+        """
+        Args:
+            primary: Provider tried first
+            secondary: Optional backup provider
+            redis_client: Enables circuit breakers and the response cache
+            hedge_delay_s: Wait before racing the secondary against the primary
+            always_hedge: Hedge even while the primary circuit is CLOSED.
+                For latency-critical prompts where a slow-but-healthy primary
+                should not hold up the answer; costs a speculative secondary
+                call whenever the primary is slower than hedge_delay_s.
+        """
         self.primary = primary
         self.secondary = secondary
         self.redis = redis_client
+        self.hedge_delay_s = self.HEDGE_DELAY_S if hedge_delay_s is None else hedge_delay_s
+        self.always_hedge = always_hedge
         
         # Initialize circuit breakers if Redis available
         self.primary_breaker = None
         self.secondary_breaker = None
         
         if redis_client:
-            self.primary_breaker = CircuitBreaker(redis_client, primary.name)
+            self.primary_breaker = CircuitBreaker.shared(redis_client, primary.name)
             if secondary:
-                self.secondary_breaker = CircuitBreaker(redis_client, secondary.name)
+                self.secondary_breaker = CircuitBreaker.shared(redis_client, secondary.name)
     
     @retry(
-        retry=retry_if_exception_type((ConnectionError, TimeoutError)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=4),
-        before_sleep=before_sleep_log(logger, logging.WARNING)
+        retry=retry_if_exception(_is_transient),
+        stop=stop_after_attempt(3) | stop_after_delay(RETRY_DEADLINE_S),
+        wait=_wait_for_retry,
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
     )
-    def _call_provider(self, provider: LLMProvider, prompt: str) -> str:
+    async def _call_provider(self, provider: LLMProvider, prompt: str) -> str:
         """
         Call provider with exponential backoff retry.
-        Only retries on network errors, not API errors.
+        
+        Retries network errors, rate limits and 5xx responses; other API
+        errors fall through to the next provider immediately. The breaker
+        only sees the final outcome, not intermediate retries.
         """
-        start_time = time.time()
-        try:
-            response = provider.generate_response(prompt)
-            latency = int((time.time() - start_time) * 1000)
-            
-            # Log success
+        async with _provider_slot(provider.name, self.MAX_CONCURRENT_CALLS):
+            start_ns = time.monotonic_ns()
+            try:
+                response = await provider.agenerate_response(prompt)
+            except Exception as e:
+                latency = (time.monotonic_ns() - start_ns) // 1_000_000
+                logger.error({
+                    "event": "llm_error",
+                    "provider": provider.name,
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "latency_ms": latency
+                })
+                raise
+            latency = (time.monotonic_ns() - start_ns) // 1_000_000
+        
+        await self._track_success(provider, latency)
+        
+        return response
+    
+    async def _track_success(self, provider: LLMProvider, latency: int) -> None:
+        """Log a successful call and buffer its metrics for Redis"""
+        if logger.isEnabledFor(logging.INFO):
             logger.info({
                 "event": "llm_success",
                 "provider": provider.name,
                 "latency_ms": latency
             })
-            
-            # Track metrics in Redis
-            if self.redis:
-                try:
-                    self.redis.incr(f"llm:{provider.name}:requests")
-                    self.redis.lpush(f"llm:{provider.name}:latency_ms", latency)
-                    self.redis.ltrim(f"llm:{provider.name}:latency_ms", 0, 99)  # Keep last 100
-                except redis.RedisError:
-                    pass  # Don't fail on metrics
-            
-            return response
-            
-        except Exception as e:
-            latency = int((time.time() - start_time) * 1000)
-            logger.error({
-                "event": "llm_error",
-                "provider": provider.name,
-                "error": str(e),
-                "error_type": type(e).__name__,
-                "latency_ms": latency
+        
+        if self.redis:
+            provider_metrics_buffer(self.redis).record(provider.name, latency)
+    
+    async def _providers_to_try(self) -> List[Tuple[str, LLMProvider, Optional[CircuitBreaker]]]:
+        """
+        Build the ordered provider chain, skipping open circuits.
+        
+        While a recovered primary is ramping back up, calls it does not
+        admit try the secondary first and keep the primary as last resort.
+        """
+        providers_to_try = []
+        
+        # Layer 1: Primary (Gemini)
+        if not self.primary_breaker or await self.primary_breaker.can_attempt():
+            providers_to_try.append(("primary", self.primary, self.primary_breaker))
+        else:
+            logger.info({
+                "event": "circuit_open_skip",
+                "provider": self.primary.name,
+                "message": "Skipping primary due to open circuit"
             })
-            raise
+        
+        # Layer 2: Secondary (Groq)
+        if self.secondary:
+            if not self.secondary_breaker or await self.secondary_breaker.can_attempt():
+                providers_to_try.append(("secondary", self.secondary, self.secondary_breaker))
+        
+        if (
+            len(providers_to_try) == 2
+            and self.primary_breaker
+            and not self.primary_breaker.admit_during_recovery()
+        ):
+            providers_to_try.reverse()
+            logger.info({
+                "event": "recovery_ramp_skip",
+                "provider": self.primary.name,
+                "message": "Routing to secondary while primary ramps up"
+            })
+        
+        return providers_to_try
     
     async def generate(
         self,
@@ -259,49 +687,76 @@ class LLMRouter:
                 "metadata": {...}
             }
         """
-        providers_to_try = []
+        cache_key = self._response_cache_key(prompt)
         
-        # Layer 1: Primary (Gemini)
-        if not self.primary_breaker or self.primary_breaker.can_attempt():
-            providers_to_try.append(("primary", self.primary, self.primary_breaker))
-        else:
-            logger.info({
-                "event": "circuit_open_skip",
-                "provider": self.primary.name,
-                "message": "Skipping primary due to open circuit"
-            })
+        cached = await self._get_cached_response(cache_key)
+        if cached is not None:
+            cached["metadata"] = {"cache": "hit", "conversation_id": conversation_id}
+            return cached
         
-        # Layer 2: Secondary (Groq)
-        if self.secondary:
-            if not self.secondary_breaker or self.secondary_breaker.can_attempt():
-                providers_to_try.append(("secondary", self.secondary, self.secondary_breaker))
+        # Identical prompts already being generated share that generation.
+        # The task is shielded so a cancelled caller does not cancel it for
+        # the others.
+        flight_key = hashlib.blake2b(prompt.strip().lower().encode(), digest_size=16).hexdigest()
+        task = _inflight.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_and_cache(prompt, cache_key, conversation_id))
+            _inflight[flight_key] = task
+            task.add_done_callback(lambda _: _inflight.pop(flight_key, None))
+            return await asyncio.shield(task)
+        
+        response = await asyncio.shield(task)
+        return {
+            **response,
+            "metadata": {**response["metadata"], "coalesced": True, "conversation_id": conversation_id}
+        }
+    
+    async def _generate_and_cache(
+        self,
+        prompt: str,
+        cache_key: Optional[str],
+        conversation_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Generate a response and cache it unless it is the static fallback"""
+        response = await self._generate_uncached(prompt, conversation_id)
+        
+        if response["provider"] != "static_fallback":
+            await self._cache_response(cache_key, response)
+        
+        return response
+    
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        conversation_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Route the prompt through the provider chain"""
+        providers_to_try = await self._providers_to_try()
+        
+        if await self._should_hedge(providers_to_try):
+            try:
+                return await self._generate_hedged(prompt, conversation_id, providers_to_try)
+            except Exception as e:
+                return self._static_fallback_response(e, conversation_id)
         
         # Try each provider in order
         last_error = None
         for layer, provider, breaker in providers_to_try:
             try:
-                response_text = self._call_provider(provider, prompt)
+                response_text = await self._call_provider(provider, prompt)
                 
                 # Record success in circuit breaker
                 if breaker:
-                    breaker.record_success()
+                    await breaker.record_success()
                 
-                return {
-                    "text": response_text,
-                    "provider": provider.name,
-                    "fallback_used": layer != "primary",
-                    "metadata": {
-                        "layer": layer,
-                        "conversation_id": conversation_id
-                    }
-                }
+                return self._build_response(layer, provider, response_text, conversation_id)
                 
             except Exception as e:
                 last_error = e
                 
                 # Record failure in circuit breaker
                 if breaker:
-                    breaker.record_failure()
+                    await breaker.record_failure()
                 
                 # Log fallback attempt
                 logger.warning({
@@ -314,6 +769,151 @@ class LLMRouter:
                 continue  # Try next provider
         
         # Layer 3: All providers failed, return static fallback
+        return self._static_fallback_response(last_error, conversation_id)
+    
+    def _response_cache_key(self, prompt: str) -> Optional[str]:
+        """Redis key for a normalized prompt, or None if it should not be cached"""
+        if not self.redis or len(prompt) > self.RESPONSE_CACHE_MAX_PROMPT:
+            return None
+        digest = hashlib.blake2b(prompt.strip().lower().encode(), digest_size=16).hexdigest()
+        return f"llm:cache:{digest}"
+    
+    async def _get_cached_response(self, cache_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a cached response, ignoring cache errors"""
+        if cache_key is None:
+            return None
+        try:
+            payload = await self.redis.get(cache_key)
+        except redis.RedisError:
+            return None
+        return orjson.loads(payload) if payload else None
+    
+    async def _cache_response(self, cache_key: Optional[str], response: Dict[str, Any]) -> None:
+        """Store a provider response, ignoring cache errors"""
+        if cache_key is None:
+            return
+        payload = orjson.dumps({
+            "text": response["text"],
+            "provider": response["provider"],
+            "fallback_used": response["fallback_used"]
+        })
+        try:
+            await self.redis.setex(cache_key, self.RESPONSE_CACHE_TTL, payload)
+        except redis.RedisError:
+            pass  # Don't fail on caching
+    
+    async def _should_hedge(
+        self,
+        providers_to_try: List[Tuple[str, LLMProvider, Optional[CircuitBreaker]]]
+    ) -> bool:
+        """
+        Hedge while the primary is recovering (HALF_OPEN), or always when
+        always_hedge is set.
+        
+        By default the secondary is never called speculatively in steady
+        state, so hedging does not double provider cost.
+        """
+        if len(providers_to_try) != 2 or providers_to_try[0][0] != "primary":
+            return False
+        if self.always_hedge:
+            return True
+        return (
+            self.primary_breaker is not None
+            and await self.primary_breaker.get_state() == CircuitState.HALF_OPEN
+        )
+    
+    async def _generate_hedged(
+        self,
+        prompt: str,
+        conversation_id: Optional[str],
+        providers_to_try: List[Tuple[str, LLMProvider, Optional[CircuitBreaker]]]
+    ) -> Dict[str, Any]:
+        """
+        Race primary and secondary, returning the first successful answer.
+        
+        The primary is dispatched immediately; the secondary is started once
+        the primary fails or has not answered within hedge_delay_s. The
+        losing call is cancelled.
+        
+        Raises:
+            Exception: The last provider error if both providers fail
+        """
+        primary_entry, secondary_entry = providers_to_try
+        tasks = {
+            asyncio.create_task(self._call_provider(primary_entry[1], prompt)): primary_entry
+        }
+        pending = set(tasks)
+        hedged = False
+        
+        done, pending = await asyncio.wait(pending, timeout=self.hedge_delay_s)
+        last_error = None
+        
+        try:
+            while True:
+                # Prefer the primary if both finished in the same tick
+                for task in sorted(done, key=lambda t: tasks[t][0] != "primary"):
+                    layer, provider, breaker = tasks[task]
+                    try:
+                        response_text = task.result()
+                    except Exception as e:
+                        last_error = e
+                        if breaker:
+                            await breaker.record_failure()
+                        logger.warning({
+                            "event": "llm_fallback",
+                            "from_provider": provider.name,
+                            "error": str(e),
+                            "hedged": True
+                        })
+                        continue
+                    
+                    if breaker:
+                        await breaker.record_success()
+                    return self._build_response(layer, provider, response_text, conversation_id)
+                
+                if not hedged:
+                    hedged = True
+                    logger.info({
+                        "event": "llm_hedge",
+                        "provider": secondary_entry[1].name,
+                        "delay_s": self.hedge_delay_s
+                    })
+                    task = asyncio.create_task(self._call_provider(secondary_entry[1], prompt))
+                    tasks[task] = secondary_entry
+                    pending.add(task)
+                
+                if not pending:
+                    raise last_error
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _build_response(
+        self,
+        layer: str,
+        provider: LLMProvider,
+        response_text: str,
+        conversation_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build the router response for a successful provider call"""
+        return {
+            "text": response_text,
+            "provider": provider.name,
+            "fallback_used": layer != "primary",
+            "metadata": {
+                "layer": layer,
+                "conversation_id": conversation_id
+            }
+        }
+    
+    def _static_fallback_response(
+        self,
+        last_error: Optional[Exception],
+        conversation_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build the static fallback response after all providers failed"""
         logger.error({
             "event": "all_llm_failed",
             "last_error": str(last_error),
@@ -331,15 +931,85 @@ class LLMRouter:
             }
         }
     
+    async def generate_stream(
+        self,
+        prompt: str,
+        conversation_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream response chunks with automatic fallback.
+        
+        The router commits to a provider on its first non-empty chunk.
+        Falls back to the next provider only while nothing has been
+        streamed yet; a failure mid-stream ends the stream with the
+        partial answer already sent.
+        
+        Yields:
+            {
+                "text": str,
+                "provider": str,
+                "fallback_used": bool
+            }
+        """
+        last_error = None
+        for layer, provider, breaker in await self._providers_to_try():
+            start_ns = time.monotonic_ns()
+            started = False
+            try:
+                async for chunk in provider.generate_response_stream(prompt):
+                    if not chunk:
+                        continue
+                    if not started:
+                        # Commit to this provider on the first token
+                        started = True
+                        if breaker:
+                            await breaker.record_success()
+                    yield {
+                        "text": chunk,
+                        "provider": provider.name,
+                        "fallback_used": layer != "primary"
+                    }
+                
+                if not started:
+                    raise ValueError(f"{provider.name} returned empty stream")
+                
+            except Exception as e:
+                last_error = e
+                
+                if breaker:
+                    await breaker.record_failure()
+                
+                logger.warning({
+                    "event": "llm_stream_error",
+                    "provider": provider.name,
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "partial": started,
+                    "conversation_id": conversation_id
+                })
+                
+                if started:
+                    return  # Partial answer already sent, cannot switch provider
+                continue
+            
+            await self._track_success(provider, (time.monotonic_ns() - start_ns) // 1_000_000)
+            return
+        
+        logger.error({
+            "event": "all_llm_failed",
+            "last_error": str(last_error),
+            "conversation_id": conversation_id
+        })
+        
+        yield {
+            "text": self._get_static_fallback(),
+            "provider": "static_fallback",
+            "fallback_used": True
+        }
+    
     def _get_static_fallback(self) -> str:
         """
         Static response when all LLMs fail.
         This ensures we NEVER return a 500 error.
         """
-        return (
-            "⚠️ **Disculpa las molestias técnicas**\n\n"
-            "Estoy experimentando dificultades temporales con mis sistemas de IA. "
-            "Por favor, intenta reformular tu pregunta o vuelve en unos minutos. "
-            "Si necesitas asistencia urgente, contacta directamente con el equipo.\n\n"
-            "_Sistema de respaldo activado_"
-        )
+        return STATIC_FALLBACK_MESSAGE
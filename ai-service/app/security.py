@@ -2,29 +2,52 @@
 Security utilities for input sanitization and JWT authentication.
 """
 import re
-import html
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from datetime import timedelta
+from typing import Optional, Tuple, Dict
+import bcrypt
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.config import settings
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security_scheme = HTTPBearer()
 
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+# Verified tokens: token -> (payload, exp as unix seconds)
+TOKEN_CACHE_SIZE = 4096
+_token_cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+# Issued tokens: (claims, lifetime) -> (token, exp as unix seconds)
+ISSUED_TOKEN_CACHE_SIZE = 1024
+TOKEN_REUSE_WINDOW = 60  # Max seconds an issued token is handed out again
+_issued_tokens: Dict[Tuple, Tuple[str, int]] = {}
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode()[:BCRYPT_MAX_PASSWORD_BYTES],
+            hashed_password.encode()
+        )
+    except ValueError:
+        return False  # Malformed hash
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode()[:BCRYPT_MAX_PASSWORD_BYTES], salt).decode()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -38,14 +61,33 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Returns:
         Encoded JWT token
     """
-    to_encode = data.copy()
+    now = int(time.time())
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        lifetime = int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.jwt_access_token_expire_minutes)
+        lifetime = settings.jwt_access_token_expire_minutes * 60
     
-    to_encode.update({"exp": expire})
+    # Reuse a token for identical claims issued within the last minute
+    try:
+        cache_key = (tuple(sorted(data.items())), lifetime)
+    except TypeError:
+        cache_key = None  # Unhashable claim values, always issue a new token
+    
+    if cache_key is not None:
+        cached = _issued_tokens.get(cache_key)
+        if cached and cached[1] - now >= lifetime - min(TOKEN_REUSE_WINDOW, lifetime // 10):
+            return cached[0]
+    
+    to_encode = data.copy()
+    expire = now + lifetime
+    to_encode["exp"] = expire
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    
+    if cache_key is not None:
+        if len(_issued_tokens) >= ISSUED_TOKEN_CACHE_SIZE:
+            _issued_tokens.clear()
+        _issued_tokens[cache_key] = (encoded_jwt, expire)
+    
     return encoded_jwt
 
 
@@ -67,11 +109,48 @@ def verify_token(token: str) -> dict:
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached = _get_cached_token(token)
+    if cached is not None:
+        return dict(cached)  # Callers may mutate; keep the cached payload intact
+    
     try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return payload
-    except JWTError:
+        payload = jwt.decode(
+            token,
+            settings.jwt_secret_key,
+            algorithms=[settings.jwt_algorithm],
+            options={"require": ["exp"]}
+        )
+    except jwt.InvalidTokenError:
         raise credentials_exception
+    
+    _cache_token(token, payload)
+    return payload
+
+
+def _get_cached_token(token: str) -> Optional[dict]:
+    """Return a previously verified payload, treating expired entries as misses"""
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if time.time() >= expires_at:
+            del _token_cache[token]
+            return None
+        _token_cache.move_to_end(token)
+        return payload
+
+
+def _cache_token(token: str, payload: dict) -> None:
+    """Remember a copy of a verified payload until its exp claim (LRU-bounded)"""
+    exp = payload.get("exp")
+    if exp is None:
+        return  # Never cache tokens without an expiry
+    with _token_cache_lock:
+        _token_cache[token] = (dict(payload), float(exp))
+        _token_cache.move_to_end(token)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security_scheme)) -> dict:
@@ -92,6 +171,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return payload
 
 
+# Same output as html.escape(quote=True), in a single C-level pass
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
+
 def sanitize_input(text: str, max_length: Optional[int] = None) -> str:
     """
     Sanitize user input to prevent injection attacks.
@@ -108,7 +197,18 @@ def sanitize_input(text: str, max_length: Optional[int] = None) -> str:
     
     sanitized = text.strip()
     
-    sanitized = html.escape(sanitized)
+    # Escaping never shortens text, so the first max_length escaped characters
+    # only depend on the first max_length input characters
+    if max_length:
+        sanitized = sanitized[:max_length]
+    
+    # Plain text is the common case; five C-level membership scans are much
+    # cheaper than translating every character through the table
+    if (
+        '&' in sanitized or '<' in sanitized or '>' in sanitized
+        or '"' in sanitized or "'" in sanitized
+    ):
+        sanitized = sanitized.translate(_HTML_ESCAPE_TABLE)
     
     if max_length and len(sanitized) > max_length:
         sanitized = sanitized[:max_length]
@@ -116,6 +216,40 @@ def sanitize_input(text: str, max_length: Optional[int] = None) -> str:
     return sanitized
 
 
+def sanitize_prompt(text: str, max_length: Optional[int] = None) -> str:
+    """
+    Normalize user text that is only sent to an LLM.
+    
+    Unlike sanitize_input, no HTML escaping is applied: entities such as
+    `&lt;` confuse the model and inflate token counts.
+    
+    Args:
+        text: Input text to normalize
+        max_length: Optional maximum length limit
+        
+    Returns:
+        Stripped and truncated text
+    """
+    if not text:
+        return ""
+    
+    sanitized = text.strip()
+    return sanitized[:max_length] if max_length else sanitized
+
+
+# One alternation so each pass is a single C-level scan of the selector
+_DANGEROUS_SELECTOR_PATTERN = re.compile(
+    r'javascript:|on\w+\s*=|<script|</script>',
+    re.IGNORECASE
+)
+
+_ALLOWED_URL_SCHEMES = ('http://', 'https://')
+
+# Scrape requests repeat the same selectors and URLs; both sanitizers are pure
+SANITIZE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
 def sanitize_css_selector(selector: str) -> str:
     """
     Sanitize CSS selector to prevent injection.
@@ -129,19 +263,15 @@ def sanitize_css_selector(selector: str) -> str:
     if not selector:
         return ""
     
-    dangerous_patterns = [
-        r'javascript:',
-        r'on\w+\s*=',
-        r'<script',
-        r'</script>',
-    ]
-    
-    for pattern in dangerous_patterns:
-        selector = re.sub(pattern, '', selector, flags=re.IGNORECASE)
+    # Repeat until nothing matches: removing one pattern can expose another
+    removed = True
+    while removed:
+        selector, removed = _DANGEROUS_SELECTOR_PATTERN.subn('', selector)
     
     return selector.strip()
 
 
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
 def sanitize_url(url: str) -> str:
     """
     Validate and sanitize URL for scraping.
@@ -155,13 +285,14 @@ def sanitize_url(url: str) -> str:
     Raises:
         ValueError: If URL is invalid or potentially dangerous
     """
-    url = url.strip().lower()
+    url = url.strip()
     
-    if not url.startswith(('http://', 'https://')):
+    # Check the scheme on the 8-char prefix so rejected URLs are never
+    # lowered in full. Also rejects javascript:, data: and file: URLs
+    if not url[:8].lower().startswith(_ALLOWED_URL_SCHEMES):
         raise ValueError("URL must start with http:// or https://")
     
-    dangerous_schemes = ['javascript:', 'data:', 'file:']
-    if any(url.startswith(scheme) for scheme in dangerous_schemes):
-        raise ValueError("Potentially dangerous URL scheme")
+    if not url.islower():
+        url = url.lower()
     
     return url
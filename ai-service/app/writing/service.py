@@ -14,6 +14,7 @@ import json
 import logging
 
 from app.config import settings
+from app.database import get_redis_client
 from app.rag.router import LLMRouter
 from app.providers_factory import (
     create_primary_provider,
@@ -22,7 +23,6 @@ from app.providers_factory import (
 from app.writing.prompts import WritingPrompts, WritingTechnique, ToneType, FormatType
 from app.writing.analyzers import QualityAnalyzer
 from app.writing.formatters import FormatAdapter
-import redis
 
 logger = logging.getLogger(__name__)
 
@@ -51,21 +51,10 @@ class ScriptWriterService:
         primary = create_primary_provider()
         secondary = create_secondary_provider() if settings.groq_api_key else None
         
-        redis_client = None
-        try:
-            redis_client = redis.Redis(
-                host=settings.redis_host,
-                port=settings.redis_port,
-                password=settings.redis_password,
-                decode_responses=True
-            )
-        except Exception as e:
-            logger.warning(f"Redis unavailable for circuit breaker: {e}")
-        
         return LLMRouter(
             primary=primary,
             secondary=secondary,
-            redis_client=redis_client
+            redis_client=get_redis_client()
         )
     
     def _call_llm(self, prompt: str) -> Dict[str, any]:
@@ -131,27 +131,26 @@ async def ingest_profile():
     print("🚀 Iniciando ingesta de perfil de Reinaldo Tineo...")
     print(f"   Total de secciones a ingestar: {len(PROFILE_DATA)}\n")
 
+    # All sections go in one request: one embedding call and one INSERT server-side
     success_count = 0
-    async with httpx.AsyncClient() as client:
-        for item in PROFILE_DATA:
-            section = item['metadata'].get('section', 'unknown')
-            print(f"   📄 Procesando sección: {section}...")
-            try:
-                response = await client.post(
-                    "http://localhost:8000/ingest",
-                    json=item,
-                    timeout=60.0
-                )
-
-                if response.status_code in (200, 201):
-                    data = response.json()
-                    print(f"   ✅ Ingestado exitosamente (ID: {data.get('embedding_id')})")
-                    success_count += 1
-                else:
-                    print(f"   ❌ Error {response.status_code}: {response.text[:200]}")
-
-            except Exception as e:
-                print(f"   ❌ Error de conexión: {str(e)}")
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        try:
+            response = await client.post(
+                "http://localhost:8000/ingest/batch",
+                json={"items": PROFILE_DATA}
+            )
+
+            if response.status_code in (200, 201):
+                embedding_ids = response.json().get('embedding_ids', [])
+                for item, embedding_id in zip(PROFILE_DATA, embedding_ids):
+                    section = item['metadata'].get('section', 'unknown')
+                    print(f"   ✅ [{section}] Ingestado exitosamente (ID: {embedding_id})")
+                success_count = len(embedding_ids)
+            else:
+                print(f"   ❌ Error {response.status_code}: {response.text[:200]}")
+
+        except Exception as e:
+            print(f"   ❌ Error de conexión: {str(e)}")
 
     print(f"\n{'✅' if success_count == len(PROFILE_DATA) else '⚠️'} Proceso completado: {success_count}/{len(PROFILE_DATA)} secciones ingestadas.")
     if success_count > 0:
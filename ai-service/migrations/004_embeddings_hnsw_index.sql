@@ -0,0 +1,20 @@
+-- HNSW Index for Embedding Similarity Search
+-- Replaces the sequential scan in find_similar with an approximate
+-- nearest-neighbour index.
+--
+-- HNSW indexes on `vector` are limited to 2000 dimensions, so the
+-- 3072-dim embeddings are indexed through a halfvec expression
+-- (requires pgvector >= 0.7). Stored embeddings are unit length (see
+-- 007), so inner product ranks the same as cosine and skips the norm
+-- computation. Queries must ORDER BY the same expression:
+--     ORDER BY embedding::halfvec(3072) <#> $1::halfvec(3072)
+--
+-- Validate with:
+--     SET hnsw.ef_search = 40;
+--     EXPLAIN ANALYZE SELECT id FROM embeddings
+--     ORDER BY embedding::halfvec(3072) <#> '[...]'::halfvec(3072) LIMIT 5;
+-- and check for "Index Scan using idx_embeddings_hnsw".
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_hnsw ON embeddings
+    USING hnsw ((embedding::halfvec(3072)) halfvec_ip_ops)
+    WITH (m = 16, ef_construction = 200);
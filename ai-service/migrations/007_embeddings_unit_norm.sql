@@ -0,0 +1,15 @@
+-- Unit-Length Embeddings
+-- Retrieval ranks by inner product (`<#>`, index from 004) and reports
+-- similarity as -(embedding <#> query), which equals cosine similarity
+-- only when both vectors are unit length. New writes are L2-normalized
+-- by the repository; this backfills rows written before that change
+-- (e.g. with an overridden EMBEDDING_MODEL or output dimensionality) so
+-- every stored vector satisfies the requirement (requires pgvector >= 0.7).
+--
+-- Idempotent: rows already within float tolerance of unit length and
+-- zero vectors are left alone, so later runs only scan.
+
+UPDATE embeddings
+SET embedding = l2_normalize(embedding)
+WHERE vector_norm(embedding) > 0
+  AND abs(vector_norm(embedding) - 1) > 1e-4;
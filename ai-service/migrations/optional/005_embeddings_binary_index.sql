@@ -0,0 +1,26 @@
+-- Binary-Quantized HNSW Index for Embedding Similarity Search
+-- Indexes each embedding as one bit per dimension (sign of the value),
+-- 384 bytes per 3072-dim row instead of 6144 for the halfvec index in
+-- 004, so far more of the graph stays in shared buffers.
+--
+-- The stored `vector` column is unchanged; the index is an expression,
+-- so no backfill is needed (requires pgvector >= 0.7). Hamming distance
+-- on bits is only a coarse ordering, so queries fetch a candidate set
+-- from this index and rerank it at full precision:
+--     ORDER BY binary_quantize(embedding)::bit(3072) <~> binary_quantize($1)
+--
+-- Used by find_similar when BINARY_RERANK_CANDIDATES > 0 (e.g. 200).
+-- Optional: run_migrations only applies it while that setting is on, so
+-- the default configuration does not maintain a second HNSW graph on
+-- every insert. After switching the feature off, reclaim the space with
+--     DROP INDEX IF EXISTS idx_embeddings_hnsw_binary;
+-- Validate with:
+--     SET hnsw.ef_search = 200;
+--     EXPLAIN ANALYZE SELECT id FROM embeddings
+--     ORDER BY binary_quantize(embedding)::bit(3072) <~> binary_quantize('[...]'::vector(3072))
+--     LIMIT 200;
+-- and check for "Index Scan using idx_embeddings_hnsw_binary".
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_hnsw_binary ON embeddings
+    USING hnsw ((binary_quantize(embedding)::bit(3072)) bit_hamming_ops)
+    WITH (m = 16, ef_construction = 200);
@@ -0,0 +1,17 @@
+-- Full-Text Index for Hybrid Retrieval
+-- Lets find_hybrid pull keyword matches (names, technologies, acronyms)
+-- that pure vector similarity can rank too low.
+--
+-- Uses the 'simple' configuration: CV content mixes Spanish and English,
+-- so no language-specific stemming or stop words. Queries must use the
+-- same expression:
+--     WHERE to_tsvector('simple', content) @@ plainto_tsquery('simple', $1)
+--
+-- Used when HYBRID_TEXT_WEIGHT > 0 (e.g. 0.3).
+-- Optional: run_migrations only applies it while that setting is on, so
+-- the default configuration does not maintain a GIN index on every
+-- insert. After switching the feature off, reclaim the space with
+--     DROP INDEX IF EXISTS idx_embeddings_content_fts;
+
+CREATE INDEX IF NOT EXISTS idx_embeddings_content_fts ON embeddings
+    USING gin (to_tsvector('simple', content));
@@ -1,4 +1,5 @@
 
+import argparse
 import asyncio
 import os
 import sys
@@ -9,24 +10,40 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from app.database import get_db_connection
 
-def check_data():
+# Planner row estimate plus one sample row in a single round-trip (no sequential scan)
+SUMMARY_QUERY = """
+    SELECT
+        (SELECT reltuples::bigint FROM pg_class WHERE oid = 'embeddings'::regclass) AS est_count,
+        (SELECT row_to_json(t) FROM (SELECT id, content, metadata FROM embeddings LIMIT 1) t) AS sample
+"""
+
+def check_data(exact: bool = False):
     print("🔍 Checking database content...")
-    
+
     try:
         with get_db_connection() as db:
-            # Count rows
-            count = db.execute("SELECT COUNT(*) as count FROM embeddings")
-            print(f"📊 Total embeddings: {count[0]['count']}")
-            
-            if count[0]['count'] > 0:
-                # Sample one
-                sample = db.execute("SELECT id, content, metadata FROM embeddings LIMIT 1")
-                print(f"📄 Sample: {sample[0]}")
+            summary = db.execute_one(SUMMARY_QUERY)
+
+            if exact:
+                # Full scan, only when explicitly requested
+                count = db.execute_one("SELECT COUNT(*) as count FROM embeddings")
+                print(f"📊 Total embeddings: {count['count']}")
+            elif summary['est_count'] >= 0:
+                print(f"📊 Total embeddings (estimate): ~{summary['est_count']}")
+            else:
+                print("📊 Total embeddings (estimate): unknown, table not analyzed yet (use --exact)")
+
+            if summary['sample']:
+                print(f"📄 Sample: {summary['sample']}")
             else:
                 print("❌ Table is empty!")
-                
+
     except Exception as e:
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    check_data()
+    parser = argparse.ArgumentParser(description='Check embeddings table content')
+    parser.add_argument('--exact', action='store_true', help='Run a full COUNT(*) instead of the planner estimate')
+    args = parser.parse_args()
+
+    check_data(exact=args.exact)
@@ -2,10 +2,15 @@
 import os
 import sys
 import asyncio
-import json
+import re
 from pathlib import Path
-from typing import List, Dict
-import pypdf
+from typing import List, Dict, Iterable, Iterator
+try:
+    import fitz  # PyMuPDF, C-backed and much faster than pypdf
+    _USE_MUPDF = True
+except ImportError:
+    import pypdf
+    _USE_MUPDF = False
 
 # Add parent directory to path to import app modules
 sys.path.append(str(Path(__file__).parent.parent))
@@ -13,64 +18,84 @@ sys.path.append(str(Path(__file__).parent.parent))
 from app.rag.embeddings import EmbeddingService
 from app.database import get_db_connection
 
+# Chunks embedded per Gemini request
+INGEST_BATCH_SIZE = 32
+# Embedding requests in flight at once
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "16"))
+
+# Common CV section headers (heuristic), matched anywhere in a short line
+_CV_SECTIONS = (
+    "EXPERIENCIA", "EXPERIENCE",
+    "EDUCACIÓN", "EDUCATION",
+    "HABILIDADES", "SKILLS",
+    "PROYECTOS", "PROJECTS",
+    "RESUMEN", "SUMMARY", "PROFILE", "PERFIL"
+)
+_SECTION_RE = re.compile("|".join(_CV_SECTIONS), re.IGNORECASE)
+
+def _iter_clean_lines(pdf_path: str) -> Iterator[str]:
+    """Yield stripped, non-empty lines page by page without building the full text"""
+    if _USE_MUPDF:
+        with fitz.open(pdf_path) as doc:
+            yield from _clean_lines(page.get_text() for page in doc)
+    else:
+        reader = pypdf.PdfReader(pdf_path)
+        yield from _clean_lines(page.extract_text() for page in reader.pages)
+
+
+def _clean_lines(pages: Iterable[str]) -> Iterator[str]:
+    """Normalize page texts into stripped, non-empty lines"""
+    for page_text in pages:
+        if not page_text:
+            continue  # Image-only pages carry no text layer
+        for raw in page_text.splitlines():
+            line = raw.strip()
+            if line:
+                yield line
+
+
 async def ingest_pdf(pdf_path: str) -> List[Dict]:
     print(f"📄 Processing PDF: {pdf_path}")
     
-    # 1. Extract text from PDF
-    text = ""
-    try:
-        reader = pypdf.PdfReader(pdf_path)
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"❌ Error reading PDF: {e}")
-        return []
-
-    # 2. Split into chunks (Simple splitting by sections/paragraphs)
+    # Split into chunks (Simple splitting by sections/paragraphs) while
+    # lines are streamed from the PDF
     chunks = []
     
-    # Normalize text (remove multiple newlines)
-    clean_text = "\n".join([line.strip() for line in text.splitlines() if line.strip()])
-    
-    # Split by common section headers (heuristic)
-    sections = [
-        "EXPERIENCIA", "EXPERIENCE", 
-        "EDUCACIÓN", "EDUCATION", 
-        "HABILIDADES", "SKILLS", 
-        "PROYECTOS", "PROJECTS",
-        "RESUMEN", "SUMMARY", "PROFILE", "PERFIL"
-    ]
-    
-    current_chunk = ""
+    # Lines of the chunk being built, joined once on flush
+    buf: List[str] = []
+    buf_len = 0
     current_section = "GENERAL"
     
-    for line in clean_text.splitlines():
-        is_header = any(section in line.upper() for section in sections) and len(line) < 30
-        
-        if is_header:
-            if current_chunk:
-                chunks.append({
-                    "content": current_chunk,
-                    "metadata": {"source": "cv_pdf", "section": current_section, "type": "cv_segment"}
-                })
-            current_section = line.strip()
-            current_chunk = line + "\n"
-        else:
-            current_chunk += line + "\n"
-            
-            # Chunk limit (approx 500 chars)
-            if len(current_chunk) > 500:
-                 chunks.append({
-                    "content": current_chunk,
-                    "metadata": {"source": "cv_pdf", "section": current_section, "type": "cv_segment"}
-                })
-                 current_chunk = ""
-    
-    if current_chunk:
+    def flush() -> None:
+        nonlocal buf_len
         chunks.append({
-            "content": current_chunk,
+            "content": "".join(buf),
             "metadata": {"source": "cv_pdf", "section": current_section, "type": "cv_segment"}
         })
+        buf.clear()
+        buf_len = 0
+    
+    try:
+        for line in _iter_clean_lines(pdf_path):
+            is_header = len(line) < 30 and _SECTION_RE.search(line) is not None
+            
+            if is_header:
+                if buf_len:
+                    flush()
+                current_section = line
+            
+            buf.append(line + "\n")
+            buf_len += len(line) + 1
+            
+            # Chunk limit (approx 500 chars)
+            if not is_header and buf_len > 500:
+                flush()
+    except Exception as e:
+        print(f"❌ Error reading PDF: {e}")
+        return []
+    
+    if buf_len:
+        flush()
 
     return chunks
 
@@ -145,26 +170,43 @@ async def ingest_all():
     embedding_service = EmbeddingService()
     
     try:
-        # Clear previous data
+        # Clear previous data. TRUNCATE drops the data files instead of
+        # deleting row by row; ids keep counting up so KNN results cached
+        # by id can never resolve to new rows.
         with get_db_connection() as conn:
-            conn.execute("DELETE FROM embeddings", fetch_results=False)
+            conn.execute("TRUNCATE embeddings", fetch_results=False)
             conn.commit()
             print("🗑️  Deleted old data from 'embeddings' table")
 
-        # Ingest new chunks
+        # Ingest new chunks: embed batches concurrently, then store with one INSERT
         print(f"🚀 Ingesting {len(all_chunks)} chunks...")
-        success_count = 0
+        batches = [
+            all_chunks[start:start + INGEST_BATCH_SIZE]
+            for start in range(0, len(all_chunks), INGEST_BATCH_SIZE)
+        ]
+        sem = asyncio.Semaphore(INGEST_CONCURRENCY)
         
-        for i, chunk in enumerate(all_chunks, 1):
-            try:
-                await embedding_service.ingest(
-                    content=chunk["content"], 
-                    metadata=json.dumps(chunk["metadata"])
+        async def _embed(batch: List[Dict]):
+            async with sem:
+                return await asyncio.to_thread(
+                    embedding_service.provider.generate_embeddings,
+                    [chunk["content"] for chunk in batch]
                 )
-                print(f"   ✓ [{i}/{len(all_chunks)}] Ingested")
-                success_count += 1
-            except Exception as inner_e:
-                print(f"   ❌ [{i}/{len(all_chunks)}] Failed: {inner_e}")
+        
+        results = await asyncio.gather(*(_embed(batch) for batch in batches), return_exceptions=True)
+        
+        rows = []
+        for batch, embeddings in zip(batches, results):
+            if isinstance(embeddings, Exception):
+                print(f"   ❌ {len(batch)} chunks failed: {embeddings}")
+                continue
+            rows.extend(
+                (chunk["content"], embedding, chunk["metadata"])
+                for chunk, embedding in zip(batch, embeddings)
+            )
+            print(f"   ✓ [{len(rows)}/{len(all_chunks)}] Embedded")
+        
+        success_count = len(embedding_service.repository.save_many(rows))
         
         if success_count == 0:
             print("\n❌ INGESTION FAILED: 0 chunks were stored.")
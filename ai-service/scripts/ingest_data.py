@@ -12,11 +12,16 @@ Usage:
 """
 import os
 import sys
-import json
+import hashlib
+import asyncio
 import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable
+from datetime import datetime, timezone
 
 # ── MUST be done BEFORE any app/third-party imports ──────────────────────────
 # The script lives at /app/scripts/ingest_data.py.
@@ -32,29 +37,61 @@ os.environ.setdefault('ENV', 'development')
 
 
 # Third-party imports
-from pypdf import PdfReader
+try:
+    import fitz  # PyMuPDF, C-backed and much faster than pypdf
+    _USE_MUPDF = True
+except ImportError:
+    from pypdf import PdfReader
+    _USE_MUPDF = False
+import orjson
 import requests
-from bs4 import BeautifulSoup
-import google.generativeai as genai
+try:
+    import tiktoken  # Optional: exact token counts for --chunk-unit tokens
+except ImportError:
+    tiktoken = None
+try:
+    from selectolax.parser import HTMLParser  # C-backed (Modest) HTML parser
+    _USE_SELECTOLAX = True
+except ImportError:
+    from bs4 import BeautifulSoup, SoupStrainer
+    _USE_SELECTOLAX = False
 
 # App imports (work now because sys.path was set above)
 from config import get_settings
 from database import get_db_connection
-from rag.embeddings import GeminiEmbeddingProvider
+from rag.embeddings import GeminiEmbeddingProvider, l2_normalize, to_vector_literal
+
+
+# PDFs with at least this many pages are extracted in worker processes
+PARALLEL_PDF_MIN_PAGES = 50
+PDF_PAGES_PER_TASK = 10
+
+
+def _extract_pages(file_path: str, page_nums: range) -> List[str]:
+    """Extract text for a range of pages (runs in a worker process)"""
+    with fitz.open(file_path) as doc:
+        return [doc[page_num].get_text() for page_num in page_nums]
 
 
 class TextExtractor:
     """Extract text from various sources"""
     
+    # Shared session keeps connections (and TLS sessions) alive across URL fetches
+    _session = requests.Session()
+    _session.headers.update({"User-Agent": "ai-service-ingest/1.0"})
+    
     @staticmethod
     def from_pdf(file_path: str) -> str:
         """Extract text from PDF"""
         try:
-            reader = PdfReader(file_path)
             text_parts = []
             
-            for page_num, page in enumerate(reader.pages, 1):
-                text = page.extract_text()
+            if _USE_MUPDF:
+                page_texts = TextExtractor._mupdf_page_texts(file_path)
+            else:
+                page_texts = [page.extract_text() for page in PdfReader(file_path).pages]
+            
+            for page_num, text in enumerate(page_texts, 1):
                 if text:
                     text_parts.append(f"[Page {page_num}]\n{text}")
             
@@ -63,6 +100,30 @@ class TextExtractor:
             print(f"Error reading PDF {file_path}: {e}")
             return ""
     
+    @staticmethod
+    def _mupdf_page_texts(file_path: str) -> List[str]:
+        """Extract page texts with PyMuPDF, fanning large PDFs out to worker processes"""
+        with fitz.open(file_path) as doc:
+            num_pages = doc.page_count
+            if num_pages < PARALLEL_PDF_MIN_PAGES:
+                # Process startup costs more than it saves on short documents
+                return [page.get_text() for page in doc]
+        
+        batches = [
+            range(start, min(start + PDF_PAGES_PER_TASK, num_pages))
+            for start in range(0, num_pages, PDF_PAGES_PER_TASK)
+        ]
+        workers = max(1, (os.cpu_count() or 1) - 1)
+        
+        # Spawn rather than fork: this runs on a worker thread while the embed
+        # and upsert threads are live, and forking a multithreaded process can
+        # deadlock. Workers open the file themselves, so only the path is pickled.
+        # map() preserves batch order, so pages come back in document order
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            results = executor.map(partial(_extract_pages, file_path), batches)
+            return [text for batch in results for text in batch]
+    
     @staticmethod
     def from_txt(file_path: str) -> str:
         """Extract text from plain text file"""
@@ -77,17 +138,28 @@ class TextExtractor:
     def from_url(url: str) -> str:
         """Extract text from URL"""
         try:
-            response = requests.get(url, timeout=30)
+            response = TextExtractor._session.get(url, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove scripts and styles
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text(separator='\n')
+            if _USE_SELECTOLAX:
+                tree = HTMLParser(response.text)
+                
+                # Remove scripts and styles
+                for node in tree.css("script, style"):
+                    node.decompose()
+                
+                # Get text
+                root = tree.body or tree.root
+                text = root.text(separator='\n') if root else ""
+            else:
+                soup = BeautifulSoup(response.text, 'lxml', parse_only=SoupStrainer('body'))
+                
+                # Remove scripts and styles
+                for script in soup(["script", "style"]):
+                    script.decompose()
+                
+                # Get text
+                text = soup.get_text(separator='\n')
             
             # Clean up whitespace
             lines = (line.strip() for line in text.split('\n'))
@@ -98,95 +170,153 @@ class TextExtractor:
             return ""
     
     @staticmethod
-    def from_directory(dir_path: str, extensions: List[str] = None) -> List[Dict[str, str]]:
-        """Extract text from all files in directory"""
-        if extensions is None:
-            extensions = ['.pdf', '.txt']
-        
-        files_data = []
-        dir_path = Path(dir_path)
-        
-        for ext in extensions:
-            for file_path in dir_path.rglob(f'*{ext}'):
-                print(f"Processing: {file_path}")
-                
-                if ext == '.pdf':
-                    text = TextExtractor.from_pdf(str(file_path))
-                elif ext == '.txt':
-                    text = TextExtractor.from_txt(str(file_path))
-                else:
-                    continue
-                
-                if text:
-                    files_data.append({
-                        'source': str(file_path.name),
-                        'content': text,
-                        'file_path': str(file_path)
-                    })
+    def iter_directory(dir_path: str, extensions: Iterable[str] = ('.pdf', '.txt')) -> Iterator[Path]:
+        """Yield supported files in directory with a single tree walk"""
+        extensions = {ext.lower() for ext in extensions}
         
-        return files_data
+        for root, _, files in os.walk(dir_path):
+            for name in files:
+                if os.path.splitext(name)[1].lower() in extensions:
+                    yield Path(root) / name
+    
+    @staticmethod
+    def from_file(file_path: Path) -> str:
+        """Extract text from a PDF or TXT file"""
+        suffix = file_path.suffix.lower()
+        if suffix == '.pdf':
+            return TextExtractor.from_pdf(str(file_path))
+        if suffix == '.txt':
+            return TextExtractor.from_txt(str(file_path))
+        return ""
+    
+    @staticmethod
+    def from_directory(dir_path: str, extensions: Iterable[str] = ('.pdf', '.txt')) -> Iterator[Dict[str, str]]:
+        """Lazily extract text from all files in directory, one file at a time"""
+        for file_path in TextExtractor.iter_directory(dir_path, extensions):
+            print(f"Processing: {file_path}")
+            
+            text = TextExtractor.from_file(file_path)
+            if text:
+                yield {
+                    'source': str(file_path.name),
+                    'content': text,
+                    'file_path': str(file_path)
+                }
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate embedding-model tokens in text.
+    
+    Uses tiktoken's cl100k_base when installed (close to, but not exactly,
+    Gemini's tokenizer), otherwise estimates ~4 characters per token.
+    """
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    return len(_token_encoding().encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    """Load the tokenizer once (the first call may download its vocabulary)"""
+    return tiktoken.get_encoding("cl100k_base")
 
 
 class TextChunker:
     """Split text into chunks for embedding"""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        length_function: Callable[[str], int] = len
+    ):
+        """
+        Args:
+            chunk_size: Maximum chunk size, in the unit of length_function
+            chunk_overlap: Overlap between chunks
+            length_function: Size of a piece of text (len for characters,
+                count_tokens for tokens)
+        """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.length_function = length_function
     
     def chunk_text(self, text: str) -> List[Dict[str, Any]]:
         """Split text into overlapping chunks"""
         chunks = []
+        size_of = self.length_function
+        para_sep_size = size_of("\n\n")
+        sent_sep_size = size_of(". ")
+        
+        # Pieces of the chunk being built, joined once on flush.
+        # buf_len counts characters (reported as char_count); buf_size is
+        # measured with length_function and compared against chunk_size.
+        buf: List[str] = []
+        buf_len = 0
+        buf_size = 0
+        
+        def flush() -> None:
+            nonlocal buf_len, buf_size
+            chunks.append({
+                'content': "".join(buf).strip(),
+                'char_count': buf_len,
+                'chunk_id': len(chunks)
+            })
+            buf.clear()
+            buf_len = 0
+            buf_size = 0
         
         # Split by paragraphs first
         paragraphs = text.split('\n\n')
         
-        current_chunk = ""
-        
         for para in paragraphs:
             para = para.strip()
             if not para:
                 continue
             
+            para_size = size_of(para)
+            
             # If single paragraph is too long, split by sentences
-            if len(current_chunk) + len(para) > self.chunk_size:
-                if current_chunk:
-                    chunks.append({
-                        'content': current_chunk.strip(),
-                        'char_count': len(current_chunk)
-                    })
+            if buf_size + para_size > self.chunk_size:
+                if buf_len:
+                    flush()
                 
                 # Start new chunk
-                if len(para) > self.chunk_size:
+                if para_size > self.chunk_size:
                     # Split long paragraph
                     sentences = para.split('. ')
-                    current_chunk = ""
                     for sent in sentences:
-                        if len(current_chunk) + len(sent) > self.chunk_size:
-                            if current_chunk:
-                                chunks.append({
-                                    'content': current_chunk.strip(),
-                                    'char_count': len(current_chunk)
-                                })
-                            current_chunk = sent
+                        sent_size = size_of(sent)
+                        if buf_size + sent_size > self.chunk_size:
+                            if buf_len:
+                                flush()
+                            buf.append(sent)
+                            buf_len = len(sent)
+                            buf_size = sent_size
                         else:
-                            current_chunk += sent + ". "
+                            buf.append(sent)
+                            buf.append(". ")
+                            buf_len += len(sent) + 2
+                            buf_size += sent_size + sent_sep_size
                 else:
-                    current_chunk = para
+                    buf.append(para)
+                    buf_len = len(para)
+                    buf_size = para_size
             else:
-                current_chunk += para + "\n\n"
+                buf.append(para)
+                buf.append("\n\n")
+                buf_len += len(para) + 2
+                buf_size += para_size + para_sep_size
         
         # Don't forget last chunk
-        if current_chunk.strip():
-            chunks.append({
-                'content': current_chunk.strip(),
-                'char_count': len(current_chunk)
-            })
+        if buf_len and "".join(buf).strip():
+            flush()
         
-        # Add metadata
-        for i, chunk in enumerate(chunks):
-            chunk['chunk_id'] = i
-            chunk['total_chunks'] = len(chunks)
+        # Total is only known once every chunk has been emitted
+        total_chunks = len(chunks)
+        for chunk in chunks:
+            chunk['total_chunks'] = total_chunks
         
         return chunks
 
@@ -194,10 +324,24 @@ class TextChunker:
 class DataIngester:
     """Ingest data into vector database"""
     
-    def __init__(self):
+    # Chunks embedded per Gemini request and inserted per statement
+    BATCH_SIZE = 32
+    # Estimated token budget per embedding request (~4 chars per token)
+    MAX_BATCH_TOKENS = 60000
+    # Distinct chunk texts whose vectors are kept for reuse
+    EMBED_CACHE_SIZE = 4096
+    
+    def __init__(self, batch_size: int = BATCH_SIZE):
         self.settings = get_settings()
         self.db = get_db_connection()
         self.embedding_provider = GeminiEmbeddingProvider()
+        self.batch_size = batch_size
+        
+        # Content digest -> pgvector literal, shared by every file in the run
+        self._embed_cache: Dict[bytes, str] = {}
+        self._embed_cache_lock = threading.Lock()  # Pipeline embeds from several threads
+        self._cache_hits = 0
+        self._cache_misses = 0
     
     def ingest_chunks(
         self,
@@ -215,40 +359,267 @@ class DataIngester:
             'embeddings_ids': []
         }
         
+        base_metadata = self._base_metadata(source_name, metadata)
+        
+        for batch in self._make_batches(chunks):
+            try:
+                ids = self._flush_embedding_batch(batch, base_metadata)
+                # Commit per batch so a later failure cannot discard stored chunks
+                self.db.commit()
+                result['successful'] += len(ids)
+                result['failed'] += len(batch) - len(ids)
+                result['embeddings_ids'].extend(ids)
+                
+            except Exception as e:
+                # A failed INSERT aborts the transaction; reset it for the next batch
+                self.db.rollback()
+                result['failed'] += len(batch)
+                print(f"Error ingesting chunks {batch[0].get('chunk_id')}-{batch[-1].get('chunk_id')}: {e}")
+        
+        lookups = self._cache_hits + self._cache_misses
+        if lookups:
+            print(f"Embedding cache: {self._cache_hits}/{lookups} hits ({self._cache_hits / lookups:.0%})")
+        
+        return result
+    
+    @staticmethod
+    def _base_metadata(source_name: str, metadata: Optional[Dict] = None) -> Dict:
+        """Metadata shared by every chunk of a source"""
         base_metadata = metadata or {}
         base_metadata['source_name'] = source_name
-        base_metadata['ingested_at'] = datetime.utcnow().isoformat()
+        base_metadata['ingested_at'] = datetime.now(timezone.utc).isoformat()
+        return base_metadata
+    
+    def _make_batches(self, chunks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Pack chunks longest-first into batches bounded by size and estimated tokens.
         
-        for chunk in chunks:
+        Grouping similar lengths keeps one long chunk from forcing an extra
+        request for a batch that is otherwise small.
+        """
+        batches = []
+        batch: List[Dict[str, Any]] = []
+        batch_tokens = 0
+        
+        for chunk in sorted(chunks, key=lambda c: len(c['content']), reverse=True):
+            tokens = len(chunk['content']) // 4 + 1
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > self.MAX_BATCH_TOKENS):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(chunk)
+            batch_tokens += tokens
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _flush_embedding_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        base_metadata: Dict
+    ) -> List[int]:
+        """Embed a batch with one API request and store it with one INSERT"""
+        vectors = self._embed_cached([chunk['content'] for chunk in batch])
+        return self._insert_batch(batch, vectors, base_metadata)
+    
+    def _insert_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        vectors: List[str],
+        base_metadata: Dict
+    ) -> List[int]:
+        """Store an embedded batch with one multi-row INSERT"""
+        # Serialize the shared fields once; only chunk_id differs per row
+        shared = {key: value for key, value in base_metadata.items() if key != 'chunk_id'}
+        prefix = orjson.dumps(shared)[:-1] + (b',"chunk_id":' if shared else b'"chunk_id":')
+        
+        rows = [
+            (
+                chunk['content'],
+                vector,
+                (prefix + orjson.dumps(chunk.get('chunk_id')) + b'}').decode()
+            )
+            for chunk, vector in zip(batch, vectors)
+        ]
+        results = self.db.execute_many(
+            """
+            INSERT INTO embeddings (content, embedding, metadata, created_at)
+            VALUES %s
+            RETURNING id
+            """,
+            rows,
+            template="(%s, %s::vector, %s, CURRENT_TIMESTAMP)"
+        )
+        
+        return [row['id'] for row in results]
+    
+    def _embed_cached(self, texts: List[str]) -> List[str]:
+        """
+        Vector literals for texts, embedding only content not seen before.
+        
+        Duplicate chunks (e.g. repeated headers) reuse the earlier vector
+        instead of costing another API call.
+        """
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        
+        vectors: Dict[bytes, str] = {}
+        missing: Dict[bytes, str] = {}
+        with self._embed_cache_lock:
+            for key, text in zip(keys, texts):
+                vector = self._embed_cache.get(key)
+                if vector is None:
+                    missing.setdefault(key, text)
+                else:
+                    vectors[key] = vector
+            
+            self._cache_misses += len(missing)
+            self._cache_hits += len(texts) - len(missing)
+        
+        if missing:
+            embeddings = self.embedding_provider.generate_embeddings(list(missing.values()))
+            with self._embed_cache_lock:
+                for key, embedding in zip(missing, embeddings):
+                    vectors[key] = to_vector_literal(l2_normalize(embedding))
+                    if len(self._embed_cache) >= self.EMBED_CACHE_SIZE:
+                        self._embed_cache.pop(next(iter(self._embed_cache)))  # Evict oldest
+                    self._embed_cache[key] = vectors[key]
+        
+        return [vectors[key] for key in keys]
+
+
+
+class IngestPipeline:
+    """
+    Overlapping Load → Chunk → Embed → Upsert stages for directory ingestion.
+    
+    Stages are connected by bounded queues, so extraction of the next file
+    proceeds while earlier batches wait on the embedding API, and a slow
+    stage applies backpressure instead of buffering everything in memory.
+    """
+    
+    QUEUE_SIZE = 64
+    EMBED_WORKERS = 8
+    
+    _DONE = object()  # End-of-stream marker
+    
+    def __init__(
+        self,
+        chunker: TextChunker,
+        ingester: DataIngester,
+        metadata: Optional[Dict] = None,
+        embed_workers: int = EMBED_WORKERS
+    ):
+        self.chunker = chunker
+        self.ingester = ingester
+        self.metadata = metadata or {}
+        self.embed_workers = embed_workers
+        self.results: Dict[str, Dict[str, Any]] = {}
+    
+    async def run(self, dir_path: str) -> List[Dict[str, Any]]:
+        """
+        Ingest every supported file in a directory.
+        
+        Args:
+            dir_path: Directory to walk
+            
+        Returns:
+            Per-source results, in the order sources finished extraction
+        """
+        raw_q: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        batch_q: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        rows_q: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        
+        await asyncio.gather(
+            self._load(dir_path, raw_q),
+            self._chunk(raw_q, batch_q),
+            *(self._embed(batch_q, rows_q) for _ in range(self.embed_workers)),
+            self._upsert(rows_q)
+        )
+        
+        return list(self.results.values())
+    
+    async def _load(self, dir_path: str, raw_q: asyncio.Queue) -> None:
+        """Extract text from each file off the event loop"""
+        for file_path in TextExtractor.iter_directory(dir_path):
+            print(f"Processing: {file_path}")
+            text = await asyncio.to_thread(TextExtractor.from_file, file_path)
+            if text:
+                await raw_q.put((file_path, text))
+        
+        await raw_q.put(self._DONE)
+    
+    async def _chunk(self, raw_q: asyncio.Queue, batch_q: asyncio.Queue) -> None:
+        """Split extracted text into embedding batches"""
+        while (item := await raw_q.get()) is not self._DONE:
+            file_path, text = item
+            chunks = self.chunker.chunk_text(text)
+            print(f"Created {len(chunks)} chunks for {file_path.name}")
+            
+            # Keyed by path: files in different subdirectories may share a name
+            source = str(file_path)
+            base_metadata = self.ingester._base_metadata(
+                file_path.name, {**self.metadata, 'file_path': source}
+            )
+            self.results[source] = {
+                'source': file_path.name,
+                'total_chunks': len(chunks),
+                'successful': 0,
+                'failed': 0,
+                'embeddings_ids': []
+            }
+            
+            for batch in self.ingester._make_batches(chunks):
+                await batch_q.put((source, batch, base_metadata))
+        
+        for _ in range(self.embed_workers):
+            await batch_q.put(self._DONE)
+    
+    async def _embed(self, batch_q: asyncio.Queue, rows_q: asyncio.Queue) -> None:
+        """Embed batches concurrently (the Gemini SDK call blocks, so run it in a thread)"""
+        while (item := await batch_q.get()) is not self._DONE:
+            source, batch, base_metadata = item
             try:
-                # Generate embedding
-                embedding = self.embedding_provider.generate_embedding(chunk['content'])
-                
-                # Store in database
-                embedding_id = self.db.execute(
-                    """
-                    INSERT INTO embeddings (content, embedding, metadata, created_at)
-                    VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
-                    RETURNING id
-                    """,
-                    (
-                        chunk['content'],
-                        embedding,
-                        json.dumps({**base_metadata, 'chunk_id': chunk.get('chunk_id')})
-                    ),
-                    fetch_results=True
+                vectors = await asyncio.to_thread(
+                    self.ingester._embed_cached, [chunk['content'] for chunk in batch]
                 )
-                
-                if embedding_id:
-                    result['successful'] += 1
-                    result['embeddings_ids'].append(embedding_id[0]['id'])
-                
             except Exception as e:
-                result['failed'] += 1
-                print(f"Error ingesting chunk {chunk.get('chunk_id')}: {e}")
+                self.results[source]['failed'] += len(batch)
+                print(f"Error embedding chunks from {source}: {e}")
+                continue
+            await rows_q.put((source, batch, vectors, base_metadata))
         
-        self.db.commit()
-        return result
+        await rows_q.put(self._DONE)
+    
+    async def _upsert(self, rows_q: asyncio.Queue) -> None:
+        """Store embedded batches; the only stage that touches the database"""
+        remaining = self.embed_workers
+        while remaining:
+            item = await rows_q.get()
+            if item is self._DONE:
+                remaining -= 1
+                continue
+            
+            source, batch, vectors, base_metadata = item
+            result = self.results[source]
+            try:
+                ids = await asyncio.to_thread(self._store, batch, vectors, base_metadata)
+                result['successful'] += len(ids)
+                result['failed'] += len(batch) - len(ids)
+                result['embeddings_ids'].extend(ids)
+            except Exception as e:
+                result['failed'] += len(batch)
+                print(f"Error storing chunks from {source}: {e}")
+    
+    def _store(self, batch: List[Dict[str, Any]], vectors: List[str], base_metadata: Dict) -> List[int]:
+        """Insert and commit one batch, rolling back on failure"""
+        try:
+            ids = self.ingester._insert_batch(batch, vectors, base_metadata)
+            self.ingester.db.commit()
+            return ids
+        except Exception:
+            self.ingester.db.rollback()
+            raise
 
 
 def main():
@@ -273,6 +644,27 @@ def main():
         help='Size of text chunks (default: 1000)'
     )
     
+    parser.add_argument(
+        '--chunk-unit',
+        choices=['chars', 'tokens'],
+        default='chars',
+        help='Unit of --chunk-size: characters, or tokens (tiktoken if installed, else ~4 chars/token)'
+    )
+    
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DataIngester.BATCH_SIZE,
+        help=f'Chunks embedded per API request (default: {DataIngester.BATCH_SIZE})'
+    )
+    
+    parser.add_argument(
+        '--embed-workers',
+        type=int,
+        default=IngestPipeline.EMBED_WORKERS,
+        help=f'Concurrent embedding requests for --directory (default: {IngestPipeline.EMBED_WORKERS})'
+    )
+    
     parser.add_argument(
         '--metadata',
         type=str,
@@ -290,32 +682,21 @@ def main():
     
     # Initialize components
     extractor = TextExtractor()
-    chunker = TextChunker(chunk_size=args.chunk_size)
-    ingester = DataIngester()
+    chunker = TextChunker(
+        chunk_size=args.chunk_size,
+        length_function=count_tokens if args.chunk_unit == 'tokens' else len
+    )
+    ingester = DataIngester(batch_size=args.batch_size)
     
-    metadata = json.loads(args.metadata)
+    metadata = orjson.loads(args.metadata)
     
     if args.directory:
         # Process directory
         print(f"Processing directory: {args.directory}")
-        files_data = extractor.from_directory(args.directory)
+        pipeline = IngestPipeline(chunker, ingester, metadata, embed_workers=args.embed_workers)
         
-        for file_data in files_data:
-            print(f"\nIngesting: {file_data['source']}")
-            
-            # Chunk text
-            chunks = chunker.chunk_text(file_data['content'])
-            print(f"Created {len(chunks)} chunks")
-            
-            # Ingest
-            file_metadata = {**metadata, 'file_path': file_data.get('file_path')}
-            result = ingester.ingest_chunks(
-                chunks,
-                file_data['source'],
-                file_metadata
-            )
-            
-            print(f"Successfully ingested: {result['successful']}/{result['total_chunks']}")
+        for result in asyncio.run(pipeline.run(args.directory)):
+            print(f"\n{result['source']}: successfully ingested {result['successful']}/{result['total_chunks']}")
     
     elif args.source:
         # Process single source
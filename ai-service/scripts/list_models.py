@@ -1,8 +1,15 @@
 
-import google.generativeai as genai
 import os
+import sys
 
 api_key = os.getenv("GEMINI_API_KEY")
+if not api_key:
+    print("❌ API Key not found")
+    sys.exit(1)
+
+# Imported only once there is a key to use; the SDK is slow to load
+import google.generativeai as genai
+
 genai.configure(api_key=api_key)
 
 print("🔍 Listing available models...")
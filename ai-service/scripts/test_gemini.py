@@ -1,5 +1,4 @@
 
-import google.generativeai as genai
 import os
 import sys
 
@@ -8,6 +7,9 @@ if not api_key:
     print("❌ API Key not found")
     sys.exit(1)
 
+# Imported only once there is a key to test; the SDK is slow to load
+import google.generativeai as genai
+
 genai.configure(api_key=api_key)
 
 print(f"🔑 Testing with API Key: {api_key[:5]}...")
@@ -2,13 +2,14 @@
 import os
 import sys
 sys.path.append(os.getcwd())
-import google.generativeai as genai
 from app.config import settings
 
 print(f"🔑 API Key from settings: {settings.gemini_api_key[:5]}...")
 print(f"🤖 Model from settings: {settings.chat_model}")
 
 try:
+    import google.generativeai as genai  # Slow to load, deferred until needed
+    
     genai.configure(api_key=settings.gemini_api_key)
     model = genai.GenerativeModel(settings.chat_model)
     print("🚀 Generating content...")
@@ -13,7 +13,7 @@ from app.rag.chat import (
     PostgresConversationStore,
     RAGChatService,
     PromptBuilder,
-    GeminiLLMProvider
+    GreetingDetector
 )
 
 
@@ -59,6 +59,22 @@ def test_in_memory_store_save_turn(conversation_id):
     assert "timestamp" in history[0]
 
 
+def test_in_memory_store_formats_timestamp_on_read(conversation_id):
+    """Timestamps are stored as unix ms and returned as ISO 8601"""
+    # Arrange
+    store = InMemoryConversationStore()
+    saved_ns = 1_700_000_000_123_456_789
+    with patch("app.rag.chat.time.time_ns", return_value=saved_ns):
+        store.save_turn(conversation_id, "Q", "A")
+    
+    # Act
+    history = store.get_history(conversation_id)
+    
+    # Assert
+    assert store._conversations[conversation_id][0]["timestamp"] == 1_700_000_000_123
+    assert history[0]["timestamp"] == "2023-11-14T22:13:20.123000+00:00"
+
+
 def test_in_memory_store_get_history_limit(conversation_id):
     """Test history retrieval with limit"""
     # Arrange
@@ -107,7 +123,9 @@ def test_postgres_store_save_turn(mock_db, conversation_id):
     store.save_turn(conversation_id, question, answer)
     
     # Assert
-    assert mock_db.execute.call_count == 3  # 1 conversation + 2 messages
+    assert mock_db.execute.call_count == 2  # 1 conversation + 1 batched insert of both messages
+    messages_params = mock_db.execute.call_args_list[1][0][1]
+    assert messages_params == (conversation_id, question, conversation_id, answer)
     assert mock_db.commit.called
 
 
@@ -200,14 +218,18 @@ def test_prompt_builder_build_history():
         {'question': 'Q4', 'answer': 'A4', 'timestamp': '2024-01-01T00:03:00'}
     ]
     
+    # Each turn is ~6 tokens and the header ~7, so only the last 3 turns fit
+    max_tokens = 25
+    
     # Act
-    history_text = builder.build_history(history)
+    history_text = builder.build_history(history, max_tokens=max_tokens)
     
     # Assert
     assert 'Q2' in history_text  # Should include last 3
     assert 'Q3' in history_text
     assert 'Q4' in history_text
     assert 'Q1' not in history_text  # Should exclude first
+    assert history_text.index('Q2') < history_text.index('Q4')  # Oldest kept turn first
 
 
 def test_prompt_builder_build_prompt():
@@ -228,16 +250,137 @@ def test_prompt_builder_build_prompt():
     assert "CONTEXTO DISPONIBLE" in prompt
 
 
+# ============================================
+# GreetingDetector Tests
+# ============================================
+
+def _greeting_provider():
+    """Provider that embeds greetings along the first axis"""
+    provider = Mock()
+    provider.generate_embeddings = Mock(
+        side_effect=lambda texts, task_type: [[1.0, 0.0, 0.0] for _ in texts]
+    )
+    return provider
+
+
+def test_greeting_detector_not_ready_before_warm_up():
+    """Detection is disabled until greeting vectors are computed"""
+    detector = GreetingDetector(embedding_provider=_greeting_provider())
+    
+    assert detector.is_ready is False
+    assert detector.is_greeting([1.0, 0.0, 0.0]) is False
+
+
+def test_greeting_detector_matches_similar_query():
+    """Queries close to a greeting vector are detected"""
+    provider = _greeting_provider()
+    detector = GreetingDetector(embedding_provider=provider, greetings=["hola", "hi"])
+    
+    detector.warm_up()
+    
+    provider.generate_embeddings.assert_called_once_with(["hola", "hi"], task_type="retrieval_query")
+    provider.generate_embedding.assert_not_called()
+    assert detector.is_greeting([2.0, 0.1, 0.0]) is True
+    assert detector.is_greeting([0.0, 1.0, 0.0]) is False
+
+
+def test_greeting_detector_ignores_dimension_mismatch():
+    """Embeddings of a different size never match"""
+    detector = GreetingDetector(embedding_provider=_greeting_provider())
+    detector.warm_up()
+    
+    assert detector.is_greeting([1.0, 0.0]) is False
+
+
 # ============================================
 # RAGChatService Integration Tests
 # ============================================
 
+@pytest.mark.asyncio
+async def test_rag_chat_service_runs_store_calls_off_event_loop():
+    """Conversation store calls run on the bounded DB executor"""
+    # Arrange
+    import threading
+    thread_names = []
+    
+    class RecordingStore(InMemoryConversationStore):
+        def get_history(self, conversation_id, limit=10):
+            thread_names.append(threading.current_thread().name)
+            return super().get_history(conversation_id, limit)
+        
+        def save_turn(self, conversation_id, question, answer):
+            thread_names.append(threading.current_thread().name)
+            super().save_turn(conversation_id, question, answer)
+    
+    mock_embedding_service = Mock()
+    mock_embedding_service.embed_query = AsyncMock(return_value=[0.1, 0.2])
+    mock_embedding_service.search_by_embedding = AsyncMock(return_value=[])
+    mock_router = Mock()
+    mock_router.generate = AsyncMock(return_value={
+        "text": "Answer", "provider": "gemini", "fallback_used": False
+    })
+    store = RecordingStore()
+    
+    service = RAGChatService(
+        embedding_service=mock_embedding_service,
+        llm_router=mock_router,
+        conversation_store=store,
+        redis_client=Mock()
+    )
+    
+    # Act
+    response = await service.generate_response("Question")
+    
+    # Assert
+    assert response["answer"] == "Answer"
+    assert len(thread_names) == 2
+    assert all(name.startswith("pg") for name in thread_names)
+    assert store.get_history(response["conversation_id"])[0]["answer"] == "Answer"
+
+
+def test_db_executor_is_bounded_by_pool_size():
+    """The shared DB executor never runs more threads than Postgres connections"""
+    from app.config import settings
+    from app.rag.chat import _db_executor
+    
+    assert _db_executor._max_workers == settings.postgres_pool_size
+
+
+@pytest.mark.asyncio
+async def test_run_db_uses_injected_executor_and_propagates_errors():
+    """_run_db runs on the given executor and re-raises store exceptions"""
+    # Arrange
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-db")
+    service = RAGChatService(
+        embedding_service=Mock(),
+        llm_router=Mock(),
+        conversation_store=InMemoryConversationStore(),
+        redis_client=Mock(),
+        db_executor=executor
+    )
+    
+    def failing():
+        raise RuntimeError("db down")
+    
+    # Act / Assert
+    try:
+        name = await service._run_db(lambda: threading.current_thread().name)
+        assert name.startswith("test-db")
+        with pytest.raises(RuntimeError, match="db down"):
+            await service._run_db(failing)
+    finally:
+        executor.shutdown(wait=False)
+
+
 @pytest.mark.asyncio
 async def test_rag_chat_service_generate_response():
     """Test RAG chat service response generation"""
     # Arrange
     mock_embedding_service = Mock()
-    mock_embedding_service.search_similar = AsyncMock(return_value=[
+    mock_embedding_service.embed_query = AsyncMock(return_value=[0.1] * 768)
+    mock_embedding_service.search_by_embedding = AsyncMock(return_value=[
         {
             'id': 1,
             'content': 'RAG is a technique',
@@ -246,15 +389,20 @@ async def test_rag_chat_service_generate_response():
         }
     ])
     
-    mock_llm = Mock()
-    mock_llm.generate_response = Mock(return_value="RAG stands for Retrieval-Augmented Generation")
+    mock_router = Mock()
+    mock_router.generate = AsyncMock(return_value={
+        "text": "RAG stands for Retrieval-Augmented Generation",
+        "provider": "gemini",
+        "fallback_used": False
+    })
     
     mock_store = InMemoryConversationStore()
     
     service = RAGChatService(
         embedding_service=mock_embedding_service,
-        llm_provider=mock_llm,
-        conversation_store=mock_store
+        llm_router=mock_router,
+        conversation_store=mock_store,
+        redis_client=Mock()
     )
     
     # Act
@@ -273,17 +421,23 @@ async def test_rag_chat_service_with_conversation_id():
     """Test RAG chat service with existing conversation"""
     # Arrange
     mock_embedding_service = Mock()
-    mock_embedding_service.search_similar = AsyncMock(return_value=[])
+    mock_embedding_service.embed_query = AsyncMock(return_value=[0.1] * 768)
+    mock_embedding_service.search_by_embedding = AsyncMock(return_value=[])
     
-    mock_llm = Mock()
-    mock_llm.generate_response = Mock(return_value="Follow-up answer")
+    mock_router = Mock()
+    mock_router.generate = AsyncMock(return_value={
+        "text": "Follow-up answer",
+        "provider": "gemini",
+        "fallback_used": False
+    })
     
     mock_store = InMemoryConversationStore()
     
     service = RAGChatService(
         embedding_service=mock_embedding_service,
-        llm_provider=mock_llm,
-        conversation_store=mock_store
+        llm_router=mock_router,
+        conversation_store=mock_store,
+        redis_client=Mock()
     )
     
     # First message
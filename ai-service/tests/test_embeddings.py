@@ -4,7 +4,12 @@ Unit Tests for Embedding Service
 Tests following AAA pattern (Arrange, Act, Assert)
 Uses pytest with mocking for external dependencies
 """
+import asyncio
+import time
+
 import pytest
+import numpy as np
+import orjson
 from unittest.mock import Mock, MagicMock, patch
 from typing import List, Dict
 
@@ -13,7 +18,9 @@ from app.rag.embeddings import (
     GeminiEmbeddingProvider,
     EmbeddingRepository,
     PostgreSQLEmbeddingRepository,
-    EmbeddingService
+    EmbeddingService,
+    l2_normalize,
+    to_vector_literal
 )
 
 
@@ -74,7 +81,7 @@ class TestGeminiEmbeddingProvider:
         
         # Assert
         assert len(result) == 768
-        assert all(isinstance(x, float) for x in result)
+        assert result.dtype == np.float32
         mock_embed.assert_called_once()
     
     @patch('google.generativeai.embed_content')
@@ -91,6 +98,22 @@ class TestGeminiEmbeddingProvider:
         
         assert "API Error" in str(exc_info.value)
     
+    @patch('google.generativeai.embed_content')
+    def test_generate_embeddings_batches_in_one_call(self, mock_embed):
+        """Test several texts are embedded with a single API call"""
+        # Arrange
+        mock_embed.return_value = {'embedding': [[0.1] * 768, [0.2] * 768]}
+        provider = GeminiEmbeddingProvider(api_key="test_key")
+        
+        # Act
+        result = provider.generate_embeddings(["first", "second"])
+        
+        # Assert
+        assert len(result) == 2
+        assert all(vector.dtype == np.float32 for vector in result)
+        mock_embed.assert_called_once()
+        assert mock_embed.call_args.kwargs["content"] == ["first", "second"]
+    
     def test_dimension_property(self):
         """Test dimension property returns correct value"""
         # Arrange & Act
@@ -103,6 +126,29 @@ class TestGeminiEmbeddingProvider:
         assert provider.dimension == 768
 
 
+def test_l2_normalize_returns_unit_vector():
+    """Test embeddings are scaled to unit length, zero vectors left alone"""
+    # Act
+    unit = l2_normalize([3.0, 4.0])
+    zero = l2_normalize([0.0, 0.0])
+    
+    # Assert
+    np.testing.assert_allclose(unit, [0.6, 0.8], rtol=1e-6)
+    assert np.linalg.norm(l2_normalize(np.random.rand(768))) == pytest.approx(1.0, abs=1e-6)
+    assert not zero.any()
+
+
+def test_to_vector_literal_round_trips_float32():
+    """Vector literals preserve float32 values exactly"""
+    embedding = np.asarray([0.1, -2.5, 1e-7, 3.0], dtype=np.float32)
+    
+    literal = to_vector_literal(embedding)
+    parsed = np.asarray(literal.strip("[]").split(","), dtype=np.float32)
+    
+    assert literal.startswith("[") and literal.endswith("]")
+    assert np.array_equal(parsed, embedding)
+
+
 # ============================================
 # Repository Tests
 # ============================================
@@ -129,6 +175,44 @@ class TestPostgreSQLEmbeddingRepository:
         mock_db.execute_one.assert_called_once()
         mock_db.commit.assert_called_once()
     
+    def test_save_serializes_metadata_as_json(self):
+        """Test metadata is bound as a JSON string"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute_one.return_value = {'id': 7}
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        repository.save("content", [0.5, 0.25], {"source": "test", "tags": ["a", "b"]})
+        
+        # Assert
+        params = mock_db.execute_one.call_args[0][1]
+        assert params[1] == to_vector_literal(l2_normalize([0.5, 0.25]))
+        assert params[2] == '{"source":"test","tags":["a","b"]}'
+    
+    def test_save_many_uses_single_insert(self):
+        """Test batch save issues one multi-row INSERT and one commit"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute_many.return_value = [{'id': 3}, {'id': 4}]
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        result = repository.save_many([
+            ("first", [0.5], {"source": "a"}),
+            ("second", [0.25], {"source": "b"}),
+        ])
+        
+        # Assert
+        assert result == [3, 4]
+        mock_db.execute_many.assert_called_once()
+        rows = mock_db.execute_many.call_args[0][1]
+        assert rows == [
+            ("first", "[1]", '{"source":"a"}'),
+            ("second", "[1]", '{"source":"b"}'),
+        ]
+        mock_db.commit.assert_called_once()
+    
     def test_find_similar(self):
         """Test finding similar embeddings"""
         # Arrange
@@ -150,6 +234,111 @@ class TestPostgreSQLEmbeddingRepository:
         assert results[0]["similarity"] == 0.95
         mock_db.execute.assert_called_once()
     
+    def test_find_similar_sets_ef_search_to_cover_limit(self):
+        """Test ef_search is raised to at least the result limit"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute.return_value = []
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        repository.find_similar([0.1] * 768, limit=50, threshold=0.5, ef_search=10)
+        
+        # Assert
+        query, params = mock_db.execute.call_args[0]
+        assert "SET LOCAL hnsw.ef_search" in query
+        assert params[0] == 50
+    
+    def test_find_similar_pushes_limit_into_index_scan(self):
+        """Test the ANN scan is limited before the threshold filter"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute.return_value = []
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        repository.find_similar([0.1] * 768, limit=5, threshold=0.7)
+        
+        # Assert
+        query, params = mock_db.execute.call_args[0]
+        inner, outer = query.split(") nearest")
+        assert "ORDER BY embedding::halfvec" in inner and "<#>" in inner
+        assert "LIMIT %s" in inner
+        assert "WHERE nearest.similarity > %s" in outer
+        assert params[-2:] == (5, 0.7)
+    
+    def test_find_similar_sends_query_vector_once(self):
+        """Test the query vector literal is bound a single time"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute.return_value = []
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        repository.find_similar([0.5] * 768, limit=5, threshold=0.7)
+        
+        # Assert
+        query, params = mock_db.execute.call_args[0]
+        assert [p for p in params if isinstance(p, str)] == [to_vector_literal(l2_normalize([0.5] * 768))]
+        assert "q.emb" in query
+    
+    def test_find_similar_binary_mode_reranks_candidates(self):
+        """Test binary mode scans the 1-bit index and reranks at full precision"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute.return_value = []
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        with patch("app.rag.embeddings.settings.binary_rerank_candidates", 200):
+            repository.find_similar([0.1] * 768, limit=5, threshold=0.7)
+        
+        # Assert
+        query, params = mock_db.execute.call_args[0]
+        candidates, rerank = query.split(") candidates")
+        assert "binary_quantize(embedding)" in candidates and "<~>" in candidates
+        assert "ORDER BY similarity DESC" in rerank
+        assert params[0] == 200
+        assert params[-3:] == (200, 5, 0.7)
+    
+    def test_find_hybrid_blends_text_and_vector_scores(self):
+        """Test hybrid search unions FTS matches with ANN neighbours"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute.return_value = []
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        repository.find_hybrid([0.1] * 768, "python fastapi", limit=5, threshold=0.7, text_weight=0.3)
+        
+        # Assert
+        query, params = mock_db.execute.call_args[0]
+        assert "to_tsvector('simple', e.content) @@ q.tsq" in query
+        assert "<#>" in query and "UNION" in query
+        assert "python fastapi" in params
+        assert params[-4:] == (0.3, 0.3, 0.7, 5)
+    
+    def test_find_similar_batch_groups_rows_by_query(self):
+        """Test batched rows are split back into per-query results"""
+        # Arrange
+        mock_db = Mock()
+        mock_db.execute.return_value = [
+            {"qid": 1, "id": 7, "content": "a", "metadata": {}, "similarity": 0.9},
+            {"qid": 3, "id": 8, "content": "b", "metadata": {}, "similarity": 0.8},
+        ]
+        repository = PostgreSQLEmbeddingRepository(db_connection=mock_db)
+        
+        # Act
+        results = repository.find_similar_batch([[0.1] * 768] * 3, limit=5, threshold=0.7)
+        
+        # Assert
+        query, params = mock_db.execute.call_args[0]
+        assert "CROSS JOIN LATERAL" in query
+        assert len(params[1]) == 3
+        assert [[row["id"] for row in rows] for rows in results] == [[7], [], [8]]
+        assert "qid" not in results[0][0]
+        mock_db.execute.assert_called_once()
+    
     def test_delete_embedding(self):
         """Test deleting embedding"""
         # Arrange
@@ -186,6 +375,24 @@ class TestEmbeddingService:
         mock_embedding_provider.generate_embedding.assert_called_once_with(content)
         mock_embedding_repository.save.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_ingest_many_embeds_and_saves_in_batch(self, embedding_service, mock_embedding_provider, mock_embedding_repository):
+        """Test batch ingestion makes one provider call and one repository call"""
+        # Arrange
+        mock_embedding_provider.generate_embeddings.return_value = [[0.1], [0.2]]
+        mock_embedding_repository.save_many.return_value = [1, 2]
+        
+        # Act
+        result = await embedding_service.ingest_many([("a", {"source": "x"}), ("b", None)])
+        
+        # Assert
+        assert result == [1, 2]
+        mock_embedding_provider.generate_embeddings.assert_called_once_with(["a", "b"])
+        mock_embedding_repository.save_many.assert_called_once_with([
+            ("a", [0.1], {"source": "x"}),
+            ("b", [0.2], {}),
+        ])
+    
     @pytest.mark.asyncio
     async def test_search_similar(self, embedding_service, mock_embedding_provider, mock_embedding_repository):
         """Test similarity search"""
@@ -201,6 +408,156 @@ class TestEmbeddingService:
         mock_embedding_provider.generate_embedding.assert_called_once_with(query, task_type="retrieval_query")
         mock_embedding_repository.find_similar.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_blocking_provider_does_not_block_event_loop(self, embedding_service, mock_embedding_provider):
+        """Test provider calls run off the event loop"""
+        # Arrange
+        def slow_embedding(text, task_type="retrieval_document"):
+            time.sleep(0.2)
+            return [0.1] * 768
+        mock_embedding_provider.generate_embedding.side_effect = slow_embedding
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        # Act
+        ticker_task = asyncio.create_task(ticker())
+        await embedding_service.embed_query("test query")
+        ticker_task.cancel()
+        
+        # Assert
+        assert ticks >= 5
+    
+    @pytest.mark.asyncio
+    async def test_search_similar_uses_hybrid_when_enabled(self, embedding_service, mock_embedding_repository):
+        """Test a text weight routes searches through hybrid retrieval"""
+        # Arrange
+        mock_embedding_repository.find_hybrid.return_value = []
+        
+        # Act
+        with patch("app.rag.embeddings.settings.hybrid_text_weight", 0.3):
+            await embedding_service.search_similar("python developer", limit=5)
+        
+        # Assert
+        mock_embedding_repository.find_hybrid.assert_called_once()
+        assert mock_embedding_repository.find_hybrid.call_args.kwargs["query_text"] == "python developer"
+        mock_embedding_repository.find_similar.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_search_similar_batch(self, embedding_service, mock_embedding_provider, mock_embedding_repository):
+        """Test batched similarity search embeds all queries in one request"""
+        # Arrange
+        queries = [f"query {i}" for i in range(10)]
+        mock_embedding_provider.generate_embeddings.return_value = [[0.1] * 768] * 10
+        mock_embedding_repository.find_similar_batch.return_value = [[{"id": 1, "similarity": 0.9}]] * 10
+        
+        # Act
+        results = await embedding_service.search_similar_batch(queries, limit=3)
+        
+        # Assert
+        assert len(results) == 10
+        mock_embedding_provider.generate_embeddings.assert_called_once_with(queries, task_type="retrieval_query")
+        mock_embedding_provider.generate_embedding.assert_not_called()
+        mock_embedding_repository.find_similar_batch.assert_called_once()
+        mock_embedding_repository.find_similar.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_search_by_embedding_skips_provider(self, embedding_service, mock_embedding_provider, mock_embedding_repository):
+        """Test searching with a precomputed query embedding"""
+        # Act
+        results = await embedding_service.search_by_embedding([0.1] * 768, limit=3, threshold=0.5)
+        
+        # Assert
+        assert len(results) == 1
+        mock_embedding_provider.generate_embedding.assert_not_called()
+        mock_embedding_repository.find_similar.assert_called_once_with(
+            query_embedding=[0.1] * 768,
+            limit=3,
+            threshold=0.5
+        )
+    
+    @pytest.mark.asyncio
+    async def test_search_by_embedding_uses_knn_cache(self, mock_embedding_provider, mock_embedding_repository):
+        """Test a cached KNN result is served with a primary-key lookup"""
+        # Arrange
+        store = {}
+        cache = Mock()
+        cache.get.side_effect = store.get
+        cache.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+        mock_embedding_repository.find_by_ids.return_value = [
+            {"id": 1, "content": "Test content", "metadata": {}}
+        ]
+        service = EmbeddingService(
+            provider=mock_embedding_provider,
+            repository=mock_embedding_repository,
+            cache=cache
+        )
+        
+        # Act
+        first = await service.search_by_embedding([0.1] * 768, limit=5, threshold=0.5)
+        second = await service.search_by_embedding([0.1] * 768, limit=5, threshold=0.5)
+        
+        # Assert
+        assert first == second
+        assert second[0]["similarity"] == 0.95
+        mock_embedding_repository.find_similar.assert_called_once()
+        mock_embedding_repository.find_by_ids.assert_called_once_with([1])
+    
+    @pytest.mark.asyncio
+    async def test_search_by_embedding_refreshes_stale_knn_cache(self, mock_embedding_provider, mock_embedding_repository):
+        """Test a cached KNN result with deleted ids falls back to a fresh search"""
+        # Arrange
+        store = {}
+        cache = Mock()
+        cache.get.side_effect = store.get
+        cache.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+        mock_embedding_repository.find_by_ids.return_value = []
+        service = EmbeddingService(
+            provider=mock_embedding_provider,
+            repository=mock_embedding_repository,
+            cache=cache
+        )
+        
+        # Act
+        await service.search_by_embedding([0.1] * 768, limit=5, threshold=0.5)
+        mock_embedding_repository.find_similar.return_value = [
+            {"id": 7, "content": "Re-ingested content", "metadata": {}, "similarity": 0.9}
+        ]
+        result = await service.search_by_embedding([0.1] * 768, limit=5, threshold=0.5)
+        
+        # Assert
+        assert result[0]["id"] == 7
+        assert mock_embedding_repository.find_similar.call_count == 2
+        assert orjson.loads(next(iter(store.values()))) == [[7, 0.9]]
+    
+    @pytest.mark.asyncio
+    async def test_embed_query_uses_embedding_cache(self, mock_embedding_provider, mock_embedding_repository):
+        """Test repeated queries are embedded only once"""
+        # Arrange
+        store = {}
+        cache = Mock()
+        cache.get.side_effect = store.get
+        cache.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+        service = EmbeddingService(
+            provider=mock_embedding_provider,
+            repository=mock_embedding_repository,
+            cache=cache
+        )
+        
+        # Act
+        first = await service.embed_query("What is Python?")
+        second = await service.embed_query("  what is   python? ")
+        
+        # Assert
+        np.testing.assert_allclose(second, first, rtol=1e-6)
+        mock_embedding_provider.generate_embedding.assert_called_once_with(
+            "What is Python?", task_type="retrieval_query"
+        )
+    
     @pytest.mark.asyncio
     async def test_delete_embedding(self, embedding_service, mock_embedding_repository):
         """Test embedding deletion"""
@@ -0,0 +1,42 @@
+"""
+Unit Tests for Startup Migrations
+
+Tests which migration files run_migrations applies.
+"""
+from unittest.mock import Mock, patch
+
+
+def _applied_sql(**overrides):
+    """Run migrations against a mock connection and return the executed SQL"""
+    from app import main
+    
+    db = Mock()
+    with patch.object(main, "get_db_connection", return_value=db):
+        with patch.multiple(main.settings, **overrides):
+            main.run_migrations()
+    
+    return [call.args[0] for call in db._cursor.execute.call_args_list]
+
+
+class TestRunMigrations:
+    """Tests for run_migrations"""
+    
+    def test_optional_indexes_skipped_by_default(self):
+        """Feature indexes should not be built while their feature is off"""
+        applied = _applied_sql(binary_rerank_candidates=0, hybrid_text_weight=0.0)
+        
+        assert any("idx_embeddings_hnsw " in sql for sql in applied)
+        assert not any("idx_embeddings_hnsw_binary" in sql for sql in applied)
+        assert not any("idx_embeddings_content_fts" in sql for sql in applied)
+    
+    def test_binary_index_applied_when_enabled(self):
+        """Enabling binary reranking should build its index after the base migrations"""
+        applied = _applied_sql(binary_rerank_candidates=200, hybrid_text_weight=0.0)
+        
+        assert "idx_embeddings_hnsw_binary" in applied[-1]
+    
+    def test_fts_index_applied_when_hybrid_enabled(self):
+        """Enabling hybrid retrieval should build the full-text index"""
+        applied = _applied_sql(binary_rerank_candidates=0, hybrid_text_weight=0.3)
+        
+        assert "idx_embeddings_content_fts" in applied[-1]
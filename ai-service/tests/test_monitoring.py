@@ -1,16 +1,21 @@
 """
 Unit Tests for Monitoring Module
 
-Tests metrics collection, correlation IDs, and health checking.
+Tests metrics collection, correlation IDs, health checking and log formatting.
 """
 import pytest
 import asyncio
+import logging
+import threading
+import orjson
 from unittest.mock import Mock, AsyncMock
 from app.monitoring import (
     MetricsCollector,
     HealthChecker,
+    JSONLogFormatter,
     get_correlation_id,
-    set_correlation_id
+    set_correlation_id,
+    track_request
 )
 
 
@@ -49,6 +54,15 @@ class TestMetricsCollector:
         result = self.metrics.get_metrics()
         assert result["timings_avg_ms"]["test_op"] == 150.0
     
+    def test_timing_average_uses_recent_window(self):
+        """Average should only cover the most recent timings"""
+        for _ in range(MetricsCollector.TIMING_WINDOW):
+            self.metrics.timing("test_op", 100.0)
+        for _ in range(MetricsCollector.TIMING_WINDOW):
+            self.metrics.timing("test_op", 300.0)
+        result = self.metrics.get_metrics()
+        assert result["timings_avg_ms"]["test_op"] == 300.0
+    
     def test_error_counter(self):
         """Should track errors"""
         self.metrics.error("test_error")
@@ -81,6 +95,73 @@ class TestMetricsCollector:
         assert result["counters"] == {}
         assert result["timings_avg_ms"] == {}
         assert result["errors"] == {}
+    
+    def test_prometheus_export(self):
+        """Should render labelled samples in the text exposition format"""
+        self.metrics.increment("chat.requests", 3)
+        self.metrics.timing("chat.duration_ms", 20.0)
+        self.metrics.error('bad"name')
+        
+        text = self.metrics.to_prometheus("ai_service")
+        
+        assert "# TYPE ai_service_counter_total counter" in text
+        assert 'ai_service_counter_total{metric="chat.requests"} 3' in text
+        assert 'ai_service_timing_avg_ms{metric="chat.duration_ms"} 20.0' in text
+        assert 'ai_service_errors_total{metric="bad\\"name"} 1' in text
+        assert text.endswith("\n")
+    
+    def test_concurrent_increments_across_shards(self):
+        """Counts should be exact when threads record many metrics at once"""
+        names = [f"metric_{i}" for i in range(40)]
+        
+        def record():
+            for _ in range(250):
+                for name in names:
+                    self.metrics.increment(name)
+        
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        counters = self.metrics.get_metrics()["counters"]
+        assert counters == {name: 1000 for name in names}
+
+
+class TestTrackRequest:
+    """Tests for the track_request decorator"""
+    
+    def setup_method(self):
+        """Reset metrics before each test"""
+        MetricsCollector().reset()
+    
+    @pytest.mark.asyncio
+    async def test_async_handler_records_request_and_timing(self):
+        """Should count successful calls and record their duration"""
+        @track_request("test.handler")
+        async def handler():
+            return "ok"
+        
+        assert await handler() == "ok"
+        assert await handler() == "ok"
+        result = MetricsCollector().get_metrics()
+        
+        assert result["counters"]["test.handler.requests"] == 2
+        assert "test.handler.duration_ms" in result["timings_avg_ms"]
+    
+    def test_sync_handler_records_errors(self):
+        """Should count failures and re-raise them"""
+        @track_request("test.sync")
+        def handler():
+            raise ValueError("boom")
+        
+        with pytest.raises(ValueError):
+            handler()
+        result = MetricsCollector().get_metrics()
+        
+        assert result["counters"]["test.sync.errors"] == 1
+        assert result["errors"]["test.sync"] == 1
 
 
 class TestCorrelationId:
@@ -102,6 +183,35 @@ class TestCorrelationId:
         assert cid == test_id
 
 
+class TestJSONLogFormatter:
+    """Tests for JSONLogFormatter"""
+    
+    @staticmethod
+    def _record(msg, args=(), **extra):
+        record = logging.LogRecord("app.test", logging.INFO, __file__, 1, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+    
+    def test_dict_message_is_merged(self):
+        """Dict messages should become top-level JSON fields"""
+        set_correlation_id("cid-1")
+        line = JSONLogFormatter().format(self._record({"event": "llm_success", "latency_ms": 12}))
+        payload = orjson.loads(line)
+        
+        assert payload["event"] == "llm_success"
+        assert payload["latency_ms"] == 12
+        assert payload["level"] == "INFO"
+        assert payload["correlation_id"] == "cid-1"
+    
+    def test_string_message_and_extras(self):
+        """Formatted messages and extra fields should be included"""
+        line = JSONLogFormatter().format(self._record("failed: %s", ("boom",), duration_ms=3.5))
+        payload = orjson.loads(line)
+        
+        assert payload["message"] == "failed: boom"
+        assert payload["duration_ms"] == 3.5
+
+
 class TestHealthChecker:
     """Tests for HealthChecker class"""
     
@@ -166,6 +276,42 @@ class TestHealthChecker:
         assert result["dependencies"]["cache"]["status"] == "unhealthy"
         assert result["dependencies"]["api"]["status"] == "healthy"
     
+    @pytest.mark.asyncio
+    async def test_checks_run_concurrently(self):
+        """Total latency should track the slowest check, not the sum"""
+        checker = HealthChecker("test-service")
+        
+        async def slow_check():
+            await asyncio.sleep(0.1)
+            return True
+        
+        for name in ("db", "cache", "api"):
+            checker.register_dependency(name, slow_check, critical=True)
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await checker.check_all()
+        elapsed = loop.time() - start
+        
+        assert result["status"] == "healthy"
+        assert elapsed < 0.25
+    
+    @pytest.mark.asyncio
+    async def test_timeout_marks_unhealthy(self):
+        """A hanging check should fail with a timeout error"""
+        checker = HealthChecker("test-service", timeout=0.01)
+        
+        async def hanging_check():
+            await asyncio.sleep(1)
+            return True
+        
+        checker.register_dependency("db", hanging_check, critical=True)
+        
+        result = await checker.check_all()
+        
+        assert result["status"] == "unhealthy"
+        assert result["dependencies"]["db"]["error"] == "timeout"
+    
     @pytest.mark.asyncio
     async def test_returns_service_name(self):
         """Should include service name in response"""
@@ -185,3 +331,22 @@ class TestHealthChecker:
         result = await checker.check_all()
         
         assert "timestamp" in result
+
+
+class TestMetricsEndpoints:
+    """Tests for the monitoring endpoints of the live app"""
+    
+    def test_default_response_class_is_orjson(self):
+        """Plain endpoints should be serialized with ORJSONResponse"""
+        from fastapi.responses import ORJSONResponse
+        from fastapi.routing import APIRoute
+        from fastapi.testclient import TestClient
+        from app.main import app
+        
+        route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == "/metrics")
+        response = TestClient(app).get("/metrics")
+        
+        assert app.router.default_response_class is ORJSONResponse
+        assert route.response_class is ORJSONResponse
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,105 @@
+"""
+Unit Tests for LLM Providers
+
+Tests the provider protocol and raw response parsing in the Groq provider
+against a mocked HTTP transport.
+"""
+import pytest
+import httpx
+import orjson
+from groq import AsyncGroq
+
+from app.rag.router import LLMProvider
+from app.rag.providers.groq import GroqLLMProvider
+from app.rag.providers.static import StaticFallbackProvider
+
+
+def _provider_with_transport(handler) -> GroqLLMProvider:
+    """Groq provider whose async client talks to a mock transport"""
+    provider = GroqLLMProvider(api_key="test_key", model_name="test-model")
+    provider.aclient = AsyncGroq(
+        api_key="test_key",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return provider
+
+
+class TestProviderProtocol:
+    """Tests for the LLMProvider protocol"""
+
+    def test_providers_satisfy_protocol(self):
+        """Concrete providers should be recognised as LLMProviders"""
+        providers = [
+            GroqLLMProvider(api_key="test_key", model_name="test-model"),
+            StaticFallbackProvider()
+        ]
+
+        assert all(isinstance(provider, LLMProvider) for provider in providers)
+
+    def test_name_is_class_attribute(self):
+        """Provider names should be plain class attributes, not properties"""
+        assert GroqLLMProvider.name == "groq"
+        assert StaticFallbackProvider.name == "static_fallback"
+
+
+class TestGroqLLMProvider:
+    """Tests for GroqLLMProvider"""
+
+    @pytest.mark.asyncio
+    async def test_agenerate_response_reads_raw_content(self):
+        """Completion content should be read from the raw JSON body"""
+        def handler(request):
+            return httpx.Response(200, json={
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hola"}}]
+            })
+
+        provider = _provider_with_transport(handler)
+
+        assert await provider.agenerate_response("prompt") == "Hola"
+
+    @pytest.mark.asyncio
+    async def test_agenerate_response_rejects_empty_content(self):
+        """Empty completions should raise so the router can fall back"""
+        def handler(request):
+            return httpx.Response(200, json={
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": ""}}]
+            })
+
+        provider = _provider_with_transport(handler)
+
+        with pytest.raises(ValueError):
+            await provider.agenerate_response("prompt")
+
+    @pytest.mark.asyncio
+    async def test_stream_parses_sse_deltas(self):
+        """Streamed deltas should be parsed from SSE lines until [DONE]"""
+        events = [
+            {"choices": [{"index": 0, "delta": {"role": "assistant"}}]},
+            {"choices": [{"index": 0, "delta": {"content": "Ho"}}]},
+            {"choices": [{"index": 0, "delta": {"content": "la"}}]},
+        ]
+        body = b"".join(b"data: " + orjson.dumps(e) + b"\n\n" for e in events) + b"data: [DONE]\n\n"
+
+        def handler(request):
+            assert orjson.loads(request.content)["stream"] is True
+            return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+
+        provider = _provider_with_transport(handler)
+
+        chunks = [chunk async for chunk in provider.generate_response_stream("prompt")]
+
+        assert chunks == ["Ho", "la"]
+
+    @pytest.mark.asyncio
+    async def test_stream_raises_on_error_event(self):
+        """Error events inside the stream should raise"""
+        body = b'data: {"error": {"message": "overloaded"}}\n\n'
+
+        def handler(request):
+            return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+
+        provider = _provider_with_transport(handler)
+
+        with pytest.raises(RuntimeError, match="overloaded"):
+            async for _ in provider.generate_response_stream("prompt"):
+                pass
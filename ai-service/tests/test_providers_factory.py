@@ -75,6 +75,14 @@ class TestProviderFactory:
         provider = factory.create("gemini")
         assert provider.name == "custom-gemini"
     
+    def test_provider_names_are_case_insensitive(self):
+        """Registered and default names should match regardless of case"""
+        factory = ProviderFactory()
+        factory.register("Custom", MockProvider("custom"))
+        
+        assert factory.create("CUSTOM").name == "custom"
+        assert factory.get_available_providers().count("custom") == 1
+    
     def test_get_available_providers(self):
         """Should list available providers"""
         factory = ProviderFactory()
@@ -8,11 +8,19 @@ Verifies:
 - Metrics tracking
 """
 import pytest
-from unittest.mock import Mock, MagicMock, patch
-import redis
+from unittest.mock import Mock, patch
+import asyncio
+import fakeredis
+import orjson
+import redis.asyncio as aioredis
 import time
+from tenacity import wait_none
 
-from app.rag.router import LLMRouter, CircuitBreaker, CircuitState, LLMProvider
+from app.monitoring import metrics
+from app.rag.router import (
+    LLMRouter, CircuitBreaker, CircuitState, LLMProvider, ProviderMetricsBuffer,
+    provider_metrics_buffer, RETRY_DEADLINE_S, _is_transient, _retry_after, _wait_for_retry
+)
 
 
 class MockLLMProvider(LLMProvider):
@@ -35,12 +43,53 @@ class MockLLMProvider(LLMProvider):
 
 
 @pytest.fixture
-def mock_redis():
-    """Mock Redis client"""
-    redis_mock = MagicMock(spec=redis.Redis)
-    redis_mock.get.return_value = None
-    redis_mock.incr.return_value = 1
-    return redis_mock
+def fake_redis():
+    """In-memory async Redis with real command and Lua semantics"""
+    return fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture(scope="session")
+def redis_container_url():
+    """URL of a throwaway Redis 7 container; skips when Docker is unavailable"""
+    testcontainers_redis = pytest.importorskip("testcontainers.redis")
+    container = testcontainers_redis.RedisContainer("redis:7-alpine")
+    try:
+        container.start()
+    except Exception as e:
+        pytest.skip(f"Redis container unavailable: {e}")
+    try:
+        host = container.get_container_host_ip()
+        port = container.get_exposed_port(6379)
+        yield f"redis://{host}:{port}/0"
+    finally:
+        container.stop()
+
+
+@pytest.fixture(params=["fakeredis", pytest.param("container", marks=pytest.mark.integration)])
+async def redis_backend(request):
+    """Async Redis client on fakeredis and, with Docker, a real Redis server"""
+    if request.param == "fakeredis":
+        yield fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer())
+        return
+    
+    client = aioredis.from_url(request.getfixturevalue("redis_container_url"))
+    await client.flushdb()
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture(autouse=True)
+def no_retry_wait():
+    """Keep retries but skip the real backoff sleeps between attempts"""
+    with patch.object(LLMRouter._call_provider.retry, "wait", wait_none()):
+        yield
+
+
+async def _set_circuit(client, provider: str, state: CircuitState, opened_at: float = None):
+    """Put a provider's circuit into a given state, as another worker would"""
+    await client.set(f"llm:{provider}:circuit_state", state.value)
+    if state == CircuitState.OPEN:
+        await client.set(f"llm:{provider}:opened_at", str(opened_at or time.time()))
 
 
 @pytest.fixture
@@ -58,63 +107,234 @@ def secondary_provider():
 class TestCircuitBreaker:
     """Test Circuit Breaker logic"""
     
-    def test_initial_state_is_closed(self, mock_redis):
+    @pytest.mark.asyncio
+    async def test_initial_state_is_closed(self, fake_redis):
         """Circuit should start in CLOSED state"""
-        breaker = CircuitBreaker(mock_redis, "test_provider")
-        assert breaker.get_state() == CircuitState.CLOSED
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        assert await breaker.get_state() == CircuitState.CLOSED
     
-    def test_circuit_opens_after_threshold_failures(self, mock_redis):
+    @pytest.mark.asyncio
+    async def test_circuit_opens_after_threshold_failures(self, fake_redis):
         """Circuit should open after 5 failures"""
-        breaker = CircuitBreaker(mock_redis, "test_provider")
+        breaker = CircuitBreaker(fake_redis, "test_provider")
         
         # Simulate failures
-        for i in range(5):
-            mock_redis.incr.return_value = i + 1
-            breaker.record_failure()
+        for _ in range(5):
+            await breaker.record_failure()
         
         # Verify circuit opened
-        mock_redis.set.assert_called()
-        calls = [call for call in mock_redis.set.call_args_list if 'circuit_state' in str(call)]
-        assert any(CircuitState.OPEN.value in str(call) for call in calls)
+        assert await fake_redis.get(breaker.state_key) == CircuitState.OPEN.value.encode()
+        assert await fake_redis.ttl(breaker.failure_key) > 0
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_failures_are_all_counted(self, fake_redis):
+        """Failures recorded concurrently by separate workers should not be lost"""
+        breakers = [CircuitBreaker(fake_redis, "test_provider") for _ in range(5)]
+        
+        await asyncio.gather(*(breaker.record_failure() for breaker in breakers))
+        
+        assert await fake_redis.get(breakers[0].failure_key) == b"5"
+        assert await fake_redis.get(breakers[0].state_key) == CircuitState.OPEN.value.encode()
     
-    def test_circuit_closes_on_success_from_half_open(self, mock_redis):
+    @pytest.mark.asyncio
+    async def test_failures_past_threshold_do_not_reopen(self, fake_redis):
+        """An already OPEN circuit should not be re-stamped by later failures"""
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        await _set_circuit(fake_redis, "test_provider", CircuitState.OPEN, opened_at=123.0)
+        await fake_redis.set(breaker.failure_key, CircuitBreaker.FAILURE_THRESHOLD)
+        
+        await breaker.record_failure()
+        
+        assert await fake_redis.get(breaker.opened_key) == b"123.0"
+    
+    @pytest.mark.asyncio
+    async def test_circuit_transitions_are_counted_in_metrics(self, fake_redis):
+        """Opening the circuit should be visible in the metrics endpoint"""
+        metrics.reset()
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        
+        for _ in range(5):
+            await breaker.record_failure()
+        
+        assert metrics.get_metrics()["counters"]["llm.test_provider.circuit_open"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_circuit_closes_on_success_from_half_open(self, fake_redis):
         """Circuit should close when request succeeds in HALF_OPEN state"""
-        breaker = CircuitBreaker(mock_redis, "test_provider")
+        breaker = CircuitBreaker(fake_redis, "test_provider")
         
         # Set to HALF_OPEN
-        mock_redis.get.return_value = CircuitState.HALF_OPEN.value.encode()
+        await _set_circuit(fake_redis, "test_provider", CircuitState.HALF_OPEN)
+        await fake_redis.set(breaker.failure_key, 3)
         
         # Record success
-        breaker.record_success()
+        await breaker.record_success()
         
         # Verify circuit closed
-        mock_redis.delete.assert_called_with(breaker.failure_key)
+        assert await fake_redis.exists(breaker.failure_key) == 0
+        assert await fake_redis.get(breaker.state_key) == CircuitState.CLOSED.value.encode()
+    
+    @pytest.mark.asyncio
+    async def test_recovery_starts_traffic_ramp(self, fake_redis):
+        """Closing from HALF_OPEN should admit only a small share of calls at first"""
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        await _set_circuit(fake_redis, "test_provider", CircuitState.HALF_OPEN)
+        
+        await breaker.record_success()
+        
+        assert await fake_redis.exists(breaker.recovered_key) == 1
+        with patch("app.rag.router.random.random", return_value=CircuitBreaker.RECOVERY_MIN_SHARE + 0.05):
+            assert breaker.admit_during_recovery() is False
+        with patch("app.rag.router.random.random", return_value=CircuitBreaker.RECOVERY_MIN_SHARE - 0.05):
+            assert breaker.admit_during_recovery() is True
+    
+    @pytest.mark.asyncio
+    async def test_recovery_ramp_is_read_from_redis(self, fake_redis):
+        """Other workers should see a recent recovery and finish ramping after RECOVERY_RAMP"""
+        breaker = CircuitBreaker(fake_redis, "test_provider", state_cache_ttl=0)
+        await fake_redis.set(breaker.recovered_key, str(time.time()))
+        
+        await breaker.get_state()
+        with patch("app.rag.router.random.random", return_value=0.5):
+            assert breaker.admit_during_recovery() is False
+        
+        await fake_redis.set(breaker.recovered_key, str(time.time() - CircuitBreaker.RECOVERY_RAMP))
+        await breaker.get_state()
+        with patch("app.rag.router.random.random", return_value=0.99):
+            assert breaker.admit_during_recovery() is True
     
-    def test_can_attempt_returns_false_when_open(self, mock_redis):
+    @pytest.mark.asyncio
+    async def test_can_attempt_returns_false_when_open(self, fake_redis):
         """Should not attempt when circuit is OPEN"""
-        breaker = CircuitBreaker(mock_redis, "test_provider")
-        mock_redis.get.return_value = CircuitState.OPEN.value.encode()
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        await _set_circuit(fake_redis, "test_provider", CircuitState.OPEN)
         
-        assert breaker.can_attempt() is False
+        assert await breaker.can_attempt() is False
     
-    def test_can_attempt_returns_true_when_closed(self, mock_redis):
+    @pytest.mark.asyncio
+    async def test_open_circuit_moves_to_half_open_after_cooldown(self, fake_redis):
+        """An OPEN circuit past OPEN_DURATION should allow a trial request"""
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        opened_at = time.time() - CircuitBreaker.OPEN_DURATION - 1
+        await _set_circuit(fake_redis, "test_provider", CircuitState.OPEN, opened_at=opened_at)
+        
+        assert await breaker.get_state() == CircuitState.HALF_OPEN
+        assert await fake_redis.get(breaker.state_key) == CircuitState.HALF_OPEN.value.encode()
+    
+    @pytest.mark.asyncio
+    async def test_get_state_uses_single_pipeline_round_trip(self, fake_redis):
+        """State and open timestamp should be fetched in one pipeline"""
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        
+        with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as pipeline, \
+                patch.object(fake_redis, "get", wraps=fake_redis.get) as get:
+            await breaker.get_state()
+        
+        pipeline.assert_called_once_with(transaction=False)
+        get.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_get_state_is_cached_within_ttl(self, fake_redis):
+        """Repeated reads within the TTL should not hit Redis"""
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        
+        with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as pipeline:
+            await breaker.get_state()
+            await breaker.get_state()
+        
+        assert pipeline.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_get_state_refreshes_after_ttl(self, fake_redis):
+        """A zero TTL should always read through to Redis"""
+        breaker = CircuitBreaker(fake_redis, "test_provider", state_cache_ttl=0)
+        
+        with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as pipeline:
+            await breaker.get_state()
+            await breaker.get_state()
+        
+        assert pipeline.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_tripping_circuit_updates_cached_state(self, fake_redis):
+        """Opening the circuit should be visible without another Redis read"""
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        await breaker.get_state()
+        
+        await fake_redis.set(breaker.failure_key, CircuitBreaker.FAILURE_THRESHOLD - 1)
+        await breaker.record_failure()
+        
+        with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as pipeline:
+            assert await breaker.get_state() == CircuitState.OPEN
+        pipeline.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_can_attempt_returns_true_when_closed(self, fake_redis):
         """Should attempt when circuit is CLOSED"""
-        breaker = CircuitBreaker(mock_redis, "test_provider")
-        mock_redis.get.return_value = CircuitState.CLOSED.value.encode()
+        breaker = CircuitBreaker(fake_redis, "test_provider")
+        await _set_circuit(fake_redis, "test_provider", CircuitState.CLOSED)
+        
+        assert await breaker.can_attempt() is True
+    
+    @pytest.mark.asyncio
+    async def test_routers_share_breaker_state(self, primary_provider, fake_redis):
+        """Per-request routers should reuse one breaker and its cached state"""
+        first = LLMRouter(primary=primary_provider, redis_client=fake_redis)
+        second = LLMRouter(primary=primary_provider, redis_client=fake_redis)
+        
+        with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as pipeline:
+            await first.primary_breaker.get_state()
+            await second.primary_breaker.get_state()
         
-        assert breaker.can_attempt() is True
+        assert first.primary_breaker is second.primary_breaker
+        assert pipeline.call_count == 1
+
+    
+    @pytest.mark.asyncio
+    async def test_failures_trip_local_circuit_when_redis_is_down(self):
+        """An unreachable Redis should not disable the breaker"""
+        server = fakeredis.FakeServer()
+        server.connected = False
+        breaker = CircuitBreaker(fakeredis.aioredis.FakeRedis(server=server), "test_provider")
+        
+        for _ in range(CircuitBreaker.FAILURE_THRESHOLD):
+            await breaker.record_failure()
+        
+        assert breaker.degraded
+        assert await breaker.can_attempt() is False
+    
+    @pytest.mark.asyncio
+    async def test_degraded_breaker_skips_redis_until_retry(self):
+        """After a Redis error, calls should not wait on Redis again until the retry window ends"""
+        server = fakeredis.FakeServer()
+        server.connected = False
+        client = fakeredis.aioredis.FakeRedis(server=server)
+        breaker = CircuitBreaker(client, "test_provider", state_cache_ttl=0)
+        await breaker.get_state()
+        
+        with patch.object(client, "pipeline", wraps=client.pipeline) as pipeline:
+            await breaker.get_state()
+            await breaker.record_success()
+        pipeline.assert_not_called()
+        
+        server.connected = True
+        breaker._degraded_until = 0.0  # Retry window elapsed
+        await _set_circuit(client, "test_provider", CircuitState.OPEN)
+        
+        assert await breaker.get_state() == CircuitState.OPEN
+        assert not breaker.degraded
 
 
 class TestLLMRouter:
     """Test LLM Router orchestration"""
     
     @pytest.mark.asyncio
-    async def test_router_uses_primary_when_available(self, primary_provider, secondary_provider, mock_redis):
+    async def test_router_uses_primary_when_available(self, primary_provider, secondary_provider, fake_redis):
         """Router should use primary provider when it works"""
         router = LLMRouter(
             primary=primary_provider,
             secondary=secondary_provider,
-            redis_client=mock_redis
+            redis_client=fake_redis
         )
         
         response = await router.generate("test prompt")
@@ -126,7 +346,7 @@ class TestLLMRouter:
         assert secondary_provider.call_count == 0
     
     @pytest.mark.asyncio
-    async def test_router_falls_back_to_secondary_on_primary_failure(self, mock_redis):
+    async def test_router_falls_back_to_secondary_on_primary_failure(self, fake_redis):
         """Router should fallback to Groq when Gemini fails"""
         primary = MockLLMProvider("gemini", should_fail=True)
         secondary = MockLLMProvider("groq", should_fail=False)
@@ -134,7 +354,7 @@ class TestLLMRouter:
         router = LLMRouter(
             primary=primary,
             secondary=secondary,
-            redis_client=mock_redis
+            redis_client=fake_redis
         )
         
         response = await router.generate("test prompt")
@@ -146,7 +366,7 @@ class TestLLMRouter:
         assert secondary.call_count == 1
     
     @pytest.mark.asyncio
-    async def test_router_returns_static_when_all_fail(self, mock_redis):
+    async def test_router_returns_static_when_all_fail(self, fake_redis):
         """Router should return static fallback when all providers fail"""
         primary = MockLLMProvider("gemini", should_fail=True)
         secondary = MockLLMProvider("groq", should_fail=True)
@@ -154,7 +374,7 @@ class TestLLMRouter:
         router = LLMRouter(
             primary=primary,
             secondary=secondary,
-            redis_client=mock_redis
+            redis_client=fake_redis
         )
         
         response = await router.generate("test prompt")
@@ -164,39 +384,81 @@ class TestLLMRouter:
         assert "Disculpa las molestias" in response["text"]
     
     @pytest.mark.asyncio
-    async def test_router_skips_primary_when_circuit_open(self, mock_redis):
+    async def test_router_skips_primary_when_circuit_open(self, fake_redis):
         """Router should skip primary when circuit is OPEN"""
         primary = MockLLMProvider("gemini")
         secondary = MockLLMProvider("groq")
         
-        # Mock circuit breaker to return OPEN state
-        with patch.object(CircuitBreaker, 'can_attempt', return_value=False):
-            router = LLMRouter(
-                primary=primary,
-                secondary=secondary,
-                redis_client=mock_redis
-            )
-            
+        # Primary circuit opened by another worker
+        await _set_circuit(fake_redis, "gemini", CircuitState.OPEN)
+        router = LLMRouter(
+            primary=primary,
+            secondary=secondary,
+            redis_client=fake_redis
+        )
+        
+        response = await router.generate("test prompt")
+        
+        # Should skip to secondary
+        assert response["provider"] == "groq"
+        assert primary.call_count == 0  # Never called
+        assert secondary.call_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_router_prefers_secondary_while_primary_ramps_up(self, fake_redis):
+        """Calls not admitted to a recovering primary should go to the secondary"""
+        primary = MockLLMProvider("gemini")
+        secondary = MockLLMProvider("groq")
+        await fake_redis.set("llm:gemini:recovered_at", str(time.time()))
+        router = LLMRouter(primary=primary, secondary=secondary, redis_client=fake_redis)
+        
+        with patch("app.rag.router.random.random", return_value=0.5):
             response = await router.generate("test prompt")
-            
-            # Should skip to secondary
-            assert response["provider"] == "groq"
-            assert primary.call_count == 0  # Never called
-            assert secondary.call_count == 1
+        
+        assert response["provider"] == "groq"
+        assert primary.call_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_router_uses_ramping_primary_without_secondary(self, fake_redis):
+        """Without a secondary, a recovering primary should still take every call"""
+        primary = MockLLMProvider("gemini")
+        await fake_redis.set("llm:gemini:recovered_at", str(time.time()))
+        router = LLMRouter(primary=primary, redis_client=fake_redis)
+        
+        with patch("app.rag.router.random.random", return_value=0.5):
+            response = await router.generate("test prompt")
+        
+        assert response["provider"] == "gemini"
     
     @pytest.mark.asyncio
-    async def test_router_tracks_metrics_in_redis(self, primary_provider, mock_redis):
+    async def test_router_tracks_metrics_in_redis(self, primary_provider, fake_redis):
         """Router should track request metrics in Redis"""
         router = LLMRouter(
             primary=primary_provider,
-            redis_client=mock_redis
+            redis_client=fake_redis
         )
         
         await router.generate("test prompt")
+        await provider_metrics_buffer(fake_redis).flush()
         
         # Verify metrics were tracked
-        mock_redis.incr.assert_any_call("llm:gemini:requests")
-        mock_redis.lpush.assert_called()  # Latency tracking
+        assert await fake_redis.get("llm:gemini:requests") == b"1"
+        assert await fake_redis.llen("llm:gemini:latency_ms") == 1  # Latency tracking
+    
+    @pytest.mark.asyncio
+    async def test_router_metrics_are_batched(self, fake_redis):
+        """Metrics from many requests should reach Redis in one pipeline"""
+        router = LLMRouter(primary=MockLLMProvider("gemini"), redis_client=fake_redis)
+        
+        with patch.object(fake_redis, "pipeline", wraps=fake_redis.pipeline) as pipeline:
+            for i in range(5):
+                await router.generate(f"prompt {i}")
+            state_reads = pipeline.call_count
+            await asyncio.sleep(ProviderMetricsBuffer.FLUSH_INTERVAL + 0.05)
+        
+        assert pipeline.call_count == state_reads + 1
+        assert await fake_redis.get("llm:gemini:requests") == b"5"
+        assert await fake_redis.llen("llm:gemini:latency_ms") == 5
     
     @pytest.mark.asyncio
     async def test_router_works_without_redis(self, primary_provider):
@@ -212,12 +474,252 @@ class TestLLMRouter:
         assert response["text"] == "Response from gemini"
         assert response["provider"] == "gemini"
 
+    
+    @pytest.mark.asyncio
+    async def test_router_awaits_async_provider(self, fake_redis):
+        """Router should await agenerate_response instead of the sync call"""
+        class AsyncProvider(LLMProvider):
+            def generate_response(self, prompt: str) -> str:
+                raise AssertionError("sync path should not be used")
+            
+            async def agenerate_response(self, prompt: str) -> str:
+                return "Async response"
+            
+            @property
+            def name(self) -> str:
+                return "async"
+        
+        router = LLMRouter(
+            primary=AsyncProvider(),
+            redis_client=fake_redis
+        )
+        
+        response = await router.generate("test prompt")
+        
+        assert response["text"] == "Async response"
+        assert response["fallback_used"] is False
+
+
+
+class TestHedging:
+    """Test hedged requests against a recovering primary"""
+    
+    class SlowProvider(LLMProvider):
+        def __init__(self, name: str, delay: float, should_fail: bool = False):
+            self._name = name
+            self.delay = delay
+            self.should_fail = should_fail
+            self.cancelled = False
+        
+        def generate_response(self, prompt: str) -> str:
+            raise AssertionError("sync path should not be used")
+        
+        async def agenerate_response(self, prompt: str) -> str:
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            if self.should_fail:
+                raise ValueError(f"{self._name} failed")
+            return f"Response from {self._name}"
+        
+        @property
+        def name(self) -> str:
+            return self._name
+    
+    @pytest.mark.asyncio
+    async def test_hedge_returns_secondary_when_half_open_primary_is_slow(self, fake_redis):
+        """Secondary should win and primary be cancelled when primary stalls"""
+        primary = self.SlowProvider("gemini", delay=5)
+        secondary = self.SlowProvider("groq", delay=0)
+        
+        await _set_circuit(fake_redis, "gemini", CircuitState.HALF_OPEN)
+        router = LLMRouter(
+            primary=primary,
+            secondary=secondary,
+            redis_client=fake_redis,
+            hedge_delay_s=0.01
+        )
+        response = await router.generate("test prompt")
+        
+        assert response["provider"] == "groq"
+        assert response["fallback_used"] is True
+        await asyncio.sleep(0)  # Let the cancellation reach the loser
+        assert primary.cancelled
+    
+    @pytest.mark.asyncio
+    async def test_hedge_returns_primary_when_it_answers_first(self, fake_redis):
+        """Primary answering within the hedge delay should not start secondary"""
+        primary = self.SlowProvider("gemini", delay=0)
+        secondary = MockLLMProvider("groq")
+        
+        await _set_circuit(fake_redis, "gemini", CircuitState.HALF_OPEN)
+        router = LLMRouter(
+            primary=primary,
+            secondary=secondary,
+            redis_client=fake_redis,
+            hedge_delay_s=1
+        )
+        response = await router.generate("test prompt")
+        
+        assert response["provider"] == "gemini"
+        assert secondary.call_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_no_hedge_when_circuit_closed(self, fake_redis):
+        """Secondary should not be raced while the primary circuit is CLOSED"""
+        primary = self.SlowProvider("gemini", delay=0.05)
+        secondary = MockLLMProvider("groq")
+        
+        router = LLMRouter(
+            primary=primary,
+            secondary=secondary,
+            redis_client=fake_redis,
+            hedge_delay_s=0.01
+        )
+        response = await router.generate("test prompt")
+        
+        assert response["provider"] == "gemini"
+        assert secondary.call_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_hedge_falls_back_to_static_when_both_fail(self, fake_redis):
+        """Static fallback should be returned when both hedged calls fail"""
+        primary = self.SlowProvider("gemini", delay=0, should_fail=True)
+        secondary = self.SlowProvider("groq", delay=0, should_fail=True)
+        
+        await _set_circuit(fake_redis, "gemini", CircuitState.HALF_OPEN)
+        router = LLMRouter(
+            primary=primary,
+            secondary=secondary,
+            redis_client=fake_redis,
+            hedge_delay_s=0.01
+        )
+        response = await router.generate("test prompt")
+        
+        assert response["provider"] == "static_fallback"
+    
+    @pytest.mark.asyncio
+    async def test_always_hedge_races_slow_closed_primary(self, fake_redis):
+        """With always_hedge, a slow but healthy primary should not hold up the answer"""
+        primary = self.SlowProvider("gemini", delay=5)
+        secondary = self.SlowProvider("groq", delay=0)
+        
+        router = LLMRouter(
+            primary=primary,
+            secondary=secondary,
+            redis_client=fake_redis,
+            hedge_delay_s=0.01,
+            always_hedge=True
+        )
+        response = await asyncio.wait_for(router.generate("test prompt"), timeout=1)
+        
+        assert response["provider"] == "groq"
+        await asyncio.sleep(0)  # Let the cancellation reach the loser
+        assert primary.cancelled
+
+
+
+class TestResponseCache:
+    """Test the Redis-backed response cache"""
+    
+    @pytest.mark.asyncio
+    async def test_provider_response_is_cached(self, primary_provider, fake_redis):
+        """A successful answer should be stored under the normalized prompt key"""
+        router = LLMRouter(primary=primary_provider, redis_client=fake_redis)
+        
+        await router.generate("  Test Prompt ")
+        
+        key = router._response_cache_key("test prompt")
+        assert 0 < await fake_redis.ttl(key) <= LLMRouter.RESPONSE_CACHE_TTL
+        assert orjson.loads(await fake_redis.get(key))["text"] == "Response from gemini"
+    
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_providers(self, primary_provider, fake_redis):
+        """A cached answer should be returned without calling any provider"""
+        router = LLMRouter(primary=primary_provider, redis_client=fake_redis)
+        cached = orjson.dumps({"text": "Cached", "provider": "gemini", "fallback_used": False})
+        await fake_redis.set(router._response_cache_key("test prompt"), cached)
+        
+        response = await router.generate("test prompt", conversation_id="c1")
+        
+        assert response["text"] == "Cached"
+        assert response["metadata"] == {"cache": "hit", "conversation_id": "c1"}
+        assert primary_provider.call_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_static_fallback_is_not_cached(self, fake_redis):
+        """Outage responses should never be cached"""
+        router = LLMRouter(
+            primary=MockLLMProvider("gemini", should_fail=True),
+            redis_client=fake_redis
+        )
+        
+        response = await router.generate("test prompt")
+        
+        assert response["provider"] == "static_fallback"
+        assert await fake_redis.keys("llm:cache:*") == []
+
+
+class TestConcurrency:
+    """Test the per-provider concurrency gate and request coalescing"""
+    
+    class CountingProvider(LLMProvider):
+        def __init__(self, name: str):
+            self._name = name
+            self.active = 0
+            self.peak = 0
+            self.call_count = 0
+        
+        def generate_response(self, prompt: str) -> str:
+            raise AssertionError("sync path should not be used")
+        
+        async def agenerate_response(self, prompt: str) -> str:
+            self.call_count += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return f"Response to {prompt}"
+        
+        @property
+        def name(self) -> str:
+            return self._name
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_bounded(self):
+        """No more than MAX_CONCURRENT_CALLS should reach a provider at once"""
+        provider = self.CountingProvider("bounded")
+        
+        with patch.object(LLMRouter, "MAX_CONCURRENT_CALLS", 3):
+            await asyncio.gather(*(
+                LLMRouter(primary=provider).generate(f"prompt {i}") for i in range(20)
+            ))
+        
+        assert provider.call_count == 20
+        assert provider.peak <= 3
+    
+    @pytest.mark.asyncio
+    async def test_identical_prompts_are_coalesced(self):
+        """Concurrent identical prompts should share one provider call"""
+        provider = self.CountingProvider("coalesced")
+        
+        responses = await asyncio.gather(*(
+            LLMRouter(primary=provider).generate("same prompt", conversation_id=f"c{i}")
+            for i in range(5)
+        ))
+        
+        assert provider.call_count == 1
+        assert {r["text"] for r in responses} == {"Response to same prompt"}
+        assert [r["metadata"]["conversation_id"] for r in responses] == [f"c{i}" for i in range(5)]
+
 
 class TestExponentialBackoff:
     """Test retry logic with exponential backoff"""
     
     @pytest.mark.asyncio
-    async def test_router_retries_on_network_errors(self, mock_redis):
+    async def test_router_retries_on_network_errors(self, fake_redis):
         """Router should retry on transient network errors"""
         call_count = 0
         
@@ -235,17 +737,165 @@ class TestExponentialBackoff:
         
         router = LLMRouter(
             primary=FlakyProvider(),
-            redis_client=mock_redis
+            redis_client=fake_redis
         )
         
         response = await router.generate("test prompt")
         
         assert response["text"] == "Success after retries"
         assert call_count == 3  # Failed 2 times, succeeded on 3rd
+    
+    @pytest.mark.asyncio
+    async def test_router_does_not_retry_client_errors(self, fake_redis):
+        """Non-transient API errors should fall through without retrying"""
+        class BadRequest(Exception):
+            status_code = 400
+        
+        primary = MockLLMProvider("primary")
+        primary.generate_response = Mock(side_effect=BadRequest("invalid prompt"))
+        secondary = MockLLMProvider("secondary")
+        
+        router = LLMRouter(primary=primary, secondary=secondary, redis_client=fake_redis)
+        
+        response = await router.generate("test prompt")
+        
+        assert response["provider"] == "secondary"
+        assert primary.generate_response.call_count == 1
+    
+    def test_transient_errors_are_retryable(self):
+        """Rate limits, 5xx and network errors are transient"""
+        class RateLimited(Exception):
+            status_code = 429
+        
+        class Unavailable(Exception):
+            status_code = 503
+        
+        class Unauthorized(Exception):
+            status_code = 401
+        
+        assert _is_transient(RateLimited())
+        assert _is_transient(Unavailable())
+        assert _is_transient(TimeoutError())
+        assert not _is_transient(Unauthorized())
+        assert not _is_transient(ValueError("empty response"))
+    
+    def test_retry_after_header_is_honoured_and_capped(self):
+        """Retry-After should be read from the error response and capped"""
+        def error_with_retry_after(value):
+            error = Exception("rate limited")
+            error.response = Mock(headers={"retry-after": value})
+            return error
+        
+        assert _retry_after(error_with_retry_after("2")) == 2.0
+        assert _retry_after(error_with_retry_after("120")) == 10.0
+        assert _retry_after(error_with_retry_after("soon")) is None
+        assert _retry_after(Exception("no response")) is None
+    
+    def test_retry_wait_never_passes_deadline(self):
+        """Waits should be clipped to what is left of the retry deadline"""
+        error = Exception("rate limited")
+        error.response = Mock(headers={"retry-after": "10"})
+        retry_state = Mock(seconds_since_start=RETRY_DEADLINE_S - 1)
+        retry_state.outcome.exception.return_value = error
+        
+        assert _wait_for_retry(retry_state) == 1.0
+        
+        retry_state.seconds_since_start = RETRY_DEADLINE_S + 1
+        assert _wait_for_retry(retry_state) == 0.0
+
+
+class TestStreaming:
+    """Test streamed generation through the router"""
+    
+    @staticmethod
+    async def _collect(router, prompt="test prompt"):
+        return [chunk async for chunk in router.generate_stream(prompt)]
+    
+    @pytest.mark.asyncio
+    async def test_stream_uses_primary(self, primary_provider, secondary_provider, fake_redis):
+        """Providers without native streaming yield their full response"""
+        router = LLMRouter(
+            primary=primary_provider,
+            secondary=secondary_provider,
+            redis_client=fake_redis
+        )
+        
+        chunks = await self._collect(router)
+        
+        assert [c["text"] for c in chunks] == ["Response from gemini"]
+        assert chunks[0]["provider"] == "gemini"
+        assert chunks[0]["fallback_used"] is False
+        assert secondary_provider.call_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_before_first_chunk(self, fake_redis):
+        """Router should switch provider if the primary fails before streaming"""
+        primary = MockLLMProvider("gemini", should_fail=True)
+        secondary = MockLLMProvider("groq")
+        router = LLMRouter(primary=primary, secondary=secondary, redis_client=fake_redis)
+        
+        chunks = await self._collect(router)
+        
+        assert "".join(c["text"] for c in chunks) == "Response from groq"
+        assert chunks[0]["fallback_used"] is True
+    
+    @pytest.mark.asyncio
+    async def test_stream_keeps_partial_answer_on_mid_stream_failure(self, fake_redis):
+        """A failure after the first chunk ends the stream without switching provider"""
+        class BrokenStreamProvider(MockLLMProvider):
+            async def generate_response_stream(self, prompt):
+                yield "partial"
+                raise ConnectionError("stream dropped")
+        
+        secondary = MockLLMProvider("groq")
+        router = LLMRouter(
+            primary=BrokenStreamProvider("gemini"),
+            secondary=secondary,
+            redis_client=fake_redis
+        )
+        
+        chunks = await self._collect(router)
+        
+        assert [c["text"] for c in chunks] == ["partial"]
+        assert secondary.call_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_stream_commits_to_provider_on_first_token(self, fake_redis):
+        """Success should be recorded on the first non-empty chunk, before the stream ends"""
+        class TwoChunkProvider(MockLLMProvider):
+            async def generate_response_stream(self, prompt):
+                yield ""
+                yield "first"
+                yield " second"
+        
+        router = LLMRouter(primary=TwoChunkProvider("gemini"), redis_client=fake_redis)
+        await fake_redis.set(router.primary_breaker.failure_key, 2)
+        stream = router.generate_stream("test prompt")
+        
+        first = await stream.__anext__()
+        
+        assert first["text"] == "first"
+        assert await fake_redis.exists(router.primary_breaker.failure_key) == 0
+        assert [c["text"] async for c in stream] == [" second"]
+    
+    @pytest.mark.asyncio
+    async def test_stream_returns_static_when_all_fail(self, fake_redis):
+        """Router should stream the static fallback when all providers fail"""
+        router = LLMRouter(
+            primary=MockLLMProvider("gemini", should_fail=True),
+            secondary=MockLLMProvider("groq", should_fail=True),
+            redis_client=fake_redis
+        )
+        
+        chunks = await self._collect(router)
+        
+        assert len(chunks) == 1
+        assert chunks[0]["provider"] == "static_fallback"
+        assert "Disculpa las molestias" in chunks[0]["text"]
 
 
 @pytest.mark.asyncio
-async def test_integration_full_fallback_chain(mock_redis):
+async def test_integration_full_fallback_chain(redis_backend):
     """Integration test: Full fallback chain Gemini → Groq → Static"""
     
     # Scenario: Gemini fails, Groq succeeds
@@ -255,7 +905,7 @@ async def test_integration_full_fallback_chain(mock_redis):
     router = LLMRouter(
         primary=primary,
         secondary=secondary,
-        redis_client=mock_redis
+        redis_client=redis_backend
     )
     
     response = await router.generate("test prompt", conversation_id="test-123")
@@ -265,3 +915,5 @@ async def test_integration_full_fallback_chain(mock_redis):
     assert response["fallback_used"] is True
     assert response["metadata"]["conversation_id"] == "test-123"
     assert "Response from groq" in response["text"]
+    assert await redis_backend.get(router.primary_breaker.failure_key) == b"1"
+    assert 0 < await redis_backend.ttl(router.primary_breaker.failure_key) <= CircuitBreaker.FAILURE_WINDOW
@@ -1,15 +1,36 @@
 """
 Unit Tests for Security Module
 
-Tests input sanitization, CSS selector validation, and URL validation.
+Tests input sanitization, CSS selector validation, URL validation,
+password hashing and JWT verification.
 """
 import pytest
-from app.security import sanitize_input, sanitize_css_selector, sanitize_url
+from datetime import timedelta
+from fastapi import HTTPException
+from unittest.mock import patch
+
+from app import security
+from app.security import (
+    sanitize_input,
+    sanitize_prompt,
+    sanitize_css_selector,
+    sanitize_url,
+    verify_password,
+    get_password_hash,
+    create_access_token,
+    verify_token,
+)
 
 
 class TestSanitizeInput:
     """Tests for sanitize_input function"""
     
+    def test_escapes_like_html_escape(self):
+        """Escaping should match html.escape with quotes"""
+        import html
+        text = """<a href="x">Tom & Jerry's</a>"""
+        assert sanitize_input(text) == html.escape(text)
+    
     def test_sanitize_normal_text(self):
         """Normal text should pass through unchanged (but trimmed)"""
         result = sanitize_input("  Hello World  ")
@@ -21,12 +42,23 @@ class TestSanitizeInput:
         assert "<script>" not in result
         assert "&lt;script&gt;" in result
     
+    def test_plain_text_skips_escaping(self):
+        """Text without markup characters should come back as-is"""
+        text = "¿Qué experiencia tienes con Python?"
+        assert sanitize_input(text) is text
+    
     def test_sanitize_with_max_length(self):
         """Content should be truncated if exceeds max_length"""
         long_text = "a" * 2000
         result = sanitize_input(long_text, max_length=100)
         assert len(result) == 100
     
+    def test_truncation_matches_escaping_full_text(self):
+        """Truncating before escaping should give the same output as after"""
+        import html
+        text = "<b>" * 50
+        assert sanitize_input(text, max_length=10) == html.escape(text)[:10]
+    
     def test_sanitize_empty_string(self):
         """Empty string should return empty"""
         result = sanitize_input("")
@@ -38,6 +70,23 @@ class TestSanitizeInput:
         assert result == ""
 
 
+class TestSanitizePrompt:
+    """Tests for sanitize_prompt function"""
+    
+    def test_keeps_markup_characters(self):
+        """Prompt text should reach the LLM without HTML entities"""
+        result = sanitize_prompt("  What does <div> & 'x' mean?  ")
+        assert result == "What does <div> & 'x' mean?"
+    
+    def test_truncates_to_max_length(self):
+        """Prompt text should be truncated to max_length"""
+        assert sanitize_prompt("abcdef", max_length=3) == "abc"
+    
+    def test_empty_prompt(self):
+        """Empty prompt should return empty string"""
+        assert sanitize_prompt("") == ""
+
+
 class TestSanitizeCssSelector:
     """Tests for sanitize_css_selector function"""
     
@@ -61,10 +110,25 @@ class TestSanitizeCssSelector:
         result = sanitize_css_selector("<script>evil()</script>")
         assert "script" not in result.lower()
     
+    def test_removes_script_exposed_by_handler_removal(self):
+        """Patterns exposed by an earlier removal should also be removed"""
+        result = sanitize_css_selector("<sonclick=cript")
+        assert "script" not in result.lower()
+    
+    def test_removes_nested_patterns(self):
+        """Patterns rebuilt by a removal should be removed on the next pass"""
+        result = sanitize_css_selector("javajavascript:script:alert(1)")
+        assert "javascript" not in result.lower()
+    
     def test_empty_selector(self):
         """Empty selector should return empty string"""
         result = sanitize_css_selector("")
         assert result == ""
+    
+    def test_repeat_selector_is_served_from_cache(self):
+        """Repeated selectors should return the cached result"""
+        selector = "div.price onclick=x"
+        assert sanitize_css_selector(selector) is sanitize_css_selector(selector)
 
 
 class TestSanitizeUrl:
@@ -85,22 +149,100 @@ class TestSanitizeUrl:
         result = sanitize_url("HTTPS://EXAMPLE.COM/PAGE")
         assert result == "https://example.com/page"
     
-    def test_rejects_non_http_urls(self):
-        """Non-HTTP URLs should raise ValueError"""
+    def test_repeat_url_is_served_from_cache(self):
+        """Repeated URLs should return the cached result"""
+        url = "https://Example.com/jobs?page=1"
+        assert sanitize_url(url) is sanitize_url(url)
+    
+    @pytest.mark.parametrize("url", [
+        "javascript:alert(1)",
+        "data:text/html,<script>alert(1)</script>",
+        "file:///etc/passwd",
+    ], ids=["javascript", "data", "file"])
+    def test_rejects_non_http_urls(self, url):
+        """Non-HTTP schemes should raise ValueError"""
         with pytest.raises(ValueError):
-            sanitize_url("javascript:alert(1)")
-    
-    def test_rejects_data_urls(self):
-        """data: URLs should raise ValueError"""
-        with pytest.raises(ValueError):
-            sanitize_url("data:text/html,<script>alert(1)</script>")
-    
-    def test_rejects_file_urls(self):
-        """file: URLs should raise ValueError"""
-        with pytest.raises(ValueError):
-            sanitize_url("file:///etc/passwd")
+            sanitize_url(url)
     
     def test_strips_whitespace(self):
         """Whitespace should be stripped"""
         result = sanitize_url("  https://example.com  ")
         assert result == "https://example.com"
+
+
+class TestPasswordHashing:
+    """Tests for bcrypt password hashing"""
+    
+    def test_hash_round_trip(self):
+        """A hashed password should verify against itself only"""
+        with patch.object(security.settings, "bcrypt_rounds", 4):
+            hashed = get_password_hash("s3cret")
+        
+        assert verify_password("s3cret", hashed) is True
+        assert verify_password("wrong", hashed) is False
+    
+    def test_malformed_hash_does_not_verify(self):
+        """A malformed hash should fail verification instead of raising"""
+        assert verify_password("s3cret", "not-a-bcrypt-hash") is False
+
+
+class TestVerifyToken:
+    """Tests for JWT verification and its cache"""
+    
+    def test_valid_token_is_cached(self):
+        """Repeated verification of the same token should skip decoding"""
+        token = create_access_token({"sub": "admin"})
+        
+        with patch.object(security.jwt, "decode", wraps=security.jwt.decode) as decode:
+            assert verify_token(token)["sub"] == "admin"
+            assert verify_token(token)["sub"] == "admin"
+        
+        assert decode.call_count == 1
+    
+    def test_mutating_returned_payload_does_not_touch_cache(self):
+        """Callers get their own copy of the payload on both miss and hit"""
+        token = create_access_token({"sub": "admin"})
+        
+        first = verify_token(token)
+        first["sub"] = "attacker"
+        second = verify_token(token)
+        second["role"] = "superuser"
+        
+        assert verify_token(token) == {"sub": "admin", "exp": second["exp"]}
+    
+    def test_expired_cache_entry_is_a_miss(self):
+        """Cached tokens past their exp claim should be re-verified"""
+        token = create_access_token({"sub": "admin"}, expires_delta=timedelta(minutes=5))
+        verify_token(token)
+        
+        with patch.object(security.time, "time", return_value=10**12), \
+                patch.object(security.jwt, "decode", wraps=security.jwt.decode) as decode:
+            verify_token(token)
+        
+        assert decode.call_count == 1
+    
+    def test_identical_claims_reuse_recent_token(self):
+        """Re-issuing the same claims within the reuse window returns the same token"""
+        first = create_access_token({"sub": "service-a"}, expires_delta=timedelta(hours=1))
+        second = create_access_token({"sub": "service-a"}, expires_delta=timedelta(hours=1))
+        other = create_access_token({"sub": "service-b"}, expires_delta=timedelta(hours=1))
+        
+        assert first == second
+        assert other != first
+        assert isinstance(verify_token(first)["exp"], int)
+    
+    def test_token_reissued_after_reuse_window(self):
+        """A token older than the reuse window should not be handed out again"""
+        first = create_access_token({"sub": "service-c"}, expires_delta=timedelta(hours=1))
+        
+        with patch.object(security.time, "time", return_value=security.time.time() + 120):
+            second = create_access_token({"sub": "service-c"}, expires_delta=timedelta(hours=1))
+        
+        assert first != second
+    
+    def test_invalid_token_raises(self):
+        """Invalid tokens should raise 401"""
+        with pytest.raises(HTTPException) as exc_info:
+            verify_token("not-a-token")
+        
+        assert exc_info.value.status_code == 401
@@ -7,7 +7,8 @@ Set ENV=staging or ENV=production to load different configs.
 """
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator, model_validator
-from typing import Optional
+from functools import cached_property, lru_cache
+from typing import FrozenSet, Optional
 import os
 
 
@@ -39,6 +40,23 @@ class Settings(BaseSettings):
         env="USER_AGENT"
     )
     browser_contexts: int = Field(default=5, env="PLAYWRIGHT_CONTEXTS")
+    browser_pool_recycle_after: int = Field(default=100, env="BROWSER_POOL_RECYCLE_AFTER")
+    selector_timeout: int = Field(default=5000, env="PLAYWRIGHT_SELECTOR_TIMEOUT")
+    blocked_resource_types: str = Field(
+        default="image,media,font,stylesheet",
+        env="BLOCKED_RESOURCE_TYPES"
+    )
+    browser_extraction: bool = Field(default=True, env="BROWSER_EXTRACTION")
+    user_data_dir: Optional[str] = Field(default=None, env="PLAYWRIGHT_USER_DATA_DIR")
+    disk_cache_size: int = Field(default=1024 * 1024 * 1024, env="PLAYWRIGHT_DISK_CACHE_SIZE")
+    ephemeral_cache: bool = Field(default=False, env="PLAYWRIGHT_EPHEMERAL_CACHE")
+    
+    # Plain HTTP fast path (skips the browser for pages with server-rendered HTML)
+    http_fast_path: bool = Field(default=True, env="HTTP_FAST_PATH")
+    http_fallback_ratio: float = Field(default=0.5, env="HTTP_FALLBACK_RATIO")
+    
+    # HTML parsing: selectolax (fastest), lxml or beautifulsoup
+    html_parser: str = Field(default="selectolax", env="HTML_PARSER")
     
     # Cache Configuration
     cache_enabled: bool = Field(default=True, env="CACHE_ENABLED")
@@ -87,12 +105,26 @@ class Settings(BaseSettings):
         """Check if running in development"""
         return self.env == "development"
     
-    @property
+    @cached_property
     def allowed_origins_list(self) -> list:
-        """Get allowed origins as list"""
+        """Get allowed origins as list (parsed once per instance)"""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
     
-    @property
+    @cached_property
+    def allowed_origins_set(self) -> FrozenSet[str]:
+        """Allowed origins for O(1) membership checks"""
+        return frozenset(self.allowed_origins_list)
+    
+    @cached_property
+    def blocked_resource_types_set(self) -> FrozenSet[str]:
+        """Playwright resource types aborted before they load"""
+        return frozenset(
+            resource_type.strip()
+            for resource_type in self.blocked_resource_types.split(",")
+            if resource_type.strip()
+        )
+    
+    @cached_property
     def redis_url(self) -> str:
         """Construct Redis connection URL"""
         if self.redis_password:
@@ -100,9 +132,12 @@ class Settings(BaseSettings):
         return f"redis://{self.redis_host}:{self.redis_port}/{self.redis_db}"
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Get settings instance with environment-specific config loading.
+    
+    Cached, so the env file is read and validated once per process.
     """
     env = os.getenv("ENV", "development")
     return Settings(_env_file=f".env.{env}" if env != "development" else ".env")
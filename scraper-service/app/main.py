@@ -5,19 +5,22 @@ FastAPI application with dependency injection and comprehensive documentation.
 """
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field, HttpUrl
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+from functools import lru_cache
 import asyncio
 
 from app.config import settings
 from app.security import sanitize_css_selector, sanitize_url
-from app.monitoring import metrics
+from app.monitoring import metrics, lru_cache_stats
 from app.scrapers.base import (
     ScraperService,
     JobPostingScraper,
     ExtractionRule,
     ScrapedData
 )
+from app.scrapers.http_fetcher import HttpFetcher
 
 # ============================================
 # Application Setup
@@ -45,13 +48,14 @@ app = FastAPI(
     """,
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.allowed_origins_list,
+    allow_origins=settings.allowed_origins_set,  # CORS checks each request origin with `in`
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -65,20 +69,25 @@ _scraper_service: Optional[ScraperService] = None
 _job_scraper: Optional[JobPostingScraper] = None
 
 
-def get_scraper_service() -> ScraperService:
+async def get_scraper_service() -> ScraperService:
     """
     Dependency injection for ScraperService.
     
+    Async so FastAPI calls it on the event loop instead of dispatching
+    it to the threadpool on every request.
+    
     Returns:
         Singleton ScraperService instance
     """
     global _scraper_service
     if _scraper_service is None:
-        _scraper_service = ScraperService()
+        _scraper_service = ScraperService(
+            http_fetcher=HttpFetcher() if settings.http_fast_path else None
+        )
     return _scraper_service
 
 
-def get_job_scraper() -> JobPostingScraper:
+async def get_job_scraper() -> JobPostingScraper:
     """
     Dependency injection for JobPostingScraper.
     
@@ -87,11 +96,38 @@ def get_job_scraper() -> JobPostingScraper:
     """
     global _job_scraper
     if _job_scraper is None:
-        scraper = get_scraper_service()
+        scraper = await get_scraper_service()
         _job_scraper = JobPostingScraper(scraper_service=scraper)
     return _job_scraper
 
 
+RULE_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def build_extraction_rules(
+    rule_items: Tuple[Tuple[str, str, Optional[str], bool], ...]
+) -> Dict[str, ExtractionRule]:
+    """
+    Build sanitized extraction rules, reused across requests with the same rules.
+    
+    Args:
+        rule_items: (field_name, selector, attribute, multiple) tuples,
+            in field order
+        
+    Returns:
+        Dictionary of field_name -> ExtractionRule (shared, do not mutate)
+    """
+    return {
+        field_name: ExtractionRule(
+            selector=sanitize_css_selector(selector),
+            attribute=attribute,
+            multiple=multiple
+        )
+        for field_name, selector, attribute, multiple in rule_items
+    }
+
+
 # ============================================
 # Request/Response Models
 # ============================================
@@ -229,8 +265,30 @@ async def health_check():
     tags=["Monitoring"]
 )
 async def get_metrics():
-    """Get service metrics"""
-    return metrics.get_metrics()
+    """Get service metrics, plus hit rates of the per-request memo caches"""
+    return {
+        **metrics.get_metrics(),
+        "caches": {
+            "sanitize_url": lru_cache_stats(sanitize_url),
+            "sanitize_css_selector": lru_cache_stats(sanitize_css_selector),
+            "extraction_rules": lru_cache_stats(build_extraction_rules),
+        }
+    }
+
+
+@app.get(
+    "/metrics/prometheus",
+    response_class=PlainTextResponse,
+    summary="Service Metrics (Prometheus)",
+    description="Returns the same metrics in the Prometheus text exposition format",
+    tags=["Monitoring"]
+)
+async def get_prometheus_metrics():
+    """Get service metrics for Prometheus scraping"""
+    return PlainTextResponse(
+        metrics.to_prometheus("scraper_service"),
+        media_type="text/plain; version=0.0.4"
+    )
 
 
 @app.get(
@@ -283,14 +341,10 @@ async def extract_data(
     try:
         sanitized_url = sanitize_url(str(request.url))
         
-        rules = {
-            field_name: ExtractionRule(
-                selector=sanitize_css_selector(rule.selector),
-                attribute=rule.attribute,
-                multiple=rule.multiple
-            )
+        rules = build_extraction_rules(tuple(
+            (field_name, rule.selector, rule.attribute, rule.multiple)
             for field_name, rule in request.extraction_rules.items()
-        }
+        ))
         
         result: ScrapedData = await scraper.scrape(
             url=sanitized_url,
@@ -387,6 +441,14 @@ async def startup_event():
     print(f"🎭 Playwright headless: {settings.headless}")
     print(f"💾 Cache enabled: {settings.cache_enabled}")
     print(f"⏱️  Timeout: {settings.timeout}ms")
+    
+    # Launch the browser and its context pool now instead of on the first request
+    try:
+        scraper = await get_scraper_service()
+        await scraper.warmup()
+        print(f"🌐 Browser ready with {settings.browser_contexts} contexts")
+    except Exception as e:
+        print(f"⚠️  Browser warmup failed, will retry on first request: {e}")
 
 
 @app.on_event("shutdown")
@@ -6,6 +6,7 @@ Provides:
 - Distributed tracing with correlation IDs
 - Enhanced health check dependencies
 """
+import asyncio
 import time
 import uuid
 import logging
@@ -13,7 +14,7 @@ from typing import Dict, Optional, Callable
 from functools import wraps
 from contextvars import ContextVar
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import defaultdict, deque
 import threading
 
 logger = logging.getLogger(__name__)
@@ -35,13 +36,41 @@ def set_correlation_id(cid: str):
     correlation_id_var.set(cid)
 
 
+class _MetricShard:
+    """One lock plus the metrics whose names hash to it"""
+    
+    __slots__ = ("lock", "counters", "timings", "timing_sums", "errors")
+    
+    def __init__(self, timing_window: int):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = defaultdict(int)
+        # Sliding window of recent timings with a running sum, so recording
+        # and averaging stay O(1) per metric
+        self.timings: Dict[str, deque] = defaultdict(lambda: deque(maxlen=timing_window))
+        self.timing_sums: Dict[str, float] = defaultdict(float)
+        self.errors: Dict[str, int] = defaultdict(int)
+    
+    def clear(self):
+        """Drop all metrics in this shard"""
+        with self.lock:
+            self.counters.clear()
+            self.timings.clear()
+            self.timing_sums.clear()
+            self.errors.clear()
+
+
 class MetricsCollector:
     """
     Thread-safe in-memory metrics collector.
     
+    Metrics are spread over SHARD_COUNT shards by name, each with its own
+    lock, so threads recording different metrics rarely contend.
     For production, consider exporting to Prometheus or StatsD.
     """
     
+    TIMING_WINDOW = 1000
+    SHARD_COUNT = 16  # Power of two, so the shard is picked with a mask
+    
     _instance = None
     _lock = threading.Lock()
     
@@ -57,47 +86,111 @@ class MetricsCollector:
         if self._initialized:
             return
         self._initialized = True
-        self._counters: Dict[str, int] = defaultdict(int)
-        self._timings: Dict[str, list] = defaultdict(list)
-        self._errors: Dict[str, int] = defaultdict(int)
-        self._lock = threading.Lock()
+        self._shards = [_MetricShard(self.TIMING_WINDOW) for _ in range(self.SHARD_COUNT)]
+        self._shard_mask = self.SHARD_COUNT - 1
+    
+    def _shard(self, metric: str) -> _MetricShard:
+        """Shard that owns a metric name"""
+        return self._shards[hash(metric) & self._shard_mask]
     
     def increment(self, metric: str, value: int = 1):
         """Increment a counter metric"""
-        with self._lock:
-            self._counters[metric] += value
+        shard = self._shard(metric)
+        with shard.lock:
+            shard.counters[metric] += value
     
     def timing(self, metric: str, duration_ms: float):
         """Record a timing metric"""
-        with self._lock:
-            self._timings[metric].append(duration_ms)
-            if len(self._timings[metric]) > 1000:
-                self._timings[metric] = self._timings[metric][-1000:]
+        shard = self._shard(metric)
+        with shard.lock:
+            window = shard.timings[metric]
+            if len(window) == window.maxlen:
+                shard.timing_sums[metric] -= window[0]
+            window.append(duration_ms)
+            shard.timing_sums[metric] += duration_ms
     
     def error(self, metric: str):
         """Record an error"""
-        with self._lock:
-            self._errors[metric] += 1
+        shard = self._shard(metric)
+        with shard.lock:
+            shard.errors[metric] += 1
     
     def get_metrics(self) -> Dict:
         """Get all metrics"""
-        with self._lock:
-            timings_avg = {
-                k: sum(v) / len(v) if v else 0 
-                for k, v in self._timings.items()
-            }
-            return {
-                "counters": dict(self._counters),
-                "timings_avg_ms": timings_avg,
-                "errors": dict(self._errors)
-            }
+        counters, timing_totals, errors = {}, {}, {}
+        for shard in self._shards:
+            # Copy running totals under the lock; samples are never walked
+            with shard.lock:
+                counters.update(shard.counters)
+                timing_totals.update(
+                    (k, (shard.timing_sums[k], len(v)))
+                    for k, v in shard.timings.items()
+                )
+                errors.update(shard.errors)
+        timings_avg = {
+            k: total / count if count else 0
+            for k, (total, count) in timing_totals.items()
+        }
+        return {
+            "counters": counters,
+            "timings_avg_ms": timings_avg,
+            "errors": errors
+        }
+    
+    def to_prometheus(self, namespace: str) -> str:
+        """
+        Render metrics in the Prometheus text exposition format.
+        
+        Metric names go in a "metric" label, so dotted names need no mangling.
+        
+        Args:
+            namespace: Prefix for the exported metric families
+            
+        Returns:
+            Exposition text, one sample per line
+        """
+        snapshot = self.get_metrics()
+        families = (
+            ("counter_total", "counter", snapshot["counters"]),
+            ("timing_avg_ms", "gauge", snapshot["timings_avg_ms"]),
+            ("errors_total", "counter", snapshot["errors"]),
+        )
+        lines = []
+        for family, kind, values in families:
+            name = f"{namespace}_{family}"
+            lines.append(f"# TYPE {name} {kind}")
+            for metric, value in values.items():
+                label = metric.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                lines.append(f'{name}{{metric="{label}"}} {value}')
+        lines.append("")
+        return "\n".join(lines)
     
     def reset(self):
         """Reset all metrics (for testing)"""
-        with self._lock:
-            self._counters.clear()
-            self._timings.clear()
-            self._errors.clear()
+        for shard in self._shards:
+            shard.clear()
+
+
+def lru_cache_stats(cached: Callable) -> Dict:
+    """
+    Hit/miss counters of a functools.lru_cache wrapped function.
+    
+    Hits never run the wrapped body, so they cannot be counted from inside it.
+    
+    Args:
+        cached: Function decorated with lru_cache
+        
+    Returns:
+        Dictionary with hits, misses, size and hit_rate
+    """
+    info = cached.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "hit_rate": info.hits / lookups if lookups else 0.0
+    }
 
 
 def track_request(metric_name: str):
@@ -109,25 +202,31 @@ def track_request(metric_name: str):
         async def extract(request):
             ...
     """
+    # Keys are built once per decorated function, and the module-level
+    # collector is used directly instead of re-entering the singleton
+    requests_metric = f"{metric_name}.requests"
+    errors_metric = f"{metric_name}.errors"
+    duration_metric = f"{metric_name}.duration_ms"
+    completed_message = f"{metric_name} completed"
+    
     def decorator(func: Callable):
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             cid = get_correlation_id()
             start = time.time()
-            m = MetricsCollector()
             try:
                 result = await func(*args, **kwargs)
-                m.increment(f"{metric_name}.requests")
+                metrics.increment(requests_metric)
                 return result
             except Exception as e:
-                m.increment(f"{metric_name}.errors")
-                m.error(metric_name)
+                metrics.increment(errors_metric)
+                metrics.error(metric_name)
                 raise
             finally:
                 duration_ms = (time.time() - start) * 1000
-                m.timing(f"{metric_name}.duration_ms", duration_ms)
+                metrics.timing(duration_metric, duration_ms)
                 logger.info(
-                    f"{metric_name} completed",
+                    completed_message,
                     extra={
                         "correlation_id": cid,
                         "duration_ms": duration_ms,
@@ -139,20 +238,18 @@ def track_request(metric_name: str):
         def sync_wrapper(*args, **kwargs):
             cid = get_correlation_id()
             start = time.time()
-            m = MetricsCollector()
             try:
                 result = func(*args, **kwargs)
-                m.increment(f"{metric_name}.requests")
+                metrics.increment(requests_metric)
                 return result
             except Exception as e:
-                m.increment(f"{metric_name}.errors")
-                m.error(metric_name)
+                metrics.increment(errors_metric)
+                metrics.error(metric_name)
                 raise
             finally:
                 duration_ms = (time.time() - start) * 1000
-                m.timing(f"{metric_name}.duration_ms", duration_ms)
+                metrics.timing(duration_metric, duration_ms)
         
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         return sync_wrapper
@@ -165,8 +262,11 @@ class HealthChecker:
     Enhanced health checker with dependency status.
     """
     
-    def __init__(self, service_name: str):
+    CHECK_TIMEOUT = 2.0  # seconds per dependency
+    
+    def __init__(self, service_name: str, timeout: float = CHECK_TIMEOUT):
         self.service_name = service_name
+        self.timeout = timeout
         self._dependencies: Dict[str, dict] = {}
     
     def register_dependency(self, name: str, check_fn: Callable, critical: bool = True):
@@ -178,7 +278,7 @@ class HealthChecker:
         }
     
     async def check_all(self) -> Dict:
-        """Run all health checks"""
+        """Run all health checks concurrently, each bounded by the timeout"""
         results = {
             "service": self.service_name,
             "status": "healthy",
@@ -188,22 +288,27 @@ class HealthChecker:
         
         critical_failures = 0
         
-        for name, dep in self._dependencies.items():
-            try:
-                is_healthy = await dep["check"]()
-                dep["status"] = "healthy" if is_healthy else "unhealthy"
-                results["dependencies"][name] = {"status": dep["status"]}
-                
-                if not is_healthy and dep["critical"]:
-                    critical_failures += 1
-                    
-            except Exception as e:
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(dep["check"](), timeout=self.timeout) for dep in self._dependencies.values()),
+            return_exceptions=True
+        )
+        
+        for (name, dep), outcome in zip(self._dependencies.items(), outcomes):
+            if isinstance(outcome, BaseException):
+                error = "timeout" if isinstance(outcome, asyncio.TimeoutError) else str(outcome)
                 dep["status"] = "unhealthy"
-                results["dependencies"][name] = {"status": "unhealthy", "error": str(e)}
-                logger.error(f"Health check failed for {name}: {e}")
+                results["dependencies"][name] = {"status": "unhealthy", "error": error}
+                logger.error(f"Health check failed for {name}: {error}")
                 
                 if dep["critical"]:
                     critical_failures += 1
+                continue
+            
+            dep["status"] = "healthy" if outcome else "unhealthy"
+            results["dependencies"][name] = {"status": dep["status"]}
+            
+            if not outcome and dep["critical"]:
+                critical_failures += 1
         
         if critical_failures > 0:
             results["status"] = "unhealthy"
@@ -3,16 +3,26 @@ Scraper Interfaces and Implementations
 
 Following SOLID principles with Protocol pattern and dependency injection.
 """
-import json
+import re
+import shutil
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Protocol
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Protocol, Tuple
 from dataclasses import dataclass
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+from collections import OrderedDict
+from playwright.async_api import async_playwright, Browser, Page, BrowserContext, Route, Error as PlaywrightError
 from bs4 import BeautifulSoup
+import soupsieve
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 import asyncio
 import hashlib
+import time
+import orjson
 
 from app.config import settings
+from app.monitoring import metrics
 
 
 # ============================================
@@ -34,6 +44,9 @@ class ExtractionRule:
     multiple: bool = False
 
 
+TITLE_RULE = ExtractionRule(selector="title")
+
+
 @dataclass
 class ScrapedData:
     """
@@ -66,8 +79,12 @@ class BrowserProvider(Protocol):
     Allows swapping between Playwright, Selenium, etc.
     """
     
-    async def fetch_page(self, url: str) -> str:
-        """Fetch page HTML"""
+    async def warmup(self) -> None:
+        """Start the browser ahead of the first request"""
+        ...
+    
+    async def fetch_page(self, url: str, wait_for_selector: Optional[str] = None) -> str:
+        """Fetch page HTML, optionally waiting for a selector to render"""
         ...
     
     async def close(self) -> None:
@@ -96,19 +113,61 @@ class CacheProvider(Protocol):
     Protocol for caching scraped data.
     """
     
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[bytes]:
         """Get cached value"""
         ...
     
-    async def set(self, key: str, value: str, ttl: int) -> None:
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
         """Set cached value with TTL"""
         ...
+    
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get several cached values, None for each miss"""
+        ...
+    
+    async def mset_ex(self, pairs: List[Tuple[str, bytes]], ttl: int) -> None:
+        """Set several values sharing one TTL"""
+        ...
 
 
 # ============================================
 # Browser Provider Implementation
 # ============================================
 
+# Applies extraction rules inside the page with the browser's own selector
+# engine. Text mirrors get_text(strip=True): every text node stripped and
+# joined. Selectors the browser cannot parse return the page HTML instead
+# so the Python parser can handle them.
+_EXTRACT_SCRIPT = """
+([titleRule, rules]) => {
+    const text = (el) => {
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        let out = "";
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            out += node.data.trim();
+        }
+        return out;
+    };
+    const value = (el, rule) => rule.attribute ? el.getAttribute(rule.attribute) : text(el);
+    const extract = (rule) => {
+        if (rule.multiple) {
+            return Array.from(document.querySelectorAll(rule.selector), (el) => value(el, rule));
+        }
+        const el = document.querySelector(rule.selector);
+        return el ? value(el, rule) : null;
+    };
+    try {
+        const data = {};
+        for (const [name, rule] of Object.entries(rules)) {
+            data[name] = extract(rule);
+        }
+        return {title: extract(titleRule), data};
+    } catch (e) {
+        return {html: document.documentElement.outerHTML};
+    }
+}
+"""
+
 class PlaywrightBrowserProvider:
     """
     Playwright implementation of BrowserProvider.
@@ -122,7 +181,11 @@ class PlaywrightBrowserProvider:
         headless: bool = None,
         timeout: int = None,
         user_agent: str = None,
-        max_contexts: int = 5
+        max_contexts: int = None,
+        user_data_dir: Optional[str] = None,
+        ephemeral_cache: bool = None,
+        recycle_after: int = None,
+        blocked_resource_types: Optional[FrozenSet[str]] = None
     ):
         """
         Initialize Playwright browser.
@@ -132,31 +195,101 @@ class PlaywrightBrowserProvider:
             timeout: Page load timeout in milliseconds
             user_agent: Custom user agent
             max_contexts: Maximum browser contexts to pool
+                (defaults to settings.browser_contexts)
+            user_data_dir: Profile directory for a persistent context whose
+                disk cache is reused between requests (defaults to
+                settings.user_data_dir; None uses isolated contexts)
+            ephemeral_cache: Delete user_data_dir on close
+                (defaults to settings.ephemeral_cache)
+            recycle_after: Replace a pooled context after this many pages
+                (defaults to settings.browser_pool_recycle_after)
+            blocked_resource_types: Resource types aborted instead of loaded
+                (defaults to settings.blocked_resource_types_set)
         """
         self.headless = headless if headless is not None else settings.headless
         self.timeout = timeout or settings.timeout
         self.user_agent = user_agent or settings.user_agent
-        self.max_contexts = max_contexts
+        self.max_contexts = max_contexts or settings.browser_contexts
+        self.user_data_dir = user_data_dir or settings.user_data_dir
+        self.ephemeral_cache = (
+            ephemeral_cache if ephemeral_cache is not None else settings.ephemeral_cache
+        )
+        self.recycle_after = recycle_after or settings.browser_pool_recycle_after
+        self.blocked_resource_types = (
+            blocked_resource_types if blocked_resource_types is not None
+            else settings.blocked_resource_types_set
+        )
         
         self._playwright = None
         self._browser: Optional[Browser] = None
+        self._persistent_context: Optional[BrowserContext] = None
         self._contexts: List[BrowserContext] = []
-        self._available_contexts: asyncio.Queue = None
+        self._context_uses: Dict[BrowserContext, int] = {}
+        # Open pages parked between fetches, per pooled context
+        self._idle_pages: Dict[BrowserContext, List[Page]] = {}
+        self._page_uses: Dict[Page, int] = {}
+        self._available_contexts: asyncio.LifoQueue = None
+        self._launch_lock = asyncio.Lock()
     
     async def _ensure_browser(self):
         """Lazy browser initialization with context pool"""
-        if self._browser is None:
+        if self._available_contexts is not None:
+            return
+        async with self._launch_lock:
+            # Concurrent first requests must not launch a browser each
+            if self._available_contexts is not None:
+                return
             self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=self.headless
-            )
-            self._available_contexts = asyncio.Queue()
-            for _ in range(self.max_contexts):
-                context = await self._browser.new_context(
-                    user_agent=self.user_agent
+            # LIFO hands out the most recently used context, whose caches are warm
+            available = asyncio.LifoQueue(maxsize=self.max_contexts)
+            if self.user_data_dir:
+                # One on-disk profile; each slot is a page share of it
+                context = await self._playwright.chromium.launch_persistent_context(
+                    self.user_data_dir,
+                    headless=self.headless,
+                    user_agent=self.user_agent,
+                    args=[f"--disk-cache-size={settings.disk_cache_size}"]
                 )
+                await self._block_resources(context)
+                self._persistent_context = context
                 self._contexts.append(context)
-                await self._available_contexts.put(context)
+                for _ in range(self.max_contexts):
+                    available.put_nowait(context)
+            else:
+                self._browser = await self._playwright.chromium.launch(
+                    headless=self.headless
+                )
+                # Contexts are independent; create them concurrently
+                contexts = await asyncio.gather(
+                    *(self._new_context() for _ in range(self.max_contexts))
+                )
+                for context in contexts:
+                    available.put_nowait(context)
+            self._available_contexts = available
+    
+    async def _new_context(self) -> BrowserContext:
+        """Create a pooled context on the shared browser"""
+        context = await self._browser.new_context(user_agent=self.user_agent)
+        await self._block_resources(context)
+        self._contexts.append(context)
+        self._context_uses[context] = 0
+        return context
+    
+    async def _block_resources(self, context: BrowserContext) -> None:
+        """Route every page of the context through _route_request"""
+        if self.blocked_resource_types:
+            await context.route("**/*", self._route_request)
+    
+    async def _route_request(self, route: Route) -> None:
+        """Abort images, fonts and other bytes extraction never reads"""
+        if route.request.resource_type in self.blocked_resource_types:
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def warmup(self) -> None:
+        """Launch the browser and fill the context pool ahead of the first request"""
+        await self._ensure_browser()
     
     async def _get_context(self) -> BrowserContext:
         """Get a browser context from the pool"""
@@ -167,22 +300,73 @@ class PlaywrightBrowserProvider:
                 timeout=30
             )
         except asyncio.TimeoutError:
+            if self._persistent_context is not None:
+                return self._persistent_context
             context = await self._browser.new_context(user_agent=self.user_agent)
+            await self._block_resources(context)
             return context
     
     async def _return_context(self, context: BrowserContext):
-        """Return a browser context to the pool"""
+        """Return a browser context to the pool, closing overflow contexts"""
+        uses = self._context_uses.get(context)
+        if uses is not None:
+            if uses + 1 < self.recycle_after:
+                self._context_uses[context] = uses + 1
+            else:
+                # Long-lived contexts pile up cookies, storage and leaked
+                # renderer memory; swap in a fresh one
+                del self._context_uses[context]
+                self._contexts.remove(context)
+                for page in self._idle_pages.pop(context, []):
+                    self._page_uses.pop(page, None)
+                try:
+                    await context.close()
+                    context = await self._new_context()
+                except Exception:
+                    return  # Pool shrinks; _get_context creates overflow on demand
+                metrics.increment("scraper.browser.context_recycled")
         try:
-            await self._available_contexts.put_nowait(context)
+            self._available_contexts.put_nowait(context)
         except asyncio.QueueFull:
-            await context.close()
+            if context is not self._persistent_context:
+                await context.close()
+    
+    async def _get_page(self, context: BrowserContext) -> Page:
+        """Reuse a parked page of the context, or open one"""
+        idle = self._idle_pages.get(context)
+        if idle:
+            return idle.pop()
+        return await context.new_page()
     
-    async def fetch_page(self, url: str) -> str:
+    async def _release_page(self, context: BrowserContext, page: Page, reusable: bool) -> None:
+        """
+        Park a page for the next fetch on its context, or close it.
+        
+        Pages are only kept for pooled contexts, after a successful fetch,
+        and for up to recycle_after fetches so renderer memory cannot grow
+        without bound.
+        """
+        uses = self._page_uses.pop(page, 0) + 1
+        if reusable and uses < self.recycle_after and context in self._contexts:
+            idle = self._idle_pages.setdefault(context, [])
+            if len(idle) < self.max_contexts:
+                self._page_uses[page] = uses
+                idle.append(page)
+                return
+        try:
+            await page.close()
+        except Exception:
+            pass
+    
+    async def fetch_page(self, url: str, wait_for_selector: Optional[str] = None) -> str:
         """
         Fetch page HTML with JavaScript rendering.
         
         Args:
             url: URL to fetch
+            wait_for_selector: Return as soon as this selector is attached
+                (or after settings.selector_timeout); None waits for the
+                network to go idle
             
         Returns:
             Rendered HTML content
@@ -190,24 +374,75 @@ class PlaywrightBrowserProvider:
         Raises:
             Exception: If page fetch fails
         """
+        return await self._load(url, wait_for_selector, lambda page: page.content())
+    
+    async def fetch_extracted(
+        self,
+        url: str,
+        extraction_rules: Dict[str, ExtractionRule],
+        wait_for_selector: Optional[str] = None
+    ):
+        """
+        Render a page and apply extraction rules in the browser.
+        
+        Skips serializing the DOM to HTML and re-parsing it in Python.
+        
+        Args:
+            url: URL to fetch
+            extraction_rules: Dictionary of field_name -> ExtractionRule
+            wait_for_selector: See fetch_page
+            
+        Returns:
+            (title, extracted_data) tuple, or the rendered HTML when a
+            selector is not supported by the browser
+            
+        Raises:
+            Exception: If page fetch fails
+        """
+        rules = {name: vars(rule) for name, rule in extraction_rules.items()}
+        result = await self._load(
+            url,
+            wait_for_selector,
+            lambda page: page.evaluate(_EXTRACT_SCRIPT, [vars(TITLE_RULE), rules])
+        )
+        if "html" in result:
+            return result["html"]
+        return result["title"], result["data"]
+    
+    async def _load(self, url: str, wait_for_selector: Optional[str], read):
+        """Navigate a pooled page to url, wait for it, and return await read(page)"""
         context = None
         page = None
+        reusable = False
         try:
             context = await self._get_context()
-            page = await context.new_page()
+            page = await self._get_page(context)
             
-            await page.goto(url, timeout=self.timeout)
-            await page.wait_for_load_state("networkidle")
+            await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
+            if wait_for_selector:
+                # Content the rules need is usually there long before
+                # analytics and ads let the network go idle
+                try:
+                    await page.wait_for_selector(
+                        wait_for_selector,
+                        state="attached",
+                        timeout=settings.selector_timeout
+                    )
+                except PlaywrightError:
+                    pass  # Missing or invalid selector; extract what rendered
+            else:
+                await page.wait_for_load_state("networkidle")
             
-            html = await page.content()
-            return html
+            result = await read(page)
+            reusable = True
+            return result
         
         except Exception as e:
             raise Exception(f"Failed to fetch page: {str(e)}")
         
         finally:
             if page:
-                await page.close()
+                await self._release_page(context, page, reusable)
             if context:
                 await self._return_context(context)
     
@@ -220,23 +455,92 @@ class PlaywrightBrowserProvider:
                 pass
         self._contexts.clear()
         
+        self._context_uses.clear()
+        self._idle_pages.clear()
+        self._page_uses.clear()
+        
         if self._browser:
             await self._browser.close()
         if self._playwright:
             await self._playwright.stop()
+        # Shared provider: the next request relaunches lazily
+        self._browser = None
+        self._playwright = None
+        self._persistent_context = None
+        self._available_contexts = None
+        
+        if self.user_data_dir and self.ephemeral_cache:
+            await asyncio.to_thread(shutil.rmtree, self.user_data_dir, True)
+
+
+_browser_provider: Optional[PlaywrightBrowserProvider] = None
+
+
+def get_browser_provider() -> PlaywrightBrowserProvider:
+    """Process-wide browser provider, so every scraper shares one Chromium and context pool"""
+    global _browser_provider
+    if _browser_provider is None:
+        _browser_provider = PlaywrightBrowserProvider()
+    return _browser_provider
 
 
 # ============================================
 # HTML Parser Implementation
 # ============================================
 
+@lru_cache(maxsize=512)
+def _compile_soup_selector(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector for BeautifulSoup once per process"""
+    return soupsieve.compile(selector)
+
+
 class BeautifulSoupParser:
     """
     BeautifulSoup implementation of HTMLParser.
     
-    Parses and extracts data from HTML.
+    Parses and extracts data from HTML. Single-class and exact-attribute
+    selectors skip the CSS engine and use a direct attribute scan.
     """
     
+    _SIMPLE_CLASS_RE = re.compile(r'^\.([\w-]+)$')
+    _SIMPLE_ATTR_RE = re.compile(r'^\[([\w-]+)=(["\'])([^"\']+)\2\]$')
+    
+    @classmethod
+    @lru_cache(maxsize=500)
+    def _simple_filter(cls, selector: str) -> Optional[tuple]:
+        """
+        Match selectors that a direct attribute scan can answer.
+        
+        Args:
+            selector: CSS selector
+            
+        Returns:
+            (attribute, value) to scan for, or None for complex selectors
+        """
+        match = cls._SIMPLE_CLASS_RE.match(selector)
+        if match:
+            return ("class", match.group(1))
+        match = cls._SIMPLE_ATTR_RE.match(selector)
+        # BeautifulSoup matches class tokens, not the whole attribute value
+        if match and match.group(1) != "class":
+            return (match.group(1), match.group(3))
+        return None
+    
+    def _select(self, parsed_html: BeautifulSoup, selector: str, multiple: bool):
+        """Run a selector, preferring the attribute-scan fast path"""
+        simple = self._simple_filter(selector)
+        if simple is None:
+            compiled = _compile_soup_selector(selector)
+            if multiple:
+                return compiled.select(parsed_html)
+            return compiled.select_one(parsed_html)
+        
+        metrics.increment("parser.fastpath.hits")
+        attrs = {simple[0]: simple[1]}
+        if multiple:
+            return parsed_html.find_all(attrs=attrs)
+        return parsed_html.find(attrs=attrs)
+    
     def parse(self, html: str) -> BeautifulSoup:
         """
         Parse HTML string.
@@ -261,13 +565,13 @@ class BeautifulSoupParser:
             Extracted data (string, list, or None)
         """
         if rule.multiple:
-            elements = parsed_html.select(rule.selector)
+            elements = self._select(parsed_html, rule.selector, multiple=True)
             if rule.attribute:
                 return [elem.get(rule.attribute) for elem in elements]
             else:
                 return [elem.get_text(strip=True) for elem in elements]
         else:
-            element = parsed_html.select_one(rule.selector)
+            element = self._select(parsed_html, rule.selector, multiple=False)
             if element:
                 if rule.attribute:
                     return element.get(rule.attribute)
@@ -276,6 +580,168 @@ class BeautifulSoupParser:
             return None
 
 
+SELECTOR_CACHE_SIZE = 500
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _compile_selector(selector: str) -> CSSSelector:
+    """Compile a CSS selector to XPath once and share it across pages"""
+    return CSSSelector(selector, translator="html")
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _compile_first_match(selector: str) -> etree.XPath:
+    """Compile a selector that returns only its first match in document order"""
+    return etree.XPath(f"({_compile_selector(selector).path})[1]")
+
+
+class LxmlParser:
+    """
+    lxml implementation of HTMLParser.
+    
+    Parses in C and evaluates pre-compiled selectors, avoiding the
+    per-node Python wrappers and per-call selector parsing of BeautifulSoup.
+    """
+    
+    def parse(self, html: str) -> lxml_html.HtmlElement:
+        """
+        Parse HTML string.
+        
+        Args:
+            html: HTML content
+            
+        Returns:
+            Root element of the document
+        """
+        if not html or not html.strip():
+            html = "<html></html>"
+        return lxml_html.document_fromstring(html)
+    
+    @staticmethod
+    def _text(element: lxml_html.HtmlElement) -> str:
+        """Text content with each fragment stripped, like get_text(strip=True)"""
+        return "".join(text.strip() for text in element.itertext())
+    
+    def extract(self, parsed_html: lxml_html.HtmlElement, rule: ExtractionRule) -> any:
+        """
+        Extract data using extraction rule.
+        
+        Args:
+            parsed_html: Parsed HTML root element
+            rule: Extraction rule
+            
+        Returns:
+            Extracted data (string, list, or None)
+        """
+        if rule.multiple:
+            elements = _compile_selector(rule.selector)(parsed_html)
+            if rule.attribute:
+                return [elem.get(rule.attribute) for elem in elements]
+            else:
+                return [self._text(elem) for elem in elements]
+        else:
+            # Single-value rules never build proxies for the other matches
+            elements = _compile_first_match(rule.selector)(parsed_html)
+            if elements:
+                element = elements[0]
+                if rule.attribute:
+                    return element.get(rule.attribute)
+                else:
+                    return self._text(element)
+            return None
+
+
+class LexborDocument:
+    """Parsed Lexbor tree plus a lazily built document-order index"""
+    
+    __slots__ = ("tree", "_positions")
+    
+    def __init__(self, tree: LexborHTMLParser):
+        self.tree = tree
+        self._positions: Optional[Dict[int, int]] = None
+    
+    def in_document_order(self, nodes: List[LexborNode]) -> List[LexborNode]:
+        """Drop duplicate nodes and sort the rest by position in the document"""
+        unique = {node.mem_id: node for node in nodes}
+        if len(unique) < 2:
+            return list(unique.values())
+        if self._positions is None:
+            self._positions = {
+                node.mem_id: position
+                for position, node in enumerate(self.tree.root.traverse())
+            }
+        return sorted(unique.values(), key=lambda node: self._positions[node.mem_id])
+
+
+class SelectolaxParser:
+    """
+    selectolax (Lexbor) implementation of HTMLParser.
+    
+    Parses and runs selectors entirely in C. Lexbor returns grouped
+    selectors ("a, b") per group with duplicates, so those matches are
+    put back in document order to behave like the other parsers.
+    """
+    
+    def parse(self, html: str) -> LexborDocument:
+        """
+        Parse HTML string.
+        
+        Args:
+            html: HTML content
+            
+        Returns:
+            Parsed document
+        """
+        return LexborDocument(LexborHTMLParser(html or ""))
+    
+    def _select(self, parsed_html: LexborDocument, selector: str) -> List[LexborNode]:
+        """All matches of a selector, in document order"""
+        nodes = parsed_html.tree.css(selector)
+        if "," in selector:
+            return parsed_html.in_document_order(nodes)
+        return nodes
+    
+    def extract(self, parsed_html: LexborDocument, rule: ExtractionRule) -> any:
+        """
+        Extract data using extraction rule.
+        
+        Args:
+            parsed_html: Parsed document
+            rule: Extraction rule
+            
+        Returns:
+            Extracted data (string, list, or None)
+        """
+        if rule.multiple:
+            nodes = self._select(parsed_html, rule.selector)
+            if rule.attribute:
+                return [node.attributes.get(rule.attribute) for node in nodes]
+            else:
+                return [node.text(strip=True) for node in nodes]
+        else:
+            if "," in rule.selector:
+                nodes = self._select(parsed_html, rule.selector)
+                node = nodes[0] if nodes else None
+            else:
+                node = parsed_html.tree.css_first(rule.selector)
+            if node is not None:
+                if rule.attribute:
+                    return node.attributes.get(rule.attribute)
+                else:
+                    return node.text(strip=True)
+            return None
+
+
+def get_html_parser() -> HTMLParser:
+    """Factory function to get the configured HTML parser"""
+    parsers = {
+        "selectolax": SelectolaxParser,
+        "lxml": LxmlParser,
+        "beautifulsoup": BeautifulSoupParser,
+    }
+    return parsers.get(settings.html_parser, SelectolaxParser)()
+
+
 # ============================================
 # Cache Implementation
 # ============================================
@@ -284,26 +750,62 @@ class InMemoryCache:
     """
     Simple in-memory cache implementation.
     
+    Bounded to max_size entries (least recently used evicted first) and swept
+    for expired entries at most every SWEEP_INTERVAL seconds on write, so
+    entries that are never read again do not accumulate.
     For production, replace with Redis implementation.
     """
     
-    def __init__(self):
-        self._cache: Dict[str, tuple] = {}
+    SWEEP_INTERVAL = 60.0
     
-    async def get(self, key: str) -> Optional[str]:
+    def __init__(self, max_size: int = None):
+        """
+        Initialize cache.
+        
+        Args:
+            max_size: Maximum number of entries (defaults to settings.cache_max_size)
+        """
+        self.max_size = max_size or settings.cache_max_size
+        self._cache: Dict[str, tuple] = OrderedDict()
+        self._next_sweep = time.monotonic() + self.SWEEP_INTERVAL
+    
+    async def get(self, key: str) -> Optional[bytes]:
         """Get cached value if not expired"""
-        if key in self._cache:
-            value, expiry = self._cache[key]
-            if asyncio.get_event_loop().time() < expiry:
+        entry = self._cache.get(key)
+        if entry is not None:
+            value, expiry = entry
+            if time.monotonic() < expiry:
+                self._cache.move_to_end(key)
                 return value
-            else:
-                del self._cache[key]
+            del self._cache[key]
         return None
     
-    async def set(self, key: str, value: str, ttl: int) -> None:
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
         """Set value with TTL"""
-        expiry = asyncio.get_event_loop().time() + ttl
-        self._cache[key] = (value, expiry)
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self.expire(now)
+        self._cache[key] = (value, now + ttl)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+    
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get several cached values, None for each miss"""
+        return [await self.get(key) for key in keys]
+    
+    async def mset_ex(self, pairs: List[Tuple[str, bytes]], ttl: int) -> None:
+        """Set several values sharing one TTL"""
+        for key, value in pairs:
+            await self.set(key, value, ttl)
+    
+    def expire(self, now: float = None) -> None:
+        """Drop every expired entry"""
+        now = now if now is not None else time.monotonic()
+        expired = [key for key, (_, expiry) in self._cache.items() if expiry <= now]
+        for key in expired:
+            del self._cache[key]
+        self._next_sweep = now + self.SWEEP_INTERVAL
 
 
 class RedisCache:
@@ -311,40 +813,126 @@ class RedisCache:
     Redis-based cache implementation for production.
     
     Supports multi-instance deployments and better TTL management.
+    Single-key commands issued by concurrent requests are buffered for up
+    to PIPELINE_WINDOW seconds (or PIPELINE_MAX_BATCH commands) and sent as
+    one pipeline, so N concurrent lookups cost about one round trip.
     """
     
+    PIPELINE_WINDOW = 0.001
+    PIPELINE_MAX_BATCH = 100
+    
     def __init__(self, redis_url: str = None):
         self._redis_url = redis_url or f"redis://:{settings.redis_password}@{settings.redis_host}:{settings.redis_port}/0" if settings.redis_password else f"redis://{settings.redis_host}:{settings.redis_port}/0"
         self._client = None
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
     
     async def _ensure_client(self):
         """Lazy Redis connection initialization"""
         if self._client is None:
             import redis.asyncio as redis
-            self._client = redis.from_url(self._redis_url, decode_responses=True)
+            self._client = redis.from_url(
+                self._redis_url,
+                max_connections=50,
+                socket_keepalive=True,
+                health_check_interval=30
+            )
     
-    async def get(self, key: str) -> Optional[str]:
-        """Get cached value"""
+    async def _pipelined(self, command: str, *args, **kwargs):
+        """Queue a command for the next pipeline flush and wait for its reply"""
         await self._ensure_client()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((command, args, kwargs, future))
+        if len(self._pending) >= self.PIPELINE_MAX_BATCH:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.PIPELINE_WINDOW, self._flush_pending)
+        return await future
+    
+    def _flush_pending(self) -> None:
+        """Send every buffered command in a background pipeline"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._execute(batch))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+    
+    async def _execute(self, batch: List[tuple]) -> None:
+        """Run one pipeline and hand each reply to its waiting caller"""
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for command, args, kwargs, _ in batch:
+                    getattr(pipe, command)(*args, **kwargs)
+                replies = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), reply in zip(batch, replies):
+            if future.done():
+                continue  # Caller was cancelled
+            if isinstance(reply, Exception):
+                future.set_exception(reply)
+            else:
+                future.set_result(reply)
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get cached value"""
         try:
-            return await self._client.get(key)
+            return await self._pipelined("get", key)
         except Exception:
             return None
     
-    async def set(self, key: str, value: str, ttl: int) -> None:
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
         """Set value with TTL"""
+        try:
+            await self._pipelined("set", key, value, ex=ttl)
+        except Exception:
+            pass
+    
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get several cached values in one round trip"""
+        if not keys:
+            return []
+        await self._ensure_client()
+        try:
+            return await self._client.mget(keys)
+        except Exception:
+            return [None] * len(keys)
+    
+    async def mset_ex(self, pairs: List[Tuple[str, bytes]], ttl: int) -> None:
+        """Set several values in one pipelined round trip"""
+        if not pairs:
+            return
         await self._ensure_client()
         try:
-            await self._client.setex(key, ttl, value)
+            # MSET has no TTL; a non-transactional pipeline of SET EX does
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in pairs:
+                    pipe.set(key, value, ex=ttl)
+                await pipe.execute()
         except Exception:
             pass
 
 
+_cache_provider: Optional[CacheProvider] = None
+
+
 def get_cache_provider() -> CacheProvider:
-    """Factory function to get appropriate cache provider"""
-    if settings.cache_enabled and settings.redis_host:
-        return RedisCache()
-    return InMemoryCache()
+    """Process-wide cache provider, so every scraper shares one Redis pool or memory cache"""
+    global _cache_provider
+    if _cache_provider is None:
+        if settings.cache_enabled and settings.redis_host:
+            _cache_provider = RedisCache()
+        else:
+            _cache_provider = InMemoryCache()
+    return _cache_provider
 
 
 # ============================================
@@ -358,11 +946,23 @@ class ScraperService:
     Orchestrates browser automation, HTML parsing, and caching.
     """
     
+    # Pages at least this long are parsed in a worker thread; below it the
+    # thread hop costs more than the parse blocks the loop
+    PARSE_OFFLOAD_THRESHOLD = 16 * 1024
+    
+    # Serialized rules keyed by dict identity. Rule dicts are shared and
+    # read-only once scraping starts (JOB_EXTRACTION_RULES, the lru_cached
+    # request rules), so repeated scrapes skip serializing them again; the
+    # dict is held alongside so its id cannot be reused while cached
+    RULES_BLOB_CACHE_SIZE = 256
+    _rules_blobs: Dict[int, tuple] = OrderedDict()
+    
     def __init__(
         self,
         browser_provider: BrowserProvider = None,
         html_parser: HTMLParser = None,
-        cache_provider: CacheProvider = None
+        cache_provider: CacheProvider = None,
+        http_fetcher: Optional[BrowserProvider] = None
     ):
         """
         Initialize scraper with dependencies.
@@ -371,10 +971,24 @@ class ScraperService:
             browser_provider: Browser automation provider
             html_parser: HTML parser
             cache_provider: Cache provider
+            http_fetcher: Plain HTTP fetcher tried before the browser
+                (None always renders with the browser)
         """
-        self.browser = browser_provider or PlaywrightBrowserProvider()
-        self.parser = html_parser or BeautifulSoupParser()
-        self.cache = cache_provider or InMemoryCache()
+        self.browser = browser_provider or get_browser_provider()
+        self.parser = html_parser or get_html_parser()
+        self.cache = cache_provider or get_cache_provider()
+        self.http_fetcher = http_fetcher
+        # Providers that can run the rules in the page skip the Python parser
+        self._browser_extract = (
+            getattr(self.browser, "fetch_extracted", None)
+            if settings.browser_extraction else None
+        )
+        # Scrapes in progress, keyed like the cache, shared by identical requests
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+    
+    async def warmup(self):
+        """Start the browser so the first request does not pay for it"""
+        await self.browser.warmup()
     
     async def scrape(
         self,
@@ -393,52 +1007,152 @@ class ScraperService:
         Returns:
             ScrapedData object with results
         """
+        cache_key = self._cache_keys([url], extraction_rules)[0]
+        
+        # Concurrent identical requests wait on one fetch instead of each
+        # taking a browser context
+        inflight_key = (cache_key, use_cache)
+        task = self._inflight.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._scrape(url, extraction_rules, use_cache, cache_key)
+            )
+            self._inflight[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        # Shielded so one caller disconnecting does not cancel the others
+        return await asyncio.shield(task)
+    
+    async def scrape_many(
+        self,
+        urls: List[str],
+        extraction_rules: Dict[str, ExtractionRule],
+        use_cache: bool = True
+    ) -> List[ScrapedData]:
+        """
+        Scrape several URLs with the same extraction rules.
+        
+        Cache lookups and writes for the whole batch are one round trip
+        each; misses are fetched concurrently and each URL is fetched once
+        even if repeated.
+        
+        Args:
+            urls: URLs to scrape
+            extraction_rules: Dictionary of field_name -> ExtractionRule
+            use_cache: Whether to use cache
+            
+        Returns:
+            ScrapedData objects in the same order as urls
+        """
+        keys = self._cache_keys(urls, extraction_rules)
+        caching = use_cache and settings.cache_enabled
+        
+        results: Dict[str, ScrapedData] = {}
+        if caching:
+            for url, key, cached in zip(urls, keys, await self.cache.mget(keys)):
+                if cached and key not in results:
+                    try:
+                        results[key] = self._from_cache(url, cached)
+                    except ValueError:
+                        pass  # Unreadable entry; refetch and overwrite it
+        
+        misses = {}
+        for url, key in zip(urls, keys):
+            if key not in results:
+                misses.setdefault(key, url)
+        fetched = await asyncio.gather(
+            *(self._fetch_safe(url, extraction_rules) for url in misses.values())
+        )
+        results.update(zip(misses, fetched))
+        
+        if caching:
+            await self.cache.mset_ex(
+                [
+                    (key, self._cache_value(result))
+                    for key, result in zip(misses, fetched) if result.success
+                ],
+                settings.cache_ttl
+            )
+        
+        return [results[key] for key in keys]
+    
+    @classmethod
+    def _rules_blob(cls, extraction_rules: Dict[str, ExtractionRule]) -> bytes:
+        """Canonical serialization of a rules dict, memoized by identity"""
+        entry = cls._rules_blobs.get(id(extraction_rules))
+        if entry is not None and entry[0] is extraction_rules:
+            cls._rules_blobs.move_to_end(id(extraction_rules))
+            return entry[1]
+        rules_blob = orjson.dumps(
+            {k: vars(v) for k, v in extraction_rules.items()},
+            option=orjson.OPT_SORT_KEYS
+        )
+        cls._rules_blobs[id(extraction_rules)] = (extraction_rules, rules_blob)
+        if len(cls._rules_blobs) > cls.RULES_BLOB_CACHE_SIZE:
+            cls._rules_blobs.popitem(last=False)
+        return rules_blob
+    
+    @classmethod
+    def _cache_keys(cls, urls: List[str], extraction_rules: Dict[str, ExtractionRule]) -> List[str]:
+        """Fixed-size cache keys over each URL and the canonical rules"""
+        # Different rule sets never collide
+        rules_blob = cls._rules_blob(extraction_rules)
+        keys = []
+        for url in urls:
+            key_hash = hashlib.blake2b(url.encode() + b"\0", digest_size=16)
+            key_hash.update(rules_blob)
+            keys.append(f"scrape:{key_hash.hexdigest()}")
+        return keys
+    
+    @staticmethod
+    def _from_cache(url: str, cached: bytes) -> ScrapedData:
+        """Build the result for a cache hit"""
+        cached_data = orjson.loads(cached)
+        return ScrapedData(
+            url=url,
+            title=cached_data.get("title"),
+            data=cached_data.get("data"),
+            metadata={"from_cache": True},
+            success=True
+        )
+    
+    @staticmethod
+    def _cache_value(result: ScrapedData) -> bytes:
+        """Serialize a successful result for the cache"""
+        return orjson.dumps({"title": result.title, "data": result.data})
+    
+    async def _scrape(
+        self,
+        url: str,
+        extraction_rules: Dict[str, ExtractionRule],
+        use_cache: bool,
+        cache_key: str
+    ) -> ScrapedData:
+        """Fetch, parse and cache a single page (see scrape)"""
         try:
-            # Check cache with better key (include rules hash)
             if use_cache and settings.cache_enabled:
-                rules_hash = hashlib.md5(
-                    json.dumps({k: vars(v) for k, v in extraction_rules.items()}, sort_keys=True).encode()
-                ).hexdigest()[:8]
-                cache_key = f"scrape:{url}:{rules_hash}"
                 cached = await self.cache.get(cache_key)
                 if cached:
-                    cached_data = json.loads(cached)
-                    return ScrapedData(
-                        url=url,
-                        title=cached_data.get("title"),
-                        data=cached_data.get("data"),
-                        metadata={"from_cache": True},
-                        success=True
-                    )
-            
-            # Fetch page
-            html = await self.browser.fetch_page(url)
-            
-            # Parse HTML
-            soup = self.parser.parse(html)
-            
-            # Extract title
-            title_elem = soup.select_one('title')
-            title = title_elem.get_text(strip=True) if title_elem else None
+                    return self._from_cache(url, cached)
             
-            # Extract data using rules
-            extracted_data = {}
-            for field_name, rule in extraction_rules.items():
-                extracted_data[field_name] = self.parser.extract(soup, rule)
+            result = await self._fetch(url, extraction_rules)
             
             # Cache result
             if use_cache and settings.cache_enabled:
-                cache_data = json.dumps({"title": title, "data": extracted_data})
-                await self.cache.set(cache_key, cache_data, settings.cache_ttl)
+                await self.cache.set(cache_key, self._cache_value(result), settings.cache_ttl)
             
+            return result
+        
+        except Exception as e:
             return ScrapedData(
                 url=url,
-                title=title,
-                data=extracted_data,
-                metadata={"timestamp": asyncio.get_event_loop().time()},
-                success=True
+                success=False,
+                error=str(e)
             )
-        
+    
+    async def _fetch_safe(self, url: str, extraction_rules: Dict[str, ExtractionRule]) -> ScrapedData:
+        """_fetch, reporting failures as unsuccessful results"""
+        try:
+            return await self._fetch(url, extraction_rules)
         except Exception as e:
             return ScrapedData(
                 url=url,
@@ -446,9 +1160,89 @@ class ScraperService:
                 error=str(e)
             )
     
+    async def _fetch(self, url: str, extraction_rules: Dict[str, ExtractionRule]) -> ScrapedData:
+        """Fetch and parse a page without touching the cache"""
+        # Try the served HTML first; render only if it looks incomplete
+        fetched = None
+        if self.http_fetcher is not None:
+            try:
+                html = await self.http_fetcher.fetch_page(url)
+                fetched = await self._extract_async(html, extraction_rules)
+                if not self._is_complete(*fetched):
+                    fetched = None
+            except Exception:
+                fetched = None
+        
+        if fetched is not None:
+            path = "http-fast"
+        else:
+            # Stop waiting once the first rule's target has rendered
+            first_rule = next(iter(extraction_rules.values()), None)
+            wait_for_selector = first_rule.selector if first_rule else None
+            if self._browser_extract is not None:
+                fetched = await self._browser_extract(
+                    url, extraction_rules, wait_for_selector=wait_for_selector
+                )
+            else:
+                fetched = await self.browser.fetch_page(url, wait_for_selector=wait_for_selector)
+            if isinstance(fetched, str):
+                fetched = await self._extract_async(fetched, extraction_rules)
+            path = "playwright"
+        metrics.increment(f"scraper.fetch.{path}")
+        title, extracted_data = fetched
+        
+        return ScrapedData(
+            url=url,
+            title=title,
+            data=extracted_data,
+            metadata={"timestamp": asyncio.get_running_loop().time(), "path": path},
+            success=True
+        )
+    
+    def _extract(self, html: str, extraction_rules: Dict[str, ExtractionRule]) -> tuple:
+        """
+        Parse HTML and apply the title rule plus every extraction rule.
+        
+        Args:
+            html: HTML content
+            extraction_rules: Dictionary of field_name -> ExtractionRule
+            
+        Returns:
+            (title, extracted_data) tuple
+        """
+        soup = self.parser.parse(html)
+        title = self.parser.extract(soup, TITLE_RULE)
+        extracted_data = {}
+        for field_name, rule in extraction_rules.items():
+            extracted_data[field_name] = self.parser.extract(soup, rule)
+        return title, extracted_data
+    
+    async def _extract_async(self, html: str, extraction_rules: Dict[str, ExtractionRule]) -> tuple:
+        """Run _extract off the event loop for pages large enough to block it"""
+        if len(html) < self.PARSE_OFFLOAD_THRESHOLD:
+            return self._extract(html, extraction_rules)
+        return await asyncio.to_thread(self._extract, html, extraction_rules)
+    
+    @staticmethod
+    def _is_complete(title: Optional[str], extracted_data: Dict) -> bool:
+        """
+        Whether served HTML is good enough to skip the browser.
+        
+        Pages without a title, or where fewer than settings.http_fallback_ratio
+        of the rules matched, are treated as JavaScript-rendered.
+        """
+        if not title:
+            return False
+        if not extracted_data:
+            return True
+        found = sum(1 for value in extracted_data.values() if value)
+        return found >= settings.http_fallback_ratio * len(extracted_data)
+    
     async def cleanup(self):
         """Cleanup resources"""
         await self.browser.close()
+        if self.http_fetcher is not None:
+            await self.http_fetcher.close()
 
 
 # ============================================
@@ -462,6 +1256,19 @@ class JobPostingScraper:
     Demonstrates how to extend the base scraper for specific use cases.
     """
     
+    # Built once at import; rules are read-only during scraping
+    JOB_EXTRACTION_RULES: Dict[str, ExtractionRule] = {
+        "title": ExtractionRule(selector="h1.job-title, h1[class*='title']"),
+        "company": ExtractionRule(selector=".company-name, [class*='company']"),
+        "location": ExtractionRule(selector=".location, [class*='location']"),
+        "description": ExtractionRule(selector=".job-description, [class*='description']"),
+        "requirements": ExtractionRule(
+            selector=".requirements li, [class*='requirement']",
+            multiple=True
+        ),
+        "salary": ExtractionRule(selector=".salary, [class*='salary']"),
+    }
+    
     def __init__(self, scraper_service: ScraperService = None):
         """
         Initialize job posting scraper.
@@ -473,17 +1280,7 @@ class JobPostingScraper:
     
     def _get_job_extraction_rules(self) -> Dict[str, ExtractionRule]:
         """Get extraction rules for job postings"""
-        return {
-            "title": ExtractionRule(selector="h1.job-title, h1[class*='title']"),
-            "company": ExtractionRule(selector=".company-name, [class*='company']"),
-            "location": ExtractionRule(selector=".location, [class*='location']"),
-            "description": ExtractionRule(selector=".job-description, [class*='description']"),
-            "requirements": ExtractionRule(
-                selector=".requirements li, [class*='requirement']",
-                multiple=True
-            ),
-            "salary": ExtractionRule(selector=".salary, [class*='salary']"),
-        }
+        return self.JOB_EXTRACTION_RULES
     
     async def scrape_job(self, url: str) -> ScrapedData:
         """
@@ -0,0 +1,66 @@
+"""
+Plain HTTP Page Fetcher
+
+Fast path for pages that ship complete HTML without JavaScript rendering.
+Shares one aiohttp session so connections are reused across requests.
+"""
+from typing import Optional
+import aiohttp
+
+from app.config import settings
+
+
+class HttpFetcher:
+    """
+    aiohttp implementation of the fetch side of BrowserProvider.
+    
+    Returns the raw server HTML; callers decide whether it is complete
+    enough or the page needs a real browser.
+    """
+    
+    def __init__(self, timeout: int = None, user_agent: str = None):
+        """
+        Initialize HTTP fetcher.
+        
+        Args:
+            timeout: Request timeout in milliseconds
+            user_agent: Custom user agent
+        """
+        self.timeout = timeout or settings.timeout
+        self.user_agent = user_agent or settings.user_agent
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        """Lazy session creation inside the running event loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout / 1000),
+                headers={"User-Agent": self.user_agent}
+            )
+        return self._session
+    
+    async def fetch_page(self, url: str) -> str:
+        """
+        Fetch page HTML without rendering.
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            HTML content as served
+            
+        Raises:
+            ValueError: If the response is not HTML
+            aiohttp.ClientError: If the request fails or returns an error status
+        """
+        session = self._ensure_session()
+        async with session.get(url, allow_redirects=True, raise_for_status=True) as response:
+            if "html" not in response.content_type:
+                raise ValueError(f"Not an HTML page: {response.content_type}")
+            return await response.text()
+    
+    async def close(self) -> None:
+        """Close the shared session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
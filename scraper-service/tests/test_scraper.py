@@ -3,8 +3,11 @@ Unit Tests for Scraper Service
 
 Tests with mocking for browser and network calls.
 """
+import asyncio
+import threading
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
+from playwright.async_api import Error as PlaywrightError
 from typing import Dict
 
 from app.scrapers.base import (
@@ -13,7 +16,14 @@ from app.scrapers.base import (
     BrowserProvider,
     HTMLParser,
     PlaywrightBrowserProvider,
+    get_browser_provider,
+    get_cache_provider,
     BeautifulSoupParser,
+    LxmlParser,
+    SelectolaxParser,
+    get_html_parser,
+    InMemoryCache,
+    RedisCache,
     ScraperService,
     JobPostingScraper
 )
@@ -28,6 +38,7 @@ def mock_browser_provider():
     """Mock browser provider"""
     provider = Mock(spec=BrowserProvider)
     provider.fetch_page = AsyncMock(return_value="<html><title>Test</title><h1>Hello</h1></html>")
+    provider.warmup = AsyncMock()
     provider.close = AsyncMock()
     return provider
 
@@ -171,6 +182,285 @@ class TestBeautifulSoupParser:
         result = parser.extract(soup, rule)
         
         assert result is None
+    
+    def test_simple_selectors_match_css_engine(self):
+        """Test fast-path selectors return the same elements as select()"""
+        parser = BeautifulSoupParser()
+        html = (
+            '<html><div class="card salary">1</div><div data-k="v">2</div>'
+            '<div class="x">3</div><span class="x y">4</span></html>'
+        )
+        soup = parser.parse(html)
+        
+        for selector in [".salary", ".x", '[data-k="v"]', "[data-k='v']", '[class="x"]']:
+            rule = ExtractionRule(selector=selector, multiple=True)
+            expected = [elem.get_text(strip=True) for elem in soup.select(selector)]
+            assert parser.extract(soup, rule) == expected
+    
+    def test_complex_selectors_use_compiled_matcher(self):
+        """Test compiled selectors return the same elements as select()"""
+        parser = BeautifulSoupParser()
+        html = "<html><ul class='requirements'><li>a</li><li>b</li></ul><p class='x-company'>c</p></html>"
+        soup = parser.parse(html)
+        selector = ".requirements li, [class*='company']"
+        
+        result = parser.extract(soup, ExtractionRule(selector=selector, multiple=True))
+        
+        assert result == [elem.get_text(strip=True) for elem in soup.select(selector)]
+        assert parser.extract(soup, ExtractionRule(selector=selector)) == "a"
+    
+    def test_simple_filter_skips_complex_selectors(self):
+        """Test only single-class and exact-attribute selectors take the fast path"""
+        assert BeautifulSoupParser._simple_filter(".salary") == ("class", "salary")
+        assert BeautifulSoupParser._simple_filter('[data-k="v"]') == ("data-k", "v")
+        assert BeautifulSoupParser._simple_filter("[class*='company']") is None
+        assert BeautifulSoupParser._simple_filter("div .salary") is None
+        assert BeautifulSoupParser._simple_filter('[class="x"]') is None
+
+
+class TestLxmlParser:
+    """Tests for lxml parser"""
+    
+    def test_extract_single_text(self):
+        """Test extracting single text element"""
+        parser = LxmlParser()
+        tree = parser.parse("<html><h1 class='title'>Test Title</h1></html>")
+        
+        result = parser.extract(tree, ExtractionRule(selector="h1.title"))
+        
+        assert result == "Test Title"
+    
+    def test_extract_single_attribute(self):
+        """Test extracting single attribute"""
+        parser = LxmlParser()
+        tree = parser.parse('<html><a href="https://example.com">Link</a></html>')
+        
+        result = parser.extract(tree, ExtractionRule(selector="a", attribute="href"))
+        
+        assert result == "https://example.com"
+    
+    def test_extract_nonexistent_element(self):
+        """Test extracting non-existent element returns None"""
+        parser = LxmlParser()
+        tree = parser.parse("<html><h1>Test</h1></html>")
+        
+        assert parser.extract(tree, ExtractionRule(selector="h2")) is None
+        assert parser.extract(tree, ExtractionRule(selector="h2", multiple=True)) == []
+    
+    def test_matches_beautifulsoup_output(self):
+        """Test text and lists match the BeautifulSoup parser"""
+        html = (
+            "<html><head><title> Jobs </title></head><body>"
+            "<p>Hello <!-- note --> <b>world</b> </p>"
+            "<li>Item 1</li><li> Item 2 </li></body></html>"
+        )
+        rules = [
+            ExtractionRule(selector="title"),
+            ExtractionRule(selector="p"),
+            ExtractionRule(selector="li", multiple=True),
+        ]
+        lxml_parser, soup_parser = LxmlParser(), BeautifulSoupParser()
+        tree, soup = lxml_parser.parse(html), soup_parser.parse(html)
+        
+        for rule in rules:
+            assert lxml_parser.extract(tree, rule) == soup_parser.extract(soup, rule)
+    
+    def test_single_rule_returns_first_match_in_document_order(self):
+        """Test grouped selectors return the earliest match, as select_one does"""
+        html = "<html><p class='b'>first</p><span class='a'>second</span></html>"
+        rule = ExtractionRule(selector=".a, .b")
+        lxml_parser, soup_parser = LxmlParser(), BeautifulSoupParser()
+        
+        result = lxml_parser.extract(lxml_parser.parse(html), rule)
+        
+        assert result == "first"
+        assert result == soup_parser.extract(soup_parser.parse(html), rule)
+    
+    def test_empty_document(self):
+        """Test empty HTML parses to a document without matches"""
+        parser = LxmlParser()
+        
+        assert parser.extract(parser.parse(""), ExtractionRule(selector="title")) is None
+
+
+class TestSelectolaxParser:
+    """Tests for selectolax parser"""
+    
+    def test_matches_lxml_output(self):
+        """Test text, attributes and lists match the lxml parser"""
+        html = (
+            "<html><head><title> Jobs </title></head><body>"
+            "<p>Hello <!-- note --> <b>world</b> </p><a href='/apply'>Apply</a>"
+            "<ul class='requirements'><li>Item 1</li><li> Item 2 </li></ul></body></html>"
+        )
+        rules = [
+            ExtractionRule(selector="title"),
+            ExtractionRule(selector="p"),
+            ExtractionRule(selector="a", attribute="href"),
+            ExtractionRule(selector="h2"),
+            ExtractionRule(selector=".requirements li, [class*='requirement']", multiple=True),
+        ]
+        fast_parser, lxml_parser = SelectolaxParser(), LxmlParser()
+        document, tree = fast_parser.parse(html), lxml_parser.parse(html)
+        
+        for rule in rules:
+            assert fast_parser.extract(document, rule) == lxml_parser.extract(tree, rule)
+    
+    def test_grouped_selectors_use_document_order(self):
+        """Test grouped selectors return each element once, in document order"""
+        parser = SelectolaxParser()
+        document = parser.parse("<html><p class='b'>first</p><span class='a b'>second</span></html>")
+        
+        assert parser.extract(document, ExtractionRule(selector=".a, .b", multiple=True)) == ["first", "second"]
+        assert parser.extract(document, ExtractionRule(selector=".a, .b")) == "first"
+    
+    def test_empty_document(self):
+        """Test empty HTML parses to a document without matches"""
+        parser = SelectolaxParser()
+        
+        assert parser.extract(parser.parse(""), ExtractionRule(selector="title")) is None
+    
+    def test_factory_uses_configured_parser(self):
+        """Test the factory follows settings.html_parser"""
+        with patch("app.scrapers.base.settings.html_parser", "lxml"):
+            assert isinstance(get_html_parser(), LxmlParser)
+        with patch("app.scrapers.base.settings.html_parser", "selectolax"):
+            assert isinstance(get_html_parser(), SelectolaxParser)
+
+
+# ============================================
+# Cache Tests
+# ============================================
+
+class TestInMemoryCache:
+    """Tests for the bounded in-memory cache"""
+    
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_not_returned(self):
+        """Test values past their TTL read as missing"""
+        cache = InMemoryCache()
+        await cache.set("fresh", "a", ttl=60)
+        await cache.set("stale", "b", ttl=0)
+        
+        assert await cache.get("fresh") == "a"
+        assert await cache.get("stale") is None
+    
+    @pytest.mark.asyncio
+    async def test_oldest_entries_evicted_beyond_max_size(self):
+        """Test the cache never holds more than max_size entries"""
+        cache = InMemoryCache(max_size=2)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key, ttl=60)
+        
+        assert await cache.get("a") is None
+        assert await cache.get("c") == "c"
+        assert len(cache._cache) == 2
+    
+    @pytest.mark.asyncio
+    async def test_reads_protect_entries_from_eviction(self):
+        """Test a recently read entry outlives newer unread ones"""
+        cache = InMemoryCache(max_size=2)
+        await cache.set("a", "a", ttl=60)
+        await cache.set("b", "b", ttl=60)
+        await cache.get("a")
+        
+        await cache.set("c", "c", ttl=60)
+        
+        assert await cache.get("a") == "a"
+        assert await cache.get("b") is None
+    
+    @pytest.mark.asyncio
+    async def test_sweep_drops_unread_expired_entries(self):
+        """Test writes after the sweep interval purge expired entries"""
+        cache = InMemoryCache()
+        await cache.set("stale", "b", ttl=0)
+        cache._next_sweep = 0
+        
+        await cache.set("fresh", "a", ttl=60)
+        
+        assert list(cache._cache) == ["fresh"]
+    
+    @pytest.mark.asyncio
+    async def test_batch_get_and_set(self):
+        """Test mset_ex stores every pair and mget returns None for misses"""
+        cache = InMemoryCache()
+        await cache.mset_ex([("a", "1"), ("b", "2")], ttl=60)
+        
+        assert await cache.mget(["a", "missing", "b"]) == ["1", None, "2"]
+
+
+class _FakePipeline:
+    """Minimal redis pipeline recording the commands it is sent"""
+    
+    def __init__(self, store: Dict, executed: list):
+        self._store = store
+        self._executed = executed
+        self._commands = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    def get(self, key):
+        self._commands.append(lambda: self._store.get(key))
+    
+    def set(self, key, value, ex=None):
+        self._commands.append(lambda: self._store.__setitem__(key, value) or True)
+    
+    async def execute(self, raise_on_error=True):
+        self._executed.append(len(self._commands))
+        return [command() for command in self._commands]
+
+
+class TestRedisCache:
+    """Tests for Redis command auto-pipelining"""
+    
+    @pytest.fixture
+    def cache(self):
+        """RedisCache talking to an in-memory fake client"""
+        cache = RedisCache(redis_url="redis://localhost:6379/0")
+        cache.store, cache.executed = {"hit": "cached"}, []
+        cache._client = Mock()
+        cache._client.pipeline = Mock(
+            side_effect=lambda transaction: _FakePipeline(cache.store, cache.executed)
+        )
+        return cache
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_commands_share_one_pipeline(self, cache):
+        """Test commands issued together are flushed in a single round trip"""
+        results = await asyncio.gather(
+            cache.get("hit"),
+            cache.get("miss"),
+            cache.set("new", "value", ttl=60)
+        )
+        
+        assert results == ["cached", None, None]
+        assert cache.store["new"] == "value"
+        assert cache.executed == [3]
+    
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_without_waiting(self, cache):
+        """Test reaching PIPELINE_MAX_BATCH sends the buffer immediately"""
+        cache.PIPELINE_WINDOW = 60
+        count = RedisCache.PIPELINE_MAX_BATCH
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(*(cache.get("hit") for _ in range(count))),
+            timeout=1
+        )
+        
+        assert results == ["cached"] * count
+        assert cache.executed == [count]
+    
+    @pytest.mark.asyncio
+    async def test_pipeline_errors_read_as_misses(self, cache):
+        """Test a failed flush degrades to cache misses"""
+        cache._client.pipeline = Mock(side_effect=ConnectionError("down"))
+        
+        assert await cache.get("hit") is None
 
 
 # ============================================
@@ -195,7 +485,7 @@ class TestScraperService:
         
         assert result.success is True
         assert result.url == url
-        mock_browser_provider.fetch_page.assert_called_once_with(url)
+        mock_browser_provider.fetch_page.assert_called_once_with(url, wait_for_selector="h1")
     
     @pytest.mark.asyncio
     async def test_scrape_with_cache_hit(
@@ -216,6 +506,77 @@ class TestScraperService:
         # Browser should not be called if cache hit
         mock_browser_provider.fetch_page.assert_not_called()
     
+    @pytest.mark.asyncio
+    async def test_cache_round_trip_returns_stored_data(self, mock_browser_provider):
+        """Test a cache hit returns the data stored by the first scrape"""
+        service = ScraperService(
+            browser_provider=mock_browser_provider,
+            html_parser=LxmlParser(),
+            cache_provider=InMemoryCache()
+        )
+        url = "https://example.com"
+        rules = {"heading": ExtractionRule(selector="h1")}
+        
+        first = await service.scrape(url, rules)
+        second = await service.scrape(url, rules)
+        other_rules = await service.scrape(url, {"heading": ExtractionRule(selector="h2")})
+        
+        assert second.metadata == {"from_cache": True}
+        assert (second.title, second.data) == (first.title, first.data) == ("Test", {"heading": "Hello"})
+        assert other_rules.data == {"heading": None}
+        assert mock_browser_provider.fetch_page.call_count == 2
+        assert all(isinstance(value, bytes) for value, _ in service.cache._cache.values())
+    
+    def test_rules_blob_is_memoized_per_rules_dict(self):
+        """Test a shared rules dict is serialized once and equal dicts share keys"""
+        rules = {"heading": ExtractionRule(selector="h1")}
+        
+        first = ScraperService._rules_blob(rules)
+        assert ScraperService._rules_blob(rules) is first
+        assert ScraperService._cache_keys(["u"], rules) == ScraperService._cache_keys(
+            ["u"], {"heading": ExtractionRule(selector="h1")}
+        )
+        assert len(ScraperService._rules_blobs) <= ScraperService.RULES_BLOB_CACHE_SIZE
+    
+    @pytest.mark.asyncio
+    async def test_scrape_many_fetches_only_misses(self, mock_browser_provider):
+        """Test scrape_many serves hits from cache and fetches each miss once"""
+        service = ScraperService(
+            browser_provider=mock_browser_provider,
+            html_parser=LxmlParser(),
+            cache_provider=InMemoryCache()
+        )
+        rules = {"heading": ExtractionRule(selector="h1")}
+        await service.scrape("https://a.example", rules)
+        
+        urls = ["https://a.example", "https://b.example", "https://b.example"]
+        results = await service.scrape_many(urls, rules)
+        
+        assert [result.url for result in results] == urls
+        assert results[0].metadata == {"from_cache": True}
+        assert results[1].data == results[2].data == {"heading": "Hello"}
+        assert mock_browser_provider.fetch_page.call_count == 2
+        assert (await service.scrape("https://b.example", rules)).metadata == {"from_cache": True}
+    
+    @pytest.mark.asyncio
+    async def test_scrape_many_batches_cache_round_trips(self, scraper_service, mock_cache):
+        """Test scrape_many does one mget and one mset_ex, caching only successes"""
+        mock_cache.mget = AsyncMock(return_value=[None, None])
+        mock_cache.mset_ex = AsyncMock()
+        scraper_service.browser.fetch_page.side_effect = ["<html><title>A</title></html>", Exception("boom")]
+        rules = {"title": ExtractionRule(selector="h1")}
+        
+        results = await scraper_service.scrape_many(["https://a.example", "https://b.example"], rules)
+        
+        assert [result.success for result in results] == [True, False]
+        assert results[1].error == "boom"
+        mock_cache.mget.assert_awaited_once()
+        mock_cache.mset_ex.assert_awaited_once()
+        pairs, ttl = mock_cache.mset_ex.await_args.args
+        assert len(pairs) == 1
+        mock_cache.get.assert_not_called()
+        mock_cache.set.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_scrape_failure(
         self,
@@ -232,12 +593,450 @@ class TestScraperService:
         assert result.success is False
         assert "Network error" in result.error
     
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_scrapes_share_one_fetch(
+        self,
+        scraper_service,
+        mock_browser_provider
+    ):
+        """Test identical in-flight requests are coalesced into one fetch"""
+        url = "https://example.com"
+        rules = {"title": ExtractionRule(selector="h1")}
+        
+        results = await asyncio.gather(
+            *(scraper_service.scrape(url, rules, use_cache=False) for _ in range(3))
+        )
+        
+        assert all(result.success for result in results)
+        mock_browser_provider.fetch_page.assert_called_once_with(url, wait_for_selector="h1")
+        assert scraper_service._inflight == {}
+    
+    @pytest.mark.asyncio
+    async def test_different_rules_are_not_coalesced(
+        self,
+        scraper_service,
+        mock_browser_provider
+    ):
+        """Test requests with different rules fetch independently"""
+        url = "https://example.com"
+        
+        await asyncio.gather(
+            scraper_service.scrape(url, {"a": ExtractionRule(selector="h1")}, use_cache=False),
+            scraper_service.scrape(url, {"b": ExtractionRule(selector="h2")}, use_cache=False)
+        )
+        
+        assert mock_browser_provider.fetch_page.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_http_fast_path_skips_browser(self, mock_browser_provider, mock_cache):
+        """Test complete server-rendered HTML is used without the browser"""
+        fetcher = Mock()
+        fetcher.fetch_page = AsyncMock(return_value="<html><title>Jobs</title><h1>Engineer</h1></html>")
+        service = ScraperService(
+            browser_provider=mock_browser_provider,
+            html_parser=LxmlParser(),
+            cache_provider=mock_cache,
+            http_fetcher=fetcher
+        )
+        
+        result = await service.scrape("https://example.com", {"role": ExtractionRule(selector="h1")}, use_cache=False)
+        
+        assert result.data == {"role": "Engineer"}
+        assert result.metadata["path"] == "http-fast"
+        mock_browser_provider.fetch_page.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_http_fast_path_falls_back_when_rules_miss(self, mock_browser_provider, mock_cache):
+        """Test pages whose rules mostly miss are rendered with the browser"""
+        fetcher = Mock()
+        fetcher.fetch_page = AsyncMock(return_value="<html><title>App</title><div id='root'></div></html>")
+        mock_browser_provider.fetch_page.return_value = "<html><title>App</title><h1>Engineer</h1></html>"
+        service = ScraperService(
+            browser_provider=mock_browser_provider,
+            html_parser=LxmlParser(),
+            cache_provider=mock_cache,
+            http_fetcher=fetcher
+        )
+        
+        result = await service.scrape("https://example.com", {"role": ExtractionRule(selector="h1")}, use_cache=False)
+        
+        assert result.data == {"role": "Engineer"}
+        assert result.metadata["path"] == "playwright"
+        mock_browser_provider.fetch_page.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_http_fast_path_errors_fall_back(self, mock_browser_provider, mock_cache):
+        """Test HTTP failures fall through to the browser"""
+        fetcher = Mock()
+        fetcher.fetch_page = AsyncMock(side_effect=ValueError("Not an HTML page"))
+        service = ScraperService(
+            browser_provider=mock_browser_provider,
+            html_parser=LxmlParser(),
+            cache_provider=mock_cache,
+            http_fetcher=fetcher
+        )
+        
+        result = await service.scrape("https://example.com", {}, use_cache=False)
+        
+        assert result.success is True
+        assert result.metadata["path"] == "playwright"
+    
+    @pytest.mark.asyncio
+    async def test_browser_extraction_skips_python_parser(self, mock_cache, mock_html_parser):
+        """Test providers that extract in the page bypass the HTML parser"""
+        browser = Mock()
+        browser.fetch_extracted = AsyncMock(return_value=("Jobs", {"role": "Engineer"}))
+        service = ScraperService(
+            browser_provider=browser,
+            html_parser=mock_html_parser,
+            cache_provider=mock_cache
+        )
+        rules = {"role": ExtractionRule(selector="h1")}
+        
+        result = await service.scrape("https://example.com", rules, use_cache=False)
+        
+        assert (result.title, result.data) == ("Jobs", {"role": "Engineer"})
+        browser.fetch_extracted.assert_awaited_once_with("https://example.com", rules, wait_for_selector="h1")
+        mock_html_parser.parse.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_browser_extraction_falls_back_to_parsing_returned_html(self, mock_cache):
+        """Test HTML returned for unsupported selectors is parsed in Python"""
+        browser = Mock()
+        browser.fetch_extracted = AsyncMock(return_value="<html><title>Jobs</title><h1>Engineer</h1></html>")
+        service = ScraperService(
+            browser_provider=browser,
+            html_parser=LxmlParser(),
+            cache_provider=mock_cache
+        )
+        
+        result = await service.scrape("https://example.com", {"role": ExtractionRule(selector="h1")}, use_cache=False)
+        
+        assert (result.title, result.data) == ("Jobs", {"role": "Engineer"})
+    
+    @pytest.mark.asyncio
+    async def test_large_pages_are_parsed_off_the_event_loop(self, mock_browser_provider, mock_cache):
+        """Test pages above the offload threshold are parsed in a worker thread"""
+        parse_threads = []
+        parser = Mock(spec=HTMLParser)
+        parser.parse = Mock(side_effect=lambda html: parse_threads.append(threading.get_ident()))
+        parser.extract = Mock(return_value="value")
+        service = ScraperService(
+            browser_provider=mock_browser_provider,
+            html_parser=parser,
+            cache_provider=mock_cache
+        )
+        small = "<html></html>"
+        large = "<html>" + " " * ScraperService.PARSE_OFFLOAD_THRESHOLD + "</html>"
+        
+        mock_browser_provider.fetch_page.return_value = small
+        await service.scrape("https://example.com/a", {}, use_cache=False)
+        mock_browser_provider.fetch_page.return_value = large
+        await service.scrape("https://example.com/b", {}, use_cache=False)
+        
+        assert parse_threads[0] == threading.get_ident()
+        assert parse_threads[1] != threading.get_ident()
+    
     @pytest.mark.asyncio
     async def test_cleanup(self, scraper_service, mock_browser_provider):
         """Test cleanup calls browser close"""
         await scraper_service.cleanup()
         
         mock_browser_provider.close.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_warmup_starts_browser(self, scraper_service, mock_browser_provider):
+        """Test warmup starts the browser ahead of the first request"""
+        await scraper_service.warmup()
+        
+        mock_browser_provider.warmup.assert_awaited_once()
+
+
+class TestPlaywrightBrowserProvider:
+    """Tests for the browser context pool"""
+    
+    @staticmethod
+    def _provider_with_browser(max_contexts: int, recycle_after: int = None):
+        """Provider whose Playwright launch is replaced by a mock browser"""
+        provider = PlaywrightBrowserProvider(max_contexts=max_contexts, recycle_after=recycle_after)
+        browser = Mock()
+        browser.new_context = AsyncMock(side_effect=lambda **kwargs: AsyncMock())
+        browser.close = AsyncMock()
+        playwright = Mock()
+        playwright.chromium.launch = AsyncMock(return_value=browser)
+        playwright.stop = AsyncMock()
+        starter = Mock()
+        starter.start = AsyncMock(return_value=playwright)
+        return provider, starter
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_warmups_launch_one_browser(self):
+        """Test concurrent first uses share a single launch and a full pool"""
+        provider, starter = self._provider_with_browser(max_contexts=3)
+        
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await asyncio.gather(provider.warmup(), provider.warmup())
+        
+        starter.start.assert_awaited_once()
+        assert provider._available_contexts.qsize() == 3
+    
+    @pytest.mark.asyncio
+    async def test_pool_contexts_are_created_concurrently(self):
+        """Test warmup waits for one context creation, not one per slot"""
+        provider, starter = self._provider_with_browser(max_contexts=3)
+        in_flight, peak = 0, 0
+        
+        async def slow_context(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return AsyncMock()
+        
+        browser = (await starter.start()).chromium.launch.return_value
+        browser.new_context = AsyncMock(side_effect=slow_context)
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await provider.warmup()
+        
+        assert peak == 3
+        assert len(provider._contexts) == 3
+    
+    @pytest.mark.asyncio
+    async def test_return_context_closes_overflow(self):
+        """Test contexts beyond the pool size are closed instead of queued"""
+        provider, starter = self._provider_with_browser(max_contexts=1)
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await provider.warmup()
+        
+        pooled = await provider._get_context()
+        extra = AsyncMock()
+        await provider._return_context(pooled)
+        await provider._return_context(extra)
+        
+        pooled.close.assert_not_called()
+        extra.close.assert_awaited_once()
+    
+    @pytest.mark.asyncio
+    async def test_most_recently_returned_context_is_reused_first(self):
+        """Test the pool hands back the warmest context (LIFO)"""
+        provider, starter = self._provider_with_browser(max_contexts=3)
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await provider.warmup()
+        
+        first = await provider._get_context()
+        second = await provider._get_context()
+        await provider._return_context(first)
+        await provider._return_context(second)
+        
+        assert await provider._get_context() is second
+        assert await provider._get_context() is first
+    
+    @pytest.mark.asyncio
+    async def test_contexts_are_recycled_after_max_uses(self):
+        """Test a pooled context is closed and replaced once it reaches recycle_after"""
+        provider, starter = self._provider_with_browser(max_contexts=1, recycle_after=2)
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await provider.warmup()
+        
+        first = await provider._get_context()
+        await provider._return_context(first)
+        assert await provider._get_context() is first
+        await provider._return_context(first)
+        replacement = await provider._get_context()
+        
+        first.close.assert_awaited_once()
+        assert replacement is not first
+        assert provider._contexts == [replacement]
+    
+    @pytest.mark.asyncio
+    async def test_closed_provider_relaunches_on_next_use(self):
+        """Test the shared provider can be closed by one owner and reused"""
+        provider, starter = self._provider_with_browser(max_contexts=1)
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await provider.warmup()
+            await provider.close()
+            await provider.warmup()
+        
+        assert starter.start.await_count == 2
+        assert provider._available_contexts.qsize() == 1
+    
+    def test_default_provider_is_shared(self):
+        """Test scrapers built without a provider share one browser"""
+        assert ScraperService().browser is ScraperService().browser is get_browser_provider()
+    
+    def test_default_cache_is_shared(self):
+        """Test scrapers built without a cache share one provider"""
+        assert ScraperService().cache is ScraperService().cache is get_cache_provider()
+    
+    @pytest.mark.asyncio
+    async def test_persistent_context_is_shared_and_kept_open(self):
+        """Test a user data dir launches one persistent context shared by all slots"""
+        provider = PlaywrightBrowserProvider(max_contexts=2, user_data_dir="/tmp/profile")
+        context = AsyncMock()
+        playwright = Mock()
+        playwright.chromium.launch = AsyncMock()
+        playwright.chromium.launch_persistent_context = AsyncMock(return_value=context)
+        starter = Mock()
+        starter.start = AsyncMock(return_value=playwright)
+        
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await provider.warmup()
+        
+        playwright.chromium.launch.assert_not_called()
+        assert provider._available_contexts.qsize() == 2
+        
+        pooled = await provider._get_context()
+        await provider._return_context(pooled)
+        await provider._return_context(pooled)
+        
+        assert pooled is context
+        context.close.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_contexts_route_requests_through_the_blocklist(self):
+        """Test pooled contexts abort blocked resource types and load the rest"""
+        provider, starter = self._provider_with_browser(max_contexts=1)
+        with patch("app.scrapers.base.async_playwright", return_value=starter):
+            await provider.warmup()
+        context = await provider._get_context()
+        handler = context.route.await_args.args[1]
+        
+        image, script = AsyncMock(), AsyncMock()
+        image.request.resource_type = "image"
+        script.request.resource_type = "script"
+        await handler(image)
+        await handler(script)
+        
+        image.abort.assert_awaited_once()
+        script.continue_.assert_awaited_once()
+        script.abort.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_empty_blocklist_skips_routing(self):
+        """Test no route is installed when nothing is blocked"""
+        provider = PlaywrightBrowserProvider(blocked_resource_types=frozenset())
+        context = AsyncMock()
+        
+        await provider._block_resources(context)
+        
+        context.route.assert_not_called()
+    
+    @staticmethod
+    def _provider_with_page(page, pooled: bool = False):
+        """Provider with a ready pool whose one context opens the given page"""
+        provider = PlaywrightBrowserProvider(max_contexts=1)
+        context = AsyncMock()
+        context.new_page = AsyncMock(return_value=page)
+        provider._available_contexts = asyncio.LifoQueue(maxsize=1)
+        provider._available_contexts.put_nowait(context)
+        if pooled:
+            provider._contexts.append(context)
+        return provider
+    
+    @pytest.mark.asyncio
+    async def test_fetch_page_waits_for_selector_instead_of_network_idle(self):
+        """Test a wait selector replaces the networkidle wait"""
+        page = AsyncMock()
+        page.content = AsyncMock(return_value="<html></html>")
+        provider = self._provider_with_page(page)
+        
+        html = await provider.fetch_page("https://example.com", wait_for_selector="h1")
+        
+        assert html == "<html></html>"
+        page.goto.assert_awaited_once_with("https://example.com", wait_until="domcontentloaded", timeout=provider.timeout)
+        page.wait_for_selector.assert_awaited_once()
+        page.wait_for_load_state.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_fetch_page_selector_timeout_still_returns_content(self):
+        """Test a selector that never appears does not fail the fetch"""
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        page = AsyncMock()
+        page.wait_for_selector = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
+        page.content = AsyncMock(return_value="<html></html>")
+        provider = self._provider_with_page(page)
+        
+        assert await provider.fetch_page("https://example.com", wait_for_selector=".missing") == "<html></html>"
+    
+    @pytest.mark.asyncio
+    async def test_pooled_context_reuses_its_page(self):
+        """Test successive fetches on a pooled context navigate one open page"""
+        page = AsyncMock()
+        page.content = AsyncMock(return_value="<html></html>")
+        provider = self._provider_with_page(page, pooled=True)
+        context = provider._contexts[0]
+        
+        await provider.fetch_page("https://example.com/a", wait_for_selector="h1")
+        await provider.fetch_page("https://example.com/b", wait_for_selector="h1")
+        
+        context.new_page.assert_awaited_once()
+        assert page.goto.await_count == 2
+        page.close.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_failed_fetch_discards_the_page(self):
+        """Test a page left in an unknown state by an error is closed, not reused"""
+        page = AsyncMock()
+        page.goto = AsyncMock(side_effect=PlaywrightError("net::ERR_NAME_NOT_RESOLVED"))
+        provider = self._provider_with_page(page, pooled=True)
+        context = provider._contexts[0]
+        
+        with pytest.raises(Exception, match="Failed to fetch page"):
+            await provider.fetch_page("https://example.invalid", wait_for_selector="h1")
+        
+        page.close.assert_awaited_once()
+        assert provider._idle_pages.get(context, []) == []
+    
+    @pytest.mark.asyncio
+    async def test_fetch_extracted_returns_values_from_the_page(self):
+        """Test in-page extraction results come back as (title, data)"""
+        page = AsyncMock()
+        page.evaluate = AsyncMock(return_value={"title": "Jobs", "data": {"role": "Engineer"}})
+        provider = self._provider_with_page(page)
+        rules = {"role": ExtractionRule(selector="h1")}
+        
+        result = await provider.fetch_extracted("https://example.com", rules, wait_for_selector="h1")
+        
+        assert result == ("Jobs", {"role": "Engineer"})
+        script, (title_rule, sent_rules) = page.evaluate.await_args.args
+        assert sent_rules == {"role": {"selector": "h1", "attribute": None, "multiple": False}}
+        page.content.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_fetch_extracted_returns_html_for_unsupported_selectors(self):
+        """Test the page HTML is handed back when the browser rejects a selector"""
+        page = AsyncMock()
+        page.evaluate = AsyncMock(return_value={"html": "<html></html>"})
+        provider = self._provider_with_page(page)
+        
+        result = await provider.fetch_extracted("https://example.com", {"a": ExtractionRule(selector="p:contains(x)")})
+        
+        assert result == "<html></html>"
+    
+    @pytest.mark.asyncio
+    async def test_fetch_page_without_selector_waits_for_network_idle(self):
+        """Test pages fetched without a selector still wait for the network"""
+        page = AsyncMock()
+        page.content = AsyncMock(return_value="<html></html>")
+        provider = self._provider_with_page(page)
+        
+        await provider.fetch_page("https://example.com")
+        
+        page.wait_for_load_state.assert_awaited_once_with("networkidle")
+    
+    @pytest.mark.asyncio
+    async def test_ephemeral_cache_is_removed_on_close(self, tmp_path):
+        """Test the profile directory is deleted on close only when ephemeral"""
+        kept, dropped = tmp_path / "kept", tmp_path / "dropped"
+        kept.mkdir()
+        dropped.mkdir()
+        
+        await PlaywrightBrowserProvider(user_data_dir=str(kept)).close()
+        await PlaywrightBrowserProvider(user_data_dir=str(dropped), ephemeral_cache=True).close()
+        
+        assert kept.exists()
+        assert not dropped.exists()
 
 
 # ============================================
@@ -274,6 +1073,13 @@ class TestJobPostingScraper:
         assert "description" in rules
         assert "requirements" in rules
         assert rules["requirements"].multiple is True
+    
+    def test_extraction_rules_are_built_once(self):
+        """Test every call returns the same prebuilt rule set"""
+        first = JobPostingScraper()._get_job_extraction_rules()
+        second = JobPostingScraper()._get_job_extraction_rules()
+        
+        assert first is second
 
 
 # ============================================